@@ -1,6 +1,7 @@
 # app/__init__.py
-from flask import Flask, render_template  # ← ADD render_template
+from flask import Flask
 from flask_socketio import SocketIO
+from .conversation.session_store import create_session_store
 from dotenv import load_dotenv
 import os
 
@@ -12,16 +13,175 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev')
     app.config['LLM_API_KEY'] = os.getenv('GROQ_API_KEY')
     app.config['LLM_PROVIDER'] = os.getenv('LLM_PROVIDER', 'groq')
+    app.config['LLM_STREAM'] = os.getenv('LLM_STREAM', 'true').lower() == 'true'
 
-    socketio.init_app(app, cors_allowed_origins="*")
+    # Pooled provider HTTP client
+    app.config['LLM_POOL_SIZE'] = int(os.getenv('LLM_POOL_SIZE', 20))
+    app.config['LLM_CONNECT_TIMEOUT'] = float(os.getenv('LLM_CONNECT_TIMEOUT', 3.05))
+    app.config['LLM_READ_TIMEOUT'] = float(os.getenv('LLM_READ_TIMEOUT', 20))
+    app.config['LLM_MAX_RETRIES'] = int(os.getenv('LLM_MAX_RETRIES', 2))
+    app.config['LLM_RETRY_BACKOFF'] = float(os.getenv('LLM_RETRY_BACKOFF', 0.3))
+    app.config['LLM_RETRY_JITTER'] = float(os.getenv('LLM_RETRY_JITTER', 0.2))
 
-    # ✅ SERVE THE FRONTEND
-    @app.route('/')
-    def index():
-        return render_template('index.html')  # ← This loads your HTML
+    # Latency-aware routing across providers: hedged requests, circuit breakers, server fallback keys
+    app.config['LLM_SERVER_FALLBACK'] = os.getenv('LLM_SERVER_FALLBACK', 'false').lower() == 'true'  # billed to us
+    app.config['LLM_HEDGING'] = os.getenv('LLM_HEDGING', 'true').lower() == 'true'
+    app.config['LLM_HEDGE_DELAY'] = float(os.getenv('LLM_HEDGE_DELAY', 0))  # seconds; 0 = provider's rolling p95
+    app.config['LLM_HEDGE_SAME_ROUTE'] = os.getenv('LLM_HEDGE_SAME_ROUTE', 'false').lower() == 'true'  # 2x spend
+    app.config['LLM_BREAKER_THRESHOLD'] = int(os.getenv('LLM_BREAKER_THRESHOLD', 5))
+    app.config['LLM_BREAKER_COOLDOWN'] = float(os.getenv('LLM_BREAKER_COOLDOWN', 30))
+    app.config['LLM_FALLBACK_KEYS'] = {
+        'groq': os.getenv('GROQ_API_KEY'),
+        'together': os.getenv('TOGETHER_API_KEY'),
+        'openrouter': os.getenv('OPENROUTER_API_KEY'),
+        'perplexity': os.getenv('PERPLEXITY_API_KEY'),
+    }
+
+    # Fair-share rate limiting in front of provider calls: token buckets per API key and per provider
+    # (per minute, 0 = unlimited; this process's share), fair queuing across keys, interviews in progress first
+    app.config['LLM_SCHEDULER_ENABLED'] = os.getenv('LLM_SCHEDULER_ENABLED', 'true').lower() == 'true'
+    app.config['LLM_KEY_RPM'] = float(os.getenv('LLM_KEY_RPM', 0))
+    app.config['LLM_KEY_TPM'] = float(os.getenv('LLM_KEY_TPM', 0))
+    app.config['LLM_PROVIDER_RPM'] = float(os.getenv('LLM_PROVIDER_RPM', 0))
+    app.config['LLM_PROVIDER_TPM'] = float(os.getenv('LLM_PROVIDER_TPM', 0))
+    app.config['LLM_RATE_LIMITS'] = os.getenv('LLM_RATE_LIMITS') or None  # JSON: {"groq": {"key_tpm": 6000}}
+    app.config['LLM_RATE_BURST_SECONDS'] = float(os.getenv('LLM_RATE_BURST_SECONDS', 10))  # bucket = N seconds of rate
+    app.config['LLM_QUEUE_MAX_WAIT'] = float(os.getenv('LLM_QUEUE_MAX_WAIT', 8))  # then fall over / neutral line
+    app.config['LLM_QUEUE_MAX_WAIT_BACKGROUND'] = float(os.getenv('LLM_QUEUE_MAX_WAIT_BACKGROUND', 60))
+    app.config['LLM_RATE_LIMIT_PENALTY'] = float(os.getenv('LLM_RATE_LIMIT_PENALTY', 2))  # 429 without Retry-After
+    app.config['LLM_ADMIT_MAX_QUEUED'] = int(os.getenv('LLM_ADMIT_MAX_QUEUED', 8))  # new interviews refused above this
+    app.config['LLM_ADMIT_MAX_QUEUED_PROVIDER'] = int(os.getenv('LLM_ADMIT_MAX_QUEUED_PROVIDER', 64))
+    app.config['LLM_TENANT_WEIGHTS'] = os.getenv('LLM_TENANT_WEIGHTS') or None  # JSON: {tenant_id(key): weight}
+
+    # 'local' provider: an in-process CPU model shared by all sessions, continuously batched (no engine = off)
+    app.config['LOCAL_LLM_ENGINE'] = os.getenv('LOCAL_LLM_ENGINE') or None   # llama_cpp | synthetic
+    app.config['LOCAL_LLM_MODEL_PATH'] = os.getenv('LOCAL_LLM_MODEL_PATH')   # GGUF file for llama_cpp
+    app.config['LOCAL_LLM_MAX_BATCH'] = int(os.getenv('LOCAL_LLM_MAX_BATCH', 16))        # sequences per step
+    app.config['LOCAL_LLM_MAX_WAIT_MS'] = float(os.getenv('LOCAL_LLM_MAX_WAIT_MS', 5))   # idle model waits for company
+    app.config['LOCAL_LLM_CONTEXT'] = int(os.getenv('LOCAL_LLM_CONTEXT', 16384))         # KV tokens, all sequences
+    app.config['LOCAL_LLM_BATCH_TOKENS'] = int(os.getenv('LOCAL_LLM_BATCH_TOKENS', 512))  # tokens per forward pass
+    app.config['LOCAL_LLM_THREADS'] = int(os.getenv('LOCAL_LLM_THREADS', 0))             # 0 = engine default
+
+    # Cache of interviewer replies for identical (and, optionally, near-duplicate opening) prompts
+    app.config['RESPONSE_CACHE_ENABLED'] = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    app.config['RESPONSE_CACHE_MAX'] = int(os.getenv('RESPONSE_CACHE_MAX', 2048))
+    app.config['RESPONSE_CACHE_MAX_BYTES'] = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+    app.config['RESPONSE_CACHE_TTL'] = float(os.getenv('RESPONSE_CACHE_TTL', 86400))
+    app.config['RESPONSE_CACHE_PATH'] = os.getenv('RESPONSE_CACHE_PATH') or None
+    app.config['RESPONSE_CACHE_SEMANTIC'] = os.getenv('RESPONSE_CACHE_SEMANTIC', 'false').lower() == 'true'
+    app.config['RESPONSE_CACHE_SIMILARITY'] = float(os.getenv('RESPONSE_CACHE_SIMILARITY', 0.9))
+    app.config['RESPONSE_CACHE_MAX_POSTINGS'] = int(os.getenv('RESPONSE_CACHE_MAX_POSTINGS', 1024))  # postings indexed for openings
+
+    # Prepared questions per role for the opening turn(s), instead of an LLM call (no path = off).
+    # Build with: python -m app.conversation.question_bank build data/question_bank.jsonl instance/question_bank.npz
+    app.config['QUESTION_BANK_PATH'] = os.getenv('QUESTION_BANK_PATH') or None   # .npz, or .jsonl built at start-up
+    app.config['QUESTION_BANK_TURNS'] = int(os.getenv('QUESTION_BANK_TURNS', 1))   # answers served from the bank
+    app.config['QUESTION_BANK_MIN_SCORE'] = float(os.getenv('QUESTION_BANK_MIN_SCORE', 0.05))
+    app.config['QUESTION_BANK_ANSWER_WEIGHT'] = float(os.getenv('QUESTION_BANK_ANSWER_WEIGHT', 0.5))  # vs job desc
+
+    # Optional JSON file overriding the sentiment/vagueness keyword lists (hot-reloaded)
+    app.config['INDICATORS_FILE'] = os.getenv('INDICATORS_FILE') or None
+
+    # Rolling, token-budgeted interview context
+    app.config['CONTEXT_TOKEN_BUDGET'] = int(os.getenv('CONTEXT_TOKEN_BUDGET', 400))
+    app.config['CONTEXT_RECENT_TURNS'] = int(os.getenv('CONTEXT_RECENT_TURNS', 3))
+    app.config['CONTEXT_SUMMARY_TOKENS'] = int(os.getenv('CONTEXT_SUMMARY_TOKENS', 150))
+
+    # Speculative reply generation from interim (partial) transcripts
+    app.config['SPECULATION_ENABLED'] = os.getenv('SPECULATION_ENABLED', 'false').lower() == 'true'
+    app.config['SPECULATION_MIN_WORDS'] = int(os.getenv('SPECULATION_MIN_WORDS', 6))
+    app.config['SPECULATION_SIMILARITY'] = float(os.getenv('SPECULATION_SIMILARITY', 0.85))
+    app.config['SPECULATION_MAX_INFLIGHT'] = int(os.getenv('SPECULATION_MAX_INFLIGHT', 32))
+
+    # Turn execution / back-pressure
+    app.config['SOCKETIO_ASYNC_MODE'] = os.getenv('SOCKETIO_ASYNC_MODE') or None  # None = auto (eventlet if installed)
+    app.config['TURN_MAX_WORKERS'] = int(os.getenv('TURN_MAX_WORKERS', 64))
+    app.config['TURN_MAX_QUEUE'] = int(os.getenv('TURN_MAX_QUEUE', 256))
+    app.config['TURN_MAX_INFLIGHT_PER_SESSION'] = int(os.getenv('TURN_MAX_INFLIGHT_PER_SESSION', 1))
+
+    # Session store: 'memory' (single process) or 'redis' (shared across workers)
+    app.config['SESSION_STORE'] = os.getenv('SESSION_STORE', 'memory')
+    app.config['SESSION_REDIS_URL'] = os.getenv('SESSION_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    app.config['SESSION_TTL'] = int(os.getenv('SESSION_TTL', 3600))
+    app.config['SESSION_MAX'] = int(os.getenv('SESSION_MAX', 10000))
+    app.config['SESSION_RESUME_GRACE'] = int(os.getenv('SESSION_RESUME_GRACE', 120))  # seconds kept after disconnect
+
+    # Optional server-side speech (binary audio frames in, synthesised audio out)
+    app.config['AUDIO_ENABLED'] = os.getenv('AUDIO_ENABLED', 'false').lower() == 'true'
+    app.config['STT_ENGINE'] = os.getenv('STT_ENGINE', 'vosk')
+    app.config['STT_MODEL_PATH'] = os.getenv('STT_MODEL_PATH')
+    app.config['TTS_ENGINE'] = os.getenv('TTS_ENGINE', 'piper')
+    app.config['TTS_MODEL_PATH'] = os.getenv('TTS_MODEL_PATH')
+    app.config['AUDIO_CHUNK_MS'] = int(os.getenv('AUDIO_CHUNK_MS', 100))          # recogniser feed size
+    app.config['AUDIO_BUFFER_SECONDS'] = int(os.getenv('AUDIO_BUFFER_SECONDS', 10))  # inbound ring buffer
+
+    # Server-side endpointing (VAD) for audio mode: ends turns and detects barge-in
+    app.config['VAD_ENABLED'] = os.getenv('VAD_ENABLED', 'true').lower() == 'true'
+    app.config['VAD_FRAME_MS'] = int(os.getenv('VAD_FRAME_MS', 20))
+    app.config['VAD_THRESHOLD_DB'] = float(os.getenv('VAD_THRESHOLD_DB', 12))    # above the noise floor
+    app.config['VAD_MIN_DB'] = float(os.getenv('VAD_MIN_DB', -55))              # absolute speech floor, dBFS
+    app.config['VAD_ONSET_MS'] = int(os.getenv('VAD_ONSET_MS', 100))
+    app.config['VAD_HANGOVER_MS'] = int(os.getenv('VAD_HANGOVER_MS', 900))      # silence that ends a turn
+    app.config['VAD_MIN_SPEECH_MS'] = int(os.getenv('VAD_MIN_SPEECH_MS', 300))  # shorter bursts are ignored
+    app.config['BARGE_IN_ENABLED'] = os.getenv('BARGE_IN_ENABLED', 'true').lower() == 'true'
+
+    # Write-ahead transcript log: in-progress interviews survive a restart. Off unless a directory is set
+    # (e.g. instance/transcripts): it keeps every answer on disk for TRANSCRIPT_LOG_RETENTION_DAYS
+    app.config['TRANSCRIPT_LOG_DIR'] = os.getenv('TRANSCRIPT_LOG_DIR', '')
+    app.config['TRANSCRIPT_LOG_FSYNC_MS'] = int(os.getenv('TRANSCRIPT_LOG_FSYNC_MS', 50))  # group commit; 0 = per record
+    app.config['TRANSCRIPT_LOG_SEGMENT_BYTES'] = int(os.getenv('TRANSCRIPT_LOG_SEGMENT_BYTES', 64 * 1024 * 1024))
+    app.config['TRANSCRIPT_LOG_COMPACT_SEGMENTS'] = int(os.getenv('TRANSCRIPT_LOG_COMPACT_SEGMENTS', 8))
+    app.config['TRANSCRIPT_LOG_RETENTION_DAYS'] = float(os.getenv('TRANSCRIPT_LOG_RETENTION_DAYS', 30))
+
+    # Post-interview analytics: batched LLM scoring in background workers, reports in SQLite.
+    # Off by default: reports keep every transcript on disk
+    app.config['ANALYTICS_ENABLED'] = os.getenv('ANALYTICS_ENABLED', 'false').lower() == 'true'
+    app.config['ANALYTICS_DB_PATH'] = os.getenv('ANALYTICS_DB_PATH', os.path.join(app.instance_path, 'analytics.sqlite3'))
+    app.config['ANALYTICS_WORKERS'] = int(os.getenv('ANALYTICS_WORKERS', 2))
+    app.config['ANALYTICS_BATCH_ANSWERS'] = int(os.getenv('ANALYTICS_BATCH_ANSWERS', 40))  # answers per LLM request
+    app.config['ANALYTICS_BATCH_WAIT'] = float(os.getenv('ANALYTICS_BATCH_WAIT', 2.0))    # seconds to fill a batch
+    app.config['ANALYTICS_MAX_QUEUE'] = int(os.getenv('ANALYTICS_MAX_QUEUE', 1000))
+    app.config['ANALYTICS_SCORE_WITH_LLM'] = os.getenv('ANALYTICS_SCORE_WITH_LLM', 'false').lower() == 'true'  # LLM spend per report
+    app.config['ANALYTICS_API_TOKEN'] = os.getenv('ANALYTICS_API_TOKEN')  # reports API is off without it
+
+    # Multi-worker: Socket.IO message queue (e.g. redis://...) so any worker can emit to any room
+    app.config['SOCKETIO_MESSAGE_QUEUE'] = os.getenv('SOCKETIO_MESSAGE_QUEUE') or None
+
+    socketio.init_app(app, cors_allowed_origins="*", async_mode=app.config['SOCKETIO_ASYNC_MODE'],
+                      message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'])
+
+    from .llm import client
+    from .llm.cache import response_cache
+    from .llm.local import local_llm
+    from .llm.router import router
+    from .llm.scheduler import llm_scheduler
+    client.configure(app.config)
+    router.configure(app.config)
+    llm_scheduler.configure(app.config)
+    local_llm.configure(app.config, socketio)
+    response_cache.configure(app.config)
+    from .conversation import analyzer, memory
+    from .conversation.question_bank import question_bank
+    analyzer.configure(app.config)
+    memory.configure(app.config)
+    question_bank.configure(app.config)
+
+    # ✅ SERVE THE FRONTEND (+ /health, /ready, /metrics)
+    from . import routes
+    app.register_blueprint(routes.bp)
 
     # Register SocketIO events
     from . import events
     events.register_socketio_events(socketio)
+    events.executor.configure(app.config)
+    events.speculator.configure(app.config)
+    events.audio.configure(app.config)
+    events.analytics.configure(app.config)
+    events.sessions = create_session_store(app.config)
+    events.transcripts.configure(app.config, socketio)
+    # Put back interviews that were in progress when the last process stopped
+    for interview_id, session in events.transcripts.recover(max_age=app.config['SESSION_TTL']).items():
+        if interview_id not in events.sessions:
+            events.sessions.save(interview_id, session)
 
     return app
\ No newline at end of file
@@ -0,0 +1,239 @@
+# app/analytics/pipeline.py
+"""Post-interview analytics, off the live socket path (ANALYTICS_ENABLED, off by default).
+
+When an interview completes, its transcript is queued (a dict copy, no I/O)
+and the turn returns. Background workers drain the queue in batches. With
+ANALYTICS_SCORE_WITH_LLM on (off by default: it spends LLM requests on every
+report), the answers of every queued transcript that shares a provider and
+key are scored together, several per LLM request (as many as fit the prompt
+budget), instead of one request per answer or per candidate. Aggregates over what the
+live turns already measured (sentiment trend, vague/confident answers) are
+computed alongside, and the report is saved to the local ReportStore.
+
+If scoring fails or a line of the reply can't be parsed, the affected
+answers keep `score: None`; the report is still saved with the aggregates.
+"""
+import logging
+import queue
+import re
+import time
+from typing import Dict, List, Optional
+
+from ..llm.providers import PROMPT_MAX_CHARS
+from ..llm.router import FALLBACK_REPLY, router
+from ..llm.scheduler import BACKGROUND
+from ..metrics import Counter, Histogram
+from .store import ReportStore
+
+logger = logging.getLogger(__name__)
+
+SCORING_SYSTEM = (
+    "You are an experienced hiring manager scoring interview answers. "
+    "Score each answer from 1 (poor) to 10 (excellent) for specificity, relevance to the role and "
+    "evidence of impact. Reply with exactly one line per answer, in the order given, formatted as "
+    "ID | SCORE | one short reason. No other text."
+)
+# Per scored answer: id, score and a few words of reason
+TOKENS_PER_ANSWER = 30
+_SCORE_LINE = re.compile(r'^\W*(\d+\.\d+)\W*\|\s*(\d+(?:\.\d+)?)\s*\|\s*(.*)$')
+
+REPORTS = Counter('analytics_reports_total', 'Post-interview reports saved', ('status',))
+SCORING_REQUESTS = Counter('analytics_scoring_requests_total', 'Batched scoring requests', ('outcome',))
+BATCH_ANSWERS = Histogram('analytics_batch_answers', 'Answers scored per LLM request',
+                          buckets=(1, 2, 5, 10, 20, 40, 80))
+
+
+class AnalyticsPipeline:
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self.enabled = False
+        self.workers = 2
+        self.batch_answers = 40
+        self.batch_wait = 2.0
+        self.score_with_llm = False
+        self.store: Optional[ReportStore] = None
+        self._queue = queue.Queue(maxsize=1000)
+        self._started = 0
+
+    def configure(self, config) -> None:
+        self.enabled = bool(config.get('ANALYTICS_ENABLED', self.enabled))
+        self.workers = int(config.get('ANALYTICS_WORKERS', self.workers))
+        self.batch_answers = int(config.get('ANALYTICS_BATCH_ANSWERS', self.batch_answers))
+        self.batch_wait = float(config.get('ANALYTICS_BATCH_WAIT', self.batch_wait))
+        self.score_with_llm = bool(config.get('ANALYTICS_SCORE_WITH_LLM', self.score_with_llm))
+        self._queue = queue.Queue(maxsize=int(config.get('ANALYTICS_MAX_QUEUE', 1000)))
+        if not self.enabled:
+            return
+        self.store = ReportStore(config.get('ANALYTICS_DB_PATH') or ':memory:')
+        while self._started < self.workers:
+            self.socketio.start_background_task(self._run)
+            self._started += 1
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    # ------------------ LIVE PATH ------------------
+    def submit(self, interview_id: str, session) -> bool:
+        """Queue a completed interview for scoring. Never blocks; False if disabled or the queue is full."""
+        if not self.enabled or not session.history:
+            return False
+        transcript = {
+            'interview_id': interview_id,
+            'job_role': session.job_role,
+            'job_desc': session.job_desc,
+            'provider': session.provider,
+            'api_key': session.api_key,
+            'history': [t.to_dict() for t in session.history],
+            'sentiment_trend': session.sentiment_trend,
+            'completed_at': time.time(),
+        }
+        try:
+            self._queue.put_nowait(transcript)
+        except queue.Full:
+            REPORTS.inc(status='dropped')
+            logger.warning("analytics queue full, dropping report for %s", interview_id)
+            return False
+        return True
+
+    # ------------------ WORKERS ------------------
+    def _next_batch(self) -> List[dict]:
+        """Block for one transcript, then gather more for up to batch_wait or batch_answers answers."""
+        batch = [self._queue.get()]
+        answers = len(batch[0]['history'])
+        deadline = time.monotonic() + self.batch_wait
+        while answers < self.batch_answers:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                transcript = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(transcript)
+            answers += len(transcript['history'])
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self.process(batch)
+            except Exception:
+                logger.exception("analytics batch of %d failed", len(batch))
+
+    def process(self, batch: List[dict]) -> List[dict]:
+        """Score, aggregate and save a batch of transcripts; returns the reports."""
+        scores = {}
+        if self.score_with_llm:
+            groups: Dict[tuple, List[dict]] = {}
+            for transcript in batch:
+                groups.setdefault((transcript['provider'], transcript['api_key']), []).append(transcript)
+            for (provider, api_key), transcripts in groups.items():
+                scores.update(self.score(provider, api_key, transcripts))
+
+        reports = []
+        for transcript in batch:
+            report = build_report(transcript, [scores.get((transcript['interview_id'], i))
+                                               for i in range(len(transcript['history']))])
+            if self.store is not None:
+                self.store.save(report)
+            REPORTS.inc(status=report['status'])
+            reports.append(report)
+        return reports
+
+    # ------------------ SCORING ------------------
+    def score(self, provider: str, api_key: str, transcripts: List[dict]) -> dict:
+        """{(interview_id, answer_index): {'score', 'reason'}} for every answer that was scored."""
+        items = [(t['interview_id'], i, t['job_role'], h['answer'])
+                 for t in transcripts for i, h in enumerate(t['history'])]
+        scored = {}
+        for chunk in self._chunks(items):
+            # IDs are candidate.answer, numbered within this request
+            candidates = {}
+            ids, lines = {}, []
+            for interview_id, i, role, answer in chunk:
+                label = f"{candidates.setdefault(interview_id, len(candidates) + 1)}.{i + 1}"
+                ids[label] = (interview_id, i)
+                lines.append(f"{label} [{role}] {answer}")
+            reply = router.complete(api_key, "\n".join(lines), SCORING_SYSTEM, provider,
+                                    max_tokens=TOKENS_PER_ANSWER * len(chunk), hedge=False, priority=BACKGROUND)
+            BATCH_ANSWERS.observe(len(chunk))
+            if reply == FALLBACK_REPLY:
+                SCORING_REQUESTS.inc(outcome='error')
+                continue
+            parsed = parse_scores(reply, ids)
+            SCORING_REQUESTS.inc(outcome='ok' if len(parsed) == len(chunk) else 'partial')
+            scored.update(parsed)
+        return scored
+
+    def _chunks(self, items):
+        """Split answers into requests bounded by batch_answers and the prompt size limit."""
+        budget = PROMPT_MAX_CHARS - 200
+        chunk, size = [], 0
+        for item in items:
+            length = len(item[2]) + len(item[3]) + 12
+            if chunk and (len(chunk) >= self.batch_answers or size + length > budget):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(item)
+            size += length
+        if chunk:
+            yield chunk
+
+
+def parse_scores(reply: str, ids: dict) -> dict:
+    scored = {}
+    for line in reply.splitlines():
+        match = _SCORE_LINE.match(line.strip())
+        if not match or match.group(1) not in ids:
+            continue
+        score = float(match.group(2))
+        if 1 <= score <= 10:
+            scored[ids[match.group(1)]] = {'score': score, 'reason': match.group(3).strip()[:200]}
+    return scored
+
+
+def _slope(values: List[float]) -> float:
+    """Least-squares slope per answer; > 0 means the candidate warmed up over the interview."""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x, mean_y = (n - 1) / 2, sum(values) / n
+    num = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    den = sum((x - mean_x) ** 2 for x in range(n))
+    return num / den
+
+
+def build_report(transcript: dict, scores: List[Optional[dict]]) -> dict:
+    history = transcript['history']
+    trend = transcript['sentiment_trend'] or [h['sentiment'] for h in history]
+    n = len(history)
+    answers = []
+    for h, s in zip(history, scores):
+        answers.append({'answer': h['answer'], 'sentiment': h['sentiment'], 'vague': h['vague'],
+                        'confident': h['confident'], 'words': len(h['answer'].split()),
+                        'score': s['score'] if s else None, 'reason': s['reason'] if s else None})
+    rated = [a['score'] for a in answers if a['score'] is not None]
+    half = n // 2
+    metrics = {
+        'answers': n,
+        'avg_sentiment': round(sum(trend) / len(trend), 3) if trend else 0.0,
+        'sentiment_slope': round(_slope(trend), 3),
+        'sentiment_change': round(sum(trend[half:]) / max(len(trend) - half, 1)
+                                  - sum(trend[:half]) / max(half, 1), 3) if half else 0.0,
+        'vague_rate': round(sum(a['vague'] for a in answers) / n, 3) if n else 0.0,
+        'confident_rate': round(sum(a['confident'] for a in answers) / n, 3) if n else 0.0,
+        'avg_words': round(sum(a['words'] for a in answers) / n, 1) if n else 0.0,
+    }
+    overall = round(sum(rated) / len(rated), 2) if rated else None
+    return {
+        'interview_id': transcript['interview_id'],
+        'job_role': transcript['job_role'],
+        'provider': transcript['provider'],
+        'completed_at': transcript['completed_at'],
+        'status': 'scored' if len(rated) == n else 'partial' if rated else 'unscored',
+        'overall': overall,
+        'metrics': metrics,
+        'answers': answers,
+    }
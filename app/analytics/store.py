@@ -0,0 +1,71 @@
+# app/analytics/store.py
+"""Local store for post-interview reports (SQLite, one row per interview).
+
+The report itself is kept as JSON; the columns alongside it are only what
+the listing API filters and sorts on. Candidate API keys are never stored.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    interview_id TEXT PRIMARY KEY,
+    job_role     TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    overall      REAL,
+    completed_at REAL NOT NULL,
+    scored_at    REAL,
+    report       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_completed ON reports (completed_at DESC);
+"""
+
+
+class ReportStore:
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        # One connection shared by the analytics workers and the API, serialised by the lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+
+    def save(self, report: dict) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (report['interview_id'], report['job_role'], report['status'], report.get('overall'),
+                 report['completed_at'], time.time(), json.dumps(report)))
+
+    def get(self, interview_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT report FROM reports WHERE interview_id = ?", (interview_id,)).fetchone()
+        return json.loads(row['report']) if row else None
+
+    def list(self, limit: int = 50, offset: int = 0, job_role: str = None) -> List[dict]:
+        """Newest first, summary columns only."""
+        query = "SELECT interview_id, job_role, status, overall, completed_at, scored_at FROM reports"
+        args = []
+        if job_role:
+            query += " WHERE job_role = ?"
+            args.append(job_role)
+        query += " ORDER BY completed_at DESC LIMIT ? OFFSET ?"
+        args += [limit, offset]
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, args)]
+
+    def ping(self) -> None:
+        with self._lock:
+            self._db.execute("SELECT 1")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
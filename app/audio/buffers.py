@@ -0,0 +1,81 @@
+# app/audio/buffers.py
+"""Fixed-size byte ring buffer for the audio frame path.
+
+Incoming frames are copied once, straight into a preallocated bytearray via
+memoryview slice assignment; readers get memoryview slices of that storage
+(two when the data wraps) instead of new bytes objects. No per-frame
+allocation, no `buf += frame` re-copying of everything buffered so far.
+Reads and drops move in whole samples (`align` bytes), so the read position
+never lands inside a sample.
+"""
+
+
+class RingBuffer:
+    def __init__(self, capacity: int, align: int = 2):
+        # Keep the capacity a multiple of the sample width so a wrap never splits a sample
+        capacity -= capacity % align
+        self.capacity = capacity
+        self.align = align
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._size = 0
+        self.overruns = 0     # bytes dropped because the reader fell behind
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self._size
+
+    def write(self, data) -> None:
+        """Append bytes-like data; if it doesn't fit, the oldest audio is overwritten."""
+        src = memoryview(data)
+        if src.format != "B":
+            src = src.cast("B")
+        n = len(src)
+        cap = self.capacity
+        if n > cap - self._size:
+            if n > cap:
+                self.overruns += n - cap
+                src, n = src[n - cap:], cap
+            dropped = n - (cap - self._size)
+            if dropped > 0:
+                self.overruns += dropped
+                self.consume(dropped)
+        end = self._start + self._size
+        if end >= cap:
+            end -= cap
+        if end + n <= cap:
+            self._view[end:end + n] = src
+        else:
+            first = cap - end
+            self._view[end:] = src[:first]
+            self._view[:n - first] = src[first:]
+        self._size += n
+
+    def peek(self, n: int = None):
+        """Up to n buffered bytes, whole samples only, as one or two memoryviews (valid until the next write)."""
+        n = self._size if n is None else min(n, self._size)
+        n -= n % self.align
+        first = min(n, self.capacity - self._start)
+        views = [self._view[self._start:self._start + first]]
+        if first < n:
+            views.append(self._view[:n - first])
+        return views
+
+    def consume(self, n: int) -> None:
+        n = min(-(-n // self.align) * self.align, self._size)   # whole samples
+        self._start = (self._start + n) % self.capacity
+        self._size -= n
+
+    def read(self, n: int = None):
+        """peek() + consume(): the views stay valid until the next write."""
+        views = self.peek(n)
+        self.consume(sum(len(v) for v in views))
+        return views
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
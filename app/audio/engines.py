@@ -0,0 +1,154 @@
+# app/audio/engines.py
+"""Pluggable speech engines for server-side audio mode.
+
+An engine only has to implement the small interfaces below; `create_*`
+picks one by name from the registries (add your own class there). The
+bundled local CPU engines are optional dependencies, imported on first use:
+
+    STT_ENGINE=vosk   pip install vosk       STT_MODEL_PATH=/models/vosk-model-small-en-us-0.15
+    TTS_ENGINE=piper  pip install piper-tts  TTS_MODEL_PATH=/models/en_US-lessac-low.onnx
+
+All audio is 16-bit little-endian mono PCM.
+"""
+import json
+from typing import Iterator, Optional
+
+
+class RecognizerStream:
+    """One utterance (or one interview) worth of streaming recognition."""
+
+    def accept(self, pcm) -> Optional[str]:
+        """Feed PCM (bytes-like); returns the updated partial transcript, or None if unchanged."""
+        raise NotImplementedError
+
+    def finish(self) -> str:
+        """Flush and return the final transcript; the stream can be reused afterwards."""
+        raise NotImplementedError
+
+
+class SpeechToText:
+    def open(self, sample_rate: int) -> RecognizerStream:
+        raise NotImplementedError
+
+
+class TextToSpeech:
+    sample_rate = 16000
+
+    def synthesize(self, text: str) -> Iterator[bytes]:
+        """Yield PCM chunks as soon as the engine produces them."""
+        raise NotImplementedError
+
+
+# ------------------ LOCAL CPU ENGINES ------------------
+class VoskRecognizerStream(RecognizerStream):
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self._final = []       # text of segments Kaldi already finalised
+        self._partial = ""
+
+    def accept(self, pcm):
+        # cffi wants bytes: the one copy on the frame path, at the engine boundary
+        if self.recognizer.AcceptWaveform(bytes(pcm)):
+            segment = json.loads(self.recognizer.Result()).get("text", "")
+            if segment:
+                self._final.append(segment)
+            partial = ""
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        text = " ".join(self._final + ([partial] if partial else []))
+        if text == self._partial:
+            return None
+        self._partial = text
+        return text
+
+    def finish(self):
+        tail = json.loads(self.recognizer.FinalResult()).get("text", "")
+        text = " ".join(self._final + ([tail] if tail else []))
+        self._final, self._partial = [], ""
+        return text
+
+
+class VoskSpeechToText(SpeechToText):
+    def __init__(self, model_path: str):
+        try:
+            import vosk
+        except ImportError as e:
+            raise RuntimeError("STT_ENGINE=vosk requires the 'vosk' package") from e
+        if not model_path:
+            raise RuntimeError("STT_ENGINE=vosk requires STT_MODEL_PATH")
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.model = vosk.Model(model_path)   # loaded once, shared by every recognizer
+
+    def open(self, sample_rate):
+        return VoskRecognizerStream(self._vosk.KaldiRecognizer(self.model, sample_rate))
+
+
+class PiperTextToSpeech(TextToSpeech):
+    def __init__(self, model_path: str):
+        try:
+            from piper import PiperVoice
+        except ImportError as e:
+            raise RuntimeError("TTS_ENGINE=piper requires the 'piper-tts' package") from e
+        if not model_path:
+            raise RuntimeError("TTS_ENGINE=piper requires TTS_MODEL_PATH")
+        self.voice = PiperVoice.load(model_path)
+        self.sample_rate = self.voice.config.sample_rate
+
+    def synthesize(self, text):
+        # One chunk per sentence, so the first one can go out before the rest is synthesised
+        yield from self.voice.synthesize_stream_raw(text, sentence_silence=0.0)
+
+
+STT_ENGINES = {'vosk': VoskSpeechToText}
+TTS_ENGINES = {'piper': PiperTextToSpeech}
+
+
+def create_speech_to_text(config) -> SpeechToText:
+    name = config.get('STT_ENGINE', 'vosk')
+    if name not in STT_ENGINES:
+        raise ValueError(f"Unknown STT_ENGINE: {name!r} (choose from {', '.join(STT_ENGINES)})")
+    return STT_ENGINES[name](config.get('STT_MODEL_PATH'))
+
+
+def create_text_to_speech(config) -> TextToSpeech:
+    name = config.get('TTS_ENGINE', 'piper')
+    if name not in TTS_ENGINES:
+        raise ValueError(f"Unknown TTS_ENGINE: {name!r} (choose from {', '.join(TTS_ENGINES)})")
+    return TTS_ENGINES[name](config.get('TTS_MODEL_PATH'))
+
+
+# ------------------ FRAME DECODING ------------------
+class PcmDecoder:
+    """16-bit PCM passes through; a trailing odd byte is held for the next frame so samples stay aligned."""
+
+    def __init__(self):
+        self._carry = b''
+
+    def decode(self, frame):
+        if self._carry:
+            frame = self._carry + bytes(frame)
+        usable = len(frame) - len(frame) % 2
+        self._carry = bytes(frame[usable:])
+        return frame[:usable] if self._carry else frame
+
+
+class OpusDecoder:
+    def __init__(self, sample_rate: int):
+        try:
+            import opuslib
+        except ImportError as e:
+            raise RuntimeError("codec 'opus' requires the 'opuslib' package") from e
+        self._decoder = opuslib.Decoder(sample_rate, 1)
+        self._max_samples = sample_rate * 120 // 1000   # longest Opus frame is 120 ms
+
+    def decode(self, frame):
+        return self._decoder.decode(bytes(frame), self._max_samples)
+
+
+def create_decoder(codec: str, sample_rate: int):
+    if codec == 'pcm16':
+        return PcmDecoder()
+    if codec == 'opus':
+        return OpusDecoder(sample_rate)
+    raise ValueError(f"Unsupported audio codec: {codec!r} (use 'pcm16' or 'opus')")
@@ -0,0 +1,255 @@
+# app/audio/pipeline.py
+"""Server-side audio mode: streamed microphone frames in, synthesised speech out.
+
+The browser sends binary `audio_frame` events (16-bit PCM, or Opus). Frames
+are decoded into a per-interview ring buffer and fed to the recogniser and
+the endpointer (VAD) in fixed-size chunks, so partial transcripts are
+available while the candidate is still speaking and the end of their turn
+is detected here rather than by a client-side silence timeout (`audio_end`
+still ends a turn explicitly). Every line the interviewer says is
+synthesised sentence by sentence and sent back as binary `ai_audio` events
+as soon as each chunk is ready; if the candidate starts talking over it,
+the rest of that reply is dropped (barge-in).
+
+The bundled engines are CPU-bound; under eventlet they hold the hub while
+they run, so audio mode is best served with SOCKETIO_ASYNC_MODE=threading.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import List, NamedTuple, Optional
+
+from .buffers import RingBuffer
+from .engines import create_decoder, create_speech_to_text, create_text_to_speech
+from .vad import Endpointer, VadEvent
+
+logger = logging.getLogger(__name__)
+
+CODECS = ('pcm16', 'opus')
+MIN_SAMPLE_RATE, MAX_SAMPLE_RATE = 8000, 48000
+
+
+def check_format(codec: str, sample_rate: int) -> None:
+    """Raise ValueError for a codec or sample rate the client may not ask for."""
+    if codec not in CODECS:
+        raise ValueError(f"unsupported codec {codec!r} (use {' or '.join(map(repr, CODECS))})")
+    if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+        raise ValueError(f"sample rate {sample_rate} outside {MIN_SAMPLE_RATE}-{MAX_SAMPLE_RATE} Hz")
+
+
+class FeedResult(NamedTuple):
+    partial: Optional[str]      # updated partial transcript, None if unchanged
+    events: List[VadEvent]      # speech start / end of turn detected in this frame
+
+
+class AudioStream:
+    """Inbound audio for one interview: decoder -> ring buffer -> recogniser + endpointer."""
+
+    def __init__(self, recognizer, decoder, sample_rate=16000, chunk_ms=100, buffer_seconds=10, endpointer=None):
+        if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+            raise ValueError(f"sample rate {sample_rate} outside {MIN_SAMPLE_RATE}-{MAX_SAMPLE_RATE} Hz")
+        if chunk_ms <= 0:
+            raise ValueError(f"chunk_ms must be positive, got {chunk_ms}")   # a 0-byte chunk never drains
+        self.recognizer = recognizer
+        self.decoder = decoder
+        self.endpointer = endpointer
+        self.sample_rate = sample_rate
+        self.chunk_bytes = sample_rate * chunk_ms // 1000 * 2   # whole 16-bit samples
+        self.ring = RingBuffer(sample_rate * 2 * buffer_seconds)
+        self.ended_at = None       # monotonic time the last turn ended (for first-audio latency)
+
+    def feed(self, frame) -> FeedResult:
+        self.ring.write(self.decoder.decode(frame))
+        partial, events = None, []
+        while len(self.ring) >= self.chunk_bytes:
+            for view in self.ring.read(self.chunk_bytes):
+                partial = self.recognizer.accept(view) or partial
+                if self.endpointer is not None:
+                    events.extend(self.endpointer.process(view))
+        return FeedResult(partial, events)
+
+    def finish(self) -> str:
+        for view in self.ring.read():
+            self.recognizer.accept(view)
+        if self.endpointer is not None:
+            self.endpointer.reset()
+        self.ended_at = time.monotonic()
+        return self.recognizer.finish()
+
+
+class Speaker:
+    """Serialises synthesis for one interview so sentences are spoken in order."""
+
+    def __init__(self, pipeline, interview_id):
+        self.pipeline = pipeline
+        self.interview_id = interview_id
+        self.queue = queue.Queue()
+        self.utterances = 0
+        self.generation = 0        # bumped by cancel(); stale queued/in-progress lines are dropped
+        self.muted = False         # after a barge-in, until the candidate's turn ends
+        self.busy = False
+        self.playing_until = 0.0   # when the client should finish playing what was sent
+        pipeline.socketio.start_background_task(self._run)
+
+    def say(self, text: str) -> None:
+        if self.muted:
+            return
+        self.utterances += 1
+        self.queue.put((self.utterances, text, self.generation))
+
+    def speaking(self) -> bool:
+        return self.busy or not self.queue.empty() or time.monotonic() < self.playing_until
+
+    def cancel(self) -> int:
+        """Drop everything queued or being synthesised; returns the last utterance id cancelled."""
+        self.generation += 1
+        self.muted = True
+        self.playing_until = 0.0
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        return self.utterances
+
+    def close(self) -> None:
+        self.queue.put(None)
+
+    def _run(self):
+        pipeline = self.pipeline
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            utterance, text, generation = item
+            if generation != self.generation:
+                continue
+            self.busy = True
+            start = time.monotonic()
+            samples = 0
+            try:
+                for pcm in pipeline.tts.synthesize(text):
+                    if generation != self.generation:
+                        break   # barged in mid-sentence
+                    pipeline.first_audio(self.interview_id)
+                    samples += len(pcm) // 2
+                    now = time.monotonic()
+                    self.playing_until = max(self.playing_until, now) + len(pcm) / 2 / pipeline.tts.sample_rate
+                    pipeline.socketio.emit('ai_audio', {'utterance': utterance, 'pcm': pcm, 'last': False,
+                                                        'sample_rate': pipeline.tts.sample_rate},
+                                           to=self.interview_id)
+            except Exception:
+                logger.exception("synthesis failed for %r", text[:40])
+            finally:
+                self.busy = False
+            if generation == self.generation:
+                pipeline.socketio.emit('ai_audio', {'utterance': utterance, 'pcm': b'', 'last': True,
+                                                    'sample_rate': pipeline.tts.sample_rate}, to=self.interview_id)
+            if samples:
+                pipeline.record_synthesis(time.monotonic() - start, samples / pipeline.tts.sample_rate)
+
+
+class AudioPipeline:
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self.enabled = False
+        self.stt = None
+        self.tts = None
+        self.chunk_ms = 100
+        self.buffer_seconds = 10
+        self.vad = True
+        self.barge_in_enabled = True
+        self._config = {}
+        self._streams = {}     # interview_id -> AudioStream
+        self._speakers = {}    # interview_id -> Speaker
+        self._lock = threading.Lock()
+        self.stats = {'frames': 0, 'bytes_in': 0, 'utterances': 0, 'barge_ins': 0,
+                      'synth_seconds': 0.0, 'audio_seconds': 0.0}
+        self.first_audio_latency = deque(maxlen=1000)   # seconds from audio_end to first reply audio
+
+    def configure(self, config) -> None:
+        self.enabled = bool(config.get('AUDIO_ENABLED', self.enabled))
+        self.chunk_ms = int(config.get('AUDIO_CHUNK_MS', self.chunk_ms))
+        self.buffer_seconds = int(config.get('AUDIO_BUFFER_SECONDS', self.buffer_seconds))
+        self.vad = bool(config.get('VAD_ENABLED', self.vad))
+        self.barge_in_enabled = bool(config.get('BARGE_IN_ENABLED', self.barge_in_enabled))
+        self._config = config
+        if self.enabled:
+            # Load models once at startup rather than on the first candidate's turn
+            self.stt = create_speech_to_text(config)
+            self.tts = create_text_to_speech(config)
+
+    @property
+    def real_time_factor(self) -> float:
+        """Synthesis time / audio produced; below 1.0 means faster than real time."""
+        audio = self.stats['audio_seconds']
+        return self.stats['synth_seconds'] / audio if audio else 0.0
+
+    # ------------------ INBOUND ------------------
+    def open(self, interview_id: str, codec: str = 'pcm16', sample_rate: int = 16000) -> AudioStream:
+        check_format(codec, sample_rate)   # before any model or decoder state is created
+        endpointer = Endpointer.from_config(self._config, sample_rate) if self.vad else None
+        stream = AudioStream(self.stt.open(sample_rate), create_decoder(codec, sample_rate),
+                             sample_rate, self.chunk_ms, self.buffer_seconds, endpointer)
+        with self._lock:
+            self._streams[interview_id] = stream
+        return stream
+
+    def get(self, interview_id: str):
+        return self._streams.get(interview_id)
+
+    def feed(self, interview_id: str, frame) -> Optional[FeedResult]:
+        stream = self._streams.get(interview_id)
+        if stream is None:
+            return None
+        self.stats['frames'] += 1
+        self.stats['bytes_in'] += len(frame)
+        return stream.feed(frame)
+
+    def finish(self, interview_id: str):
+        stream = self._streams.get(interview_id)
+        if stream is None:
+            return None
+        self.stats['utterances'] += 1
+        speaker = self._speakers.get(interview_id)
+        if speaker is not None:
+            speaker.muted = False   # their turn is over: the next reply may be spoken
+        return stream.finish()
+
+    def barge_in(self, interview_id: str) -> Optional[int]:
+        """Candidate started talking: if we're still speaking, stop. Returns the last cancelled utterance."""
+        speaker = self._speakers.get(interview_id)
+        if not self.barge_in_enabled or speaker is None or not speaker.speaking():
+            return None
+        self.stats['barge_ins'] += 1
+        return speaker.cancel()
+
+    # ------------------ OUTBOUND ------------------
+    def speak(self, interview_id: str, text: str) -> None:
+        """Queue text for synthesis if this interview is in audio mode."""
+        if interview_id not in self._streams or not text:
+            return
+        with self._lock:
+            speaker = self._speakers.get(interview_id)
+            if speaker is None:
+                speaker = self._speakers[interview_id] = Speaker(self, interview_id)
+        speaker.say(text)
+
+    def first_audio(self, interview_id: str) -> None:
+        stream = self._streams.get(interview_id)
+        if stream is not None and stream.ended_at is not None:
+            self.first_audio_latency.append(time.monotonic() - stream.ended_at)
+            stream.ended_at = None
+
+    def record_synthesis(self, elapsed: float, audio_seconds: float) -> None:
+        self.stats['synth_seconds'] += elapsed
+        self.stats['audio_seconds'] += audio_seconds
+
+    def close(self, interview_id: str) -> None:
+        with self._lock:
+            self._streams.pop(interview_id, None)
+            speaker = self._speakers.pop(interview_id, None)
+        if speaker:
+            speaker.close()
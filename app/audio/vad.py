@@ -0,0 +1,138 @@
+# app/audio/vad.py
+"""Energy-based voice activity detection and end-of-turn endpointing.
+
+Frames (VAD_FRAME_MS) are classified as speech when their level is
+VAD_THRESHOLD_DB above a running noise floor (and above VAD_MIN_DB). The
+per-frame levels and the speech/silence run lengths are computed with NumPy
+over a whole chunk at once; Python only runs once per state change.
+
+    silence --(VAD_ONSET_MS of speech)--> speech
+    speech still voiced VAD_MIN_SPEECH_MS after onset   emits SPEECH_START (barge-in)
+    speech  --(VAD_HANGOVER_MS of silence)--> silence   emits END_OF_TURN
+
+Speech that never gets confirmed (a cough, a click, "mm") ends silently and
+doesn't interrupt the interviewer. The hangover is the latency/cut-off trade-off: every turn waits for it, and
+any mid-answer pause longer than it ends the turn early.
+"""
+from typing import List, NamedTuple
+
+import numpy as np
+
+SPEECH_START = 'speech_start'
+END_OF_TURN = 'end_of_turn'
+
+
+class VadEvent(NamedTuple):
+    kind: str
+    at: float        # audio time (seconds since the stream started) at which it was detected
+
+
+def _run_lengths(mask: np.ndarray, carry: int) -> np.ndarray:
+    """Length of the run of True ending at each position; `carry` continues a run from the last chunk."""
+    idx = np.arange(mask.size)
+    last_false = np.maximum.accumulate(np.where(mask, -1, idx))
+    runs = idx - last_false
+    runs[last_false == -1] += carry
+    return runs
+
+
+class Endpointer:
+    def __init__(self, sample_rate=16000, frame_ms=20, threshold_db=12.0, min_db=-55.0,
+                 onset_ms=100, hangover_ms=900, min_speech_ms=300, floor_rise=0.002):
+        self.sample_rate = sample_rate
+        self.frame = sample_rate * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.threshold_db = threshold_db
+        self.min_db = min_db
+        self.onset = max(1, onset_ms // frame_ms)
+        self.hangover = max(1, hangover_ms // frame_ms)
+        self.min_speech = max(1, min_speech_ms // frame_ms)
+        self.floor_rise = floor_rise        # per-frame rate the noise floor creeps up (it drops instantly)
+        self.noise_floor = None             # dBFS
+        self.speaking = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self._speech_began = 0
+        self._confirmed = False
+        self._frames = 0                    # frames processed so far
+        self._tail = np.zeros(0, dtype=np.int16)
+
+    @classmethod
+    def from_config(cls, config, sample_rate=16000):
+        return cls(sample_rate,
+                   frame_ms=int(config.get('VAD_FRAME_MS', 20)),
+                   threshold_db=float(config.get('VAD_THRESHOLD_DB', 12.0)),
+                   min_db=float(config.get('VAD_MIN_DB', -55.0)),
+                   onset_ms=int(config.get('VAD_ONSET_MS', 100)),
+                   hangover_ms=int(config.get('VAD_HANGOVER_MS', 900)),
+                   min_speech_ms=int(config.get('VAD_MIN_SPEECH_MS', 300)))
+
+    def levels(self, pcm) -> np.ndarray:
+        """dBFS of every complete frame in pcm (16-bit LE); a partial frame is kept for next time."""
+        samples = np.frombuffer(pcm, dtype='<i2')   # a view, no copy
+        if self._tail.size:
+            samples = np.concatenate((self._tail, samples))
+        usable = samples.size - samples.size % self.frame
+        self._tail = samples[usable:].copy()
+        frames = samples[:usable].reshape(-1, self.frame).astype(np.float32)
+        power = np.mean(frames * frames, axis=1) / (32768.0 * 32768.0)
+        return 10.0 * np.log10(power + 1e-10)
+
+    def _update_floor(self, db: np.ndarray) -> None:
+        low = float(db.min())
+        if self.noise_floor is None or low < self.noise_floor:
+            self.noise_floor = low
+        else:
+            self.noise_floor += (1.0 - (1.0 - self.floor_rise) ** db.size) * (low - self.noise_floor)
+
+    def process(self, pcm) -> List[VadEvent]:
+        db = self.levels(pcm)
+        if not db.size:
+            return []
+        if self.noise_floor is None:
+            self._update_floor(db)
+        mask = db > max(self.noise_floor + self.threshold_db, self.min_db)
+        self._update_floor(db)
+
+        events = []
+        base, pos, n = self._frames, 0, mask.size
+        while pos < n:
+            if not self.speaking:
+                runs = _run_lengths(mask[pos:], self._speech_run)
+                hits = np.flatnonzero(runs >= self.onset)
+                if not hits.size:
+                    self._speech_run = int(runs[-1])
+                    break
+                i = pos + int(hits[0])
+                self.speaking = True
+                self._confirmed = False
+                self._speech_began = base + i + 1 - self.onset
+                self._silence_run = 0
+            else:
+                runs = _run_lengths(~mask[pos:], self._silence_run)
+                hits = np.flatnonzero(runs >= self.hangover)
+                end = pos + int(hits[0]) if hits.size else n
+                if not self._confirmed:
+                    # First voiced frame at least min_speech after onset, before the hangover runs out
+                    first = max(pos, self._speech_began + self.min_speech - base)
+                    voiced = np.flatnonzero(mask[first:end]) if first < end else ()
+                    if len(voiced):
+                        self._confirmed = True
+                        events.append(VadEvent(SPEECH_START, (base + first + int(voiced[0]) + 1) * self.frame_ms / 1000))
+                if not hits.size:
+                    self._silence_run = int(runs[-1])
+                    break
+                i = end
+                self.speaking = False
+                self._speech_run = 0
+                if self._confirmed:
+                    events.append(VadEvent(END_OF_TURN, (base + i + 1) * self.frame_ms / 1000))
+            pos = i + 1
+        self._frames += n
+        return events
+
+    def reset(self) -> None:
+        """Start a new turn; the learned noise floor is kept."""
+        self.speaking = self._confirmed = False
+        self._speech_run = self._silence_run = 0
+        self._tail = np.zeros(0, dtype=np.int16)
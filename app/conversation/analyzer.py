@@ -0,0 +1,137 @@
+# app/conversation/analyzer.py
+"""Single-pass keyword analysis of candidate answers.
+
+The answer is lower-cased and split into words once; indicator phrases are
+looked up by whole words (keyed on their first word, longest phrase first),
+so one pass covers every category and "hard" no longer fires on "hardware",
+nor "well" on "welcome", and a phrase never matches across punctuation.
+Indicator lists can be overridden from a JSON file (INDICATORS_FILE), which
+is re-read when it changes on disk:
+
+    {"positive": [...], "negative": [...], "confidence": [...], "vague": [...]}
+"""
+import json
+import os
+import string
+import threading
+import time
+from typing import Dict, List, NamedTuple
+
+DEFAULT_INDICATORS = {
+    "positive": [
+        "excited", "love", "passionate", "enjoy", "thrilled", "proud",
+        "accomplished", "satisfied", "motivated", "inspired"
+    ],
+    "negative": [
+        "frustrated", "disappointed", "struggled", "challenged", "difficult",
+        "tough", "stress", "overwhelmed", "hard", "struggle"
+    ],
+    "confidence": [
+        "definitely", "clearly", "absolutely", "confidently", "certainly",
+        "undoubtedly", "without a doubt", "sure"
+    ],
+    "vague": [
+        "kind of", "sort of", "maybe", "a bit", "somewhat", "pretty much",
+        "thing is", "well", "um", "uh"
+    ],
+}
+
+
+class TextAnalysis(NamedTuple):
+    sentiment: int            # -1 negative, 0 neutral, 1 positive
+    vague: bool
+    confident: bool
+    counts: Dict[str, int]    # matches per category
+
+
+# Punctuation (ASCII and the usual typographic marks) becomes a "." word of its own, so
+# "kind, of" is not "kind of". str.translate + split is several times faster than a \w+
+# regex over a long answer.
+_BREAKS = str.maketrans(dict.fromkeys(string.punctuation + "\u2018\u2019\u201c\u201d\u2013\u2014\u2026", " . "))
+
+
+def _words(text: str) -> List[str]:
+    return text.lower().translate(_BREAKS).split()
+
+
+class TextAnalyzer:
+    def __init__(self, indicators: Dict[str, List[str]] = None):
+        self.indicators = {k: list(v) for k, v in (indicators or DEFAULT_INDICATORS).items()}
+        self._categories = {}   # phrase as space-joined words -> categories it belongs to
+        lengths = {}            # first word -> word counts of the phrases starting with it
+        for category, phrases in self.indicators.items():
+            for phrase in phrases:
+                words = _words(phrase)
+                if words:
+                    self._categories.setdefault(" ".join(words), []).append(category)
+                    lengths.setdefault(words[0], set()).add(len(words))
+        self._lengths = {word: sorted(n, reverse=True) for word, n in lengths.items()}   # longest first
+
+    def analyze(self, text: str) -> TextAnalysis:
+        counts = dict.fromkeys(self.indicators, 0)
+        categories, starts = self._categories, self._lengths
+        words = _words(text)
+        end = 0   # matches don't overlap: skip the words of the last one
+        for i in [i for i, word in enumerate(words) if word in starts]:
+            if i < end:
+                continue
+            word = words[i]
+            for n in starts[word]:
+                found = categories.get(word if n == 1 else " ".join(words[i:i + n]))
+                if found:
+                    for category in found:
+                        counts[category] += 1
+                    end = i + n
+                    break
+        pos, neg = counts.get("positive", 0), counts.get("negative", 0)
+        sentiment = 1 if pos > neg else -1 if neg > pos else 0
+        return TextAnalysis(sentiment, counts.get("vague", 0) > 0, counts.get("confidence", 0) > 0, counts)
+
+
+# ------------------ HOT-RELOADABLE SINGLETON ------------------
+_state = {"path": None, "mtime": None, "checked": 0.0, "analyzer": TextAnalyzer()}
+_lock = threading.Lock()
+RELOAD_CHECK_INTERVAL = 1.0   # seconds between mtime checks
+
+
+def configure(config) -> None:
+    """Point the analyzer at INDICATORS_FILE (if set) and load it now."""
+    with _lock:
+        _state.update(path=config.get("INDICATORS_FILE") or None, mtime=None, checked=0.0)
+    get_analyzer()
+
+
+def _check_indicators(data) -> Dict[str, List[str]]:
+    """Raise ValueError unless data is {category: [phrase, ...]}."""
+    if not isinstance(data, dict):
+        raise ValueError("indicators file must hold a JSON object")
+    for category, phrases in data.items():
+        if not isinstance(phrases, list) or not all(isinstance(p, str) for p in phrases):
+            raise ValueError(f"indicators[{category!r}] must be a list of strings")
+    return data
+
+
+def get_analyzer() -> TextAnalyzer:
+    path = _state["path"]
+    now = time.monotonic()
+    if path is None or now - _state["checked"] < RELOAD_CHECK_INTERVAL:
+        return _state["analyzer"]
+    with _lock:
+        _state["checked"] = now
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return _state["analyzer"]   # keep the last good lists if the file vanished
+        if mtime != _state["mtime"]:
+            _state["mtime"] = mtime
+            try:
+                with open(path, encoding="utf-8") as f:
+                    analyzer = TextAnalyzer({**DEFAULT_INDICATORS, **_check_indicators(json.load(f))})
+            except (OSError, ValueError):
+                return _state["analyzer"]   # half-written / invalid file: wait for the next change
+            _state["analyzer"] = analyzer
+    return _state["analyzer"]
+
+
+def analyze_text(text: str) -> TextAnalysis:
+    return get_analyzer().analyze(text)
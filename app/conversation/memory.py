@@ -1,7 +1,103 @@
 # app/conversation/memory.py
 from typing import List, Dict, Optional
 
+# Rolling context window limits; overridden from app.config by configure()
+settings = {
+    'CONTEXT_TOKEN_BUDGET': 400,     # whole "previous answers" block
+    'CONTEXT_RECENT_TURNS': 3,       # newest answers kept verbatim
+    'CONTEXT_SUMMARY_TOKENS': 150,   # running summary of everything older
+    'CONTEXT_SUMMARY_WORDS_PER_TURN': 20,
+}
+
+
+def configure(config) -> None:
+    for key in settings:
+        if config.get(key) is not None:
+            settings[key] = int(config[key])
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English with BPE tokenizers; cheap and good enough for budgeting
+    return (len(text) + 3) // 4
+
+
+def _trim_words(text: str, max_tokens: int, keep: str = 'head') -> str:
+    """Drop whole words until text fits max_tokens (from the tail, or from the head if keep='tail')."""
+    max_chars = max_tokens * 4   # inverse of estimate_tokens
+    if len(text) <= max_chars:
+        return text
+    words = text.split()
+    kept, used = [], -1
+    for word in (words if keep == 'head' else reversed(words)):
+        if used + len(word) + 1 > max_chars:
+            break
+        kept.append(word)
+        used += len(word) + 1
+    return " ".join(kept if keep == 'head' else reversed(kept))
+
+
+def _compact_answer(answer: str) -> str:
+    """First sentence of an answer, capped in words: the gist, not the transcript."""
+    first = answer.split('. ')[0].rstrip('.')
+    words = first.split()
+    limit = settings['CONTEXT_SUMMARY_WORDS_PER_TURN']
+    return " ".join(words[:limit]) + ("…" if len(words) > limit else "")
+
+
+def build_context(session) -> str:
+    """Token-budgeted history for the prompt: running summary + newest answers verbatim.
+
+    Cost is bounded by the budget, not by interview length; older answers are
+    folded into session.summary by compact_history().
+    """
+    history = session.history
+    budget = settings['CONTEXT_TOKEN_BUDGET']
+    recent_start = max(session.summarized, len(history) - settings['CONTEXT_RECENT_TURNS'])
+
+    lines = []
+    # Answers not yet folded into the summary (compaction lags a turn): keep their gist
+    for i in range(session.summarized, recent_start):
+        lines.append(f"Answer {i+1} (gist): {_compact_answer(history[i].answer)}")
+    for i in range(recent_start, len(history)):
+        lines.append(f"Answer {i+1}: {history[i].answer}")
+
+    # Newest lines win; drop the oldest verbatim/gist lines if they alone blow the budget
+    used = 0
+    kept = []
+    for line in reversed(lines):
+        cost = estimate_tokens(line) + 1
+        if kept and used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    kept.reverse()
+
+    summary = session.summary
+    if summary and used < budget:
+        summary = _trim_words(summary, min(settings['CONTEXT_SUMMARY_TOKENS'], budget - used), keep='tail')
+        if summary:
+            kept.insert(0, f"Earlier in the interview: {summary}")
+    return "\n".join(kept)
+
+
+def compact_history(session) -> None:
+    """Fold answers that fell out of the verbatim window into the running summary.
+
+    Runs after the reply has been emitted, so it never adds to turn latency.
+    """
+    history = session.history
+    upto = len(history) - settings['CONTEXT_RECENT_TURNS']
+    if upto <= session.summarized:
+        return
+    gists = [_compact_answer(t.answer) for t in history[session.summarized:upto]]
+    summary = " | ".join(filter(None, [session.summary] + gists))
+    session.summary = _trim_words(summary, settings['CONTEXT_SUMMARY_TOKENS'], keep='tail')
+    session.summarized = upto
+
+
 class InterviewMemory:
+    __slots__ = ('candidate_name', 'transcript', 'key_topics', 'follow_up_queue', 'detected_contradictions')
+
     def __init__(self):
         self.candidate_name: str = ""
         self.transcript: List[Dict] = []  # [{"speaker": "user", "text": "..."}, ...]
@@ -16,4 +112,5 @@ class InterviewMemory:
     def get_context_summary(self, max_words=100) -> str:
         # Summarize last 3 exchanges for LLM context window
         recent = self.transcript[-3:]
-        return " ".join([msg["text"] for msg in recent])[:max_words]
\ No newline at end of file
+        words = " ".join([msg["text"] for msg in recent]).split()
+        return " ".join(words[:max_words])
@@ -0,0 +1,281 @@
+# app/conversation/question_bank.py
+"""Role-indexed question bank: early turns answered without an LLM call.
+
+Hundreds of candidates interview for the same posting, and their opening
+turns mostly want the same thing: a good first question about the role.
+The bank holds prepared questions per role (plus generic ones, role `*`),
+each embedded offline as a hashed TF-IDF vector of its text and skill tags.
+The L2-normalised vectors are the columns of one float32 (dim x questions)
+matrix, with each role's questions side by side.
+
+A lookup scores the posting's role columns plus the generic ones against
+the job description (once per posting, then cached) and the latest answer.
+A query only has a few dozen non-zero hashed features, so scoring reads
+just those rows of the column block: one small (features x questions)
+product instead of the whole matrix. The best question not just asked
+wins, if it clears QUESTION_BANK_MIN_SCORE. Only answers up to
+QUESTION_BANK_TURNS are served this way; later, novel follow-ups still go
+to the LLM.
+
+Build the bank offline from JSON lines ({"role", "question", "skills"}):
+
+    python -m app.conversation.question_bank build data/question_bank.jsonl instance/question_bank.npz
+    python -m app.conversation.question_bank query instance/question_bank.npz "Backend Engineer" "Python APIs" "I built..."
+
+QUESTION_BANK_PATH may also point straight at a .jsonl file; it is then
+built at start-up.
+"""
+import argparse
+import json
+import math
+import re
+import sys
+import threading
+import zlib
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+GENERIC = '*'
+ROLE_MATCH = 0.1   # least similarity for an unlisted job title to borrow a role's questions
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#/.-]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from has have how i in is it its me my of on or our so that "
+    "the their them then there they this to was we were what when where which who will with you your".split())
+
+# Short acknowledgement before the question, by the tone the turn would have asked the LLM for
+ACKNOWLEDGEMENTS = {
+    'negative': ("Thank you for being so open about that.", "I appreciate you sharing that honestly."),
+    'vague': ("Thanks. Let's get a little more concrete.", "Okay, let's dig into some specifics."),
+    'neutral': ("Thanks, that's a helpful overview.", "Great, that gives me a good picture.",
+                "Thanks for walking me through that."),
+}
+
+
+def normalize_role(role: str) -> str:
+    return " ".join(role.lower().split())
+
+
+def _stem(word: str) -> str:
+    # Plurals only: "migrations" and "migration" should meet, without a stemmer dependency
+    return word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+
+
+def features(text: str) -> List[str]:
+    """Lower-cased words (plurals folded) minus stopwords, plus adjacent-word bigrams."""
+    words = [_stem(w) for w in _WORD.findall(text.lower()) if w not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    # Signed feature hashing: collisions cancel out on average instead of piling up
+    h = zlib.crc32(feature.encode())
+    return h % dim, (-1.0 if h & 0x80000000 else 1.0)
+
+
+def term_weights(text: str, dim: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sparse hashed term frequencies of `text`: (bucket indices, sublinear tf weights)."""
+    weights = {}
+    for feature, count in Counter(features(text)).items():
+        i, sign = _bucket(feature, dim)
+        weights[i] = weights.get(i, 0.0) + sign * (1.0 + math.log(count))
+    return np.fromiter(weights, dtype=np.intp, count=len(weights)), \
+        np.fromiter(weights.values(), dtype=np.float32, count=len(weights))
+
+
+class QuestionBank:
+    def __init__(self):
+        self.enabled = False
+        self.max_turns = 1
+        self.min_score = 0.05
+        self.answer_weight = 0.5
+        self.dim = 0
+        self.questions: List[str] = []
+        self.skills: List[List[str]] = []
+        self.roles: List[str] = []
+        self.columns = np.zeros((0, 0), dtype=np.float32)   # (dim, questions), one unit vector per column
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.role_vectors = np.zeros((0, 0), dtype=np.float32)
+        self.offsets = np.zeros(1, dtype=np.int64)   # columns of role r: offsets[r]:offsets[r + 1]
+        self._role_ids = {}
+        self._postings = {}                          # (job_role, job_desc) -> (slices, columns, jd scores)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def configure(self, config) -> None:
+        self.max_turns = int(config.get('QUESTION_BANK_TURNS', self.max_turns))
+        self.min_score = float(config.get('QUESTION_BANK_MIN_SCORE', self.min_score))
+        self.answer_weight = float(config.get('QUESTION_BANK_ANSWER_WEIGHT', self.answer_weight))
+        path = config.get('QUESTION_BANK_PATH')
+        if not path:
+            self.enabled = False
+            return
+        if path.endswith('.jsonl'):
+            self.build(read_jsonl(path))
+        else:
+            self.load(path)
+        self.enabled = self.max_turns > 0 and len(self.questions) > 0
+
+    def __len__(self):
+        return len(self.questions)
+
+    # ------------------ BUILD / LOAD ------------------
+    def build(self, entries: Iterable[dict], dim: int = 1024) -> 'QuestionBank':
+        """Embed entries ({'role', 'question', 'skills'}) into role-grouped columns."""
+        rows = sorted(((normalize_role(e.get('role') or GENERIC), e['question'], list(e.get('skills') or ()))
+                       for e in entries), key=lambda r: r[0])
+        # Skill tags count twice: they're what the posting's description is most likely to mention
+        terms = [term_weights(f"{q} {' '.join(skills)} {' '.join(skills)}", dim) for _, q, skills in rows]
+        df = np.zeros(dim, dtype=np.int64)
+        for idx, _ in terms:
+            df[idx] += 1
+        idf = (np.log((1 + len(rows)) / (1 + df)) + 1).astype(np.float32)
+        columns = np.zeros((dim, len(rows)), dtype=np.float32)
+        for j, (idx, tf) in enumerate(terms):
+            weights = tf * idf[idx]
+            columns[idx, j] = weights / (np.linalg.norm(weights) or 1)
+        roles = sorted({r for r, _, _ in rows})
+        counts = Counter(r for r, _, _ in rows)
+        self._set(dim, idf, columns, [q for _, q, _ in rows], [s for _, _, s in rows],
+                  roles, np.concatenate([[0], np.cumsum([counts[r] for r in roles])]).astype(np.int64))
+        return self
+
+    def _set(self, dim, idf, columns, questions, skills, roles, offsets) -> None:
+        # A role is described by the centroid of its questions (and skill tags), so a posting titled
+        # differently ("Senior Python Developer") still finds it through its description
+        role_vectors = np.zeros((len(roles), dim), dtype=np.float32)
+        for i in range(len(roles)):
+            centroid = columns[:, offsets[i]:offsets[i + 1]].mean(axis=1)
+            role_vectors[i] = centroid / (np.linalg.norm(centroid) or 1)
+        with self._lock:
+            self.dim, self.idf, self.columns = dim, idf, np.ascontiguousarray(columns, dtype=np.float32)
+            self.questions, self.skills, self.roles, self.offsets = questions, skills, roles, offsets
+            self.role_vectors = role_vectors
+            self._role_ids = {r: i for i, r in enumerate(roles)}
+            self._postings = {}
+
+    def save(self, path: str) -> None:
+        meta = {'version': FORMAT_VERSION, 'roles': self.roles, 'questions': self.questions, 'skills': self.skills}
+        with open(path, 'wb') as f:   # a file object, so numpy doesn't append .npz to the name
+            np.savez(f, columns=self.columns, idf=self.idf, offsets=self.offsets,
+                     meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8))
+
+    def load(self, path: str) -> 'QuestionBank':
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(data['meta'].tobytes())
+            if meta.get('version') != FORMAT_VERSION:
+                raise ValueError(f"{path}: question bank format {meta.get('version')}, expected {FORMAT_VERSION}")
+            idf = data['idf']
+            self._set(len(idf), idf, data['columns'], meta['questions'], meta['skills'], meta['roles'],
+                      data['offsets'])
+        return self
+
+    # ------------------ LOOKUP ------------------
+    def embed(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse unit TF-IDF vector of `text`: (bucket indices, weights)."""
+        idx, tf = term_weights(text, self.dim)
+        weights = tf * self.idf[idx]
+        norm = np.linalg.norm(weights)
+        return idx, (weights / norm if norm else weights)
+
+    def _scores(self, query, slices) -> np.ndarray:
+        """Cosine similarity of a sparse query with every column in `slices`."""
+        idx, weights = query
+        if not len(idx):
+            return np.zeros(sum(s.stop - s.start for s in slices), dtype=np.float32)
+        # Only the query's non-zero rows of each column block are read
+        return np.concatenate([weights @ self.columns[idx, s] for s in slices])
+
+    def _posting(self, job_role: str, job_desc: str):
+        """(column slices, their question numbers, job description scores); computed once per posting."""
+        key = (job_role, job_desc)
+        found = self._postings.get(key)
+        if found is not None:
+            return found
+        role_id = self._role_ids.get(normalize_role(job_role))
+        jd = self.embed(f"{job_role} {job_desc}")
+        if role_id is None and len(self.role_vectors) and len(jd[0]):
+            # Unknown title: the nearest role by name and description, if it's close at all
+            scores = self.role_vectors[:, jd[0]] @ jd[1]
+            best = int(np.argmax(scores))
+            if scores[best] >= ROLE_MATCH and self.roles[best] != GENERIC:
+                role_id = best
+        slices = [slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+                  for i in (role_id, self._role_ids.get(GENERIC)) if i is not None]
+        columns = np.concatenate([np.arange(s.start, s.stop) for s in slices]) if slices else np.zeros(0, np.intp)
+        found = (slices, columns, self._scores(jd, slices) if slices else np.zeros(0, np.float32))
+        with self._lock:
+            if len(self._postings) >= 4096:
+                self._postings.clear()
+            self._postings[key] = found
+        return found
+
+    def lookup(self, job_role: str, job_desc: str, answer: str = '', k: int = 3) -> List[Tuple[float, str]]:
+        """Best k (score, question) for the posting and latest answer, best first."""
+        if not self.questions:
+            return []
+        slices, columns, jd_scores = self._posting(job_role, job_desc)
+        if not len(columns):
+            return []
+        scores = (1 - self.answer_weight) * jd_scores + self.answer_weight * self._scores(self.embed(answer), slices)
+        top = np.argpartition(scores, -k)[-k:] if len(scores) > k else np.arange(len(scores))
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(float(scores[i]), self.questions[columns[i]]) for i in top]
+
+    def reply(self, job_role: str, job_desc: str, answer: str, analysis, exclude: str = '') -> Optional[str]:
+        """An acknowledgement plus the best-matching question, or None if nothing scores high enough."""
+        for score, question in self.lookup(job_role, job_desc, answer):
+            if score < self.min_score:
+                break
+            if question in exclude:
+                continue   # just asked it
+            self.stats['hits'] += 1
+            tone = 'negative' if analysis.sentiment < 0 else 'vague' if analysis.vague else 'neutral'
+            options = ACKNOWLEDGEMENTS[tone]
+            return f"{options[zlib.crc32(answer.encode()) % len(options)]} {question}"
+        self.stats['misses'] += 1
+        return None
+
+
+def read_jsonl(path: str) -> List[dict]:
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+question_bank = QuestionBank()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m app.conversation.question_bank', description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='embed a JSON-lines question file into a .npz bank')
+    build.add_argument('source')
+    build.add_argument('output')
+    build.add_argument('--dim', type=int, default=1024, help='hashed feature dimensions')
+    query = commands.add_parser('query', help='show the best questions for a posting and answer')
+    query.add_argument('bank')
+    query.add_argument('job_role')
+    query.add_argument('job_desc')
+    query.add_argument('answer', nargs='?', default='')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        bank = QuestionBank().build(read_jsonl(args.source), dim=args.dim)
+        bank.save(args.output)
+        print(f"{len(bank)} questions, {len(bank.roles)} roles, {bank.columns.nbytes / 2 ** 20:.1f} MB -> {args.output}")
+        return 0
+    bank = QuestionBank()
+    if args.bank.endswith('.jsonl'):
+        bank.build(read_jsonl(args.bank))
+    else:
+        bank.load(args.bank)
+    for score, question in bank.lookup(args.job_role, args.job_desc, args.answer, k=5):
+        print(f"{score:.3f}  {question}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
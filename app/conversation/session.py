@@ -0,0 +1,169 @@
+# app/conversation/session.py
+"""Compact interview session state.
+
+A session used to be a dict of dicts: every answer a four-key dict, a
+parallel sentiment list, and its own copies of the posting's role and
+description. Here it is a slotted object:
+
+- `Posting` (role + description) is interned: every session for the same
+  posting shares one instance.
+- A `Turn` is the answer plus one small int packing sentiment, vague and
+  confident; the sentiment trend is derived from the turns, not stored.
+- The running context summary is two plain attributes.
+- `answer_seq` is the client's sequence number of the last answer taken into
+  a turn, so an answer re-sent after a reconnect isn't answered twice.
+
+`dumps()`/`loads()` move a session between processes or stores as a
+positional array (no repeated key names), msgpack-encoded when `msgpack`
+is installed, compact JSON otherwise. The first byte says which, and
+dict-shaped JSON sessions stored before this format still load.
+"""
+import json
+import sys
+import threading
+import weakref
+from typing import List, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMAT_VERSION = 2   # 2 added answer_seq; version-1 lists still load
+_MSGPACK, _JSON = b'm', b'j'
+
+_VAGUE = 1
+_CONFIDENT = 2
+_SENTIMENT_SHIFT = 2    # sentiment -1/0/1 stored as 0/1/2 in bits 2-3
+
+
+class Posting:
+    __slots__ = ('job_role', 'job_desc', '__weakref__')
+
+    def __init__(self, job_role: str, job_desc: str):
+        self.job_role = job_role
+        self.job_desc = job_desc
+
+
+_postings = weakref.WeakValueDictionary()
+_postings_lock = threading.Lock()
+
+
+def posting(job_role: str, job_desc: str) -> Posting:
+    """The shared Posting for this role/description (kept alive by the sessions using it)."""
+    key = (job_role, job_desc)
+    with _postings_lock:
+        found = _postings.get(key)
+        if found is None:
+            found = _postings[key] = Posting(sys.intern(job_role), job_desc)
+        return found
+
+
+class Turn:
+    __slots__ = ('answer', 'flags')
+
+    def __init__(self, answer: str, flags: int = 0):
+        self.answer = answer
+        self.flags = flags
+
+    @classmethod
+    def of(cls, answer: str, sentiment: int, vague: bool, confident: bool) -> 'Turn':
+        return cls(answer, ((sentiment + 1) << _SENTIMENT_SHIFT) | (_VAGUE if vague else 0)
+                   | (_CONFIDENT if confident else 0))
+
+    @property
+    def sentiment(self) -> int:
+        return (self.flags >> _SENTIMENT_SHIFT) - 1
+
+    @property
+    def vague(self) -> bool:
+        return bool(self.flags & _VAGUE)
+
+    @property
+    def confident(self) -> bool:
+        return bool(self.flags & _CONFIDENT)
+
+    def to_dict(self) -> dict:
+        """The shape clients (interview_complete) and reports expect."""
+        return {'answer': self.answer, 'sentiment': self.sentiment, 'vague': self.vague,
+                'confident': self.confident}
+
+
+class Session:
+    __slots__ = ('api_key', 'provider', 'posting', 'questions_asked', 'max_questions', 'history',
+                 'last_ai_text', 'summary', 'summarized', 'answer_seq')
+
+    def __init__(self, api_key: Optional[str], provider: str, posting: Posting, last_ai_text: str = '',
+                 max_questions: int = 5, questions_asked: int = 0, history: List[Turn] = None,
+                 summary: str = '', summarized: int = 0, answer_seq: int = 0):
+        self.api_key = api_key
+        self.provider = sys.intern(provider)
+        self.posting = posting
+        self.questions_asked = questions_asked
+        self.max_questions = max_questions
+        self.history = history if history is not None else []
+        self.last_ai_text = last_ai_text     # replayed to the candidate on resume
+        self.summary = summary               # running summary of answers older than the verbatim window
+        self.summarized = summarized         # answers folded into it so far
+        self.answer_seq = answer_seq         # client seq of the last answer taken into a turn
+
+    @property
+    def job_role(self) -> str:
+        return self.posting.job_role
+
+    @property
+    def job_desc(self) -> str:
+        return self.posting.job_desc
+
+    @property
+    def sentiment_trend(self) -> List[int]:
+        return [t.sentiment for t in self.history]
+
+    def preview(self, answer: str) -> 'Session':
+        """A copy with one more (unanalysed) answer, for speculating on a partial transcript."""
+        return Session(self.api_key, self.provider, self.posting, self.last_ai_text, self.max_questions,
+                       self.questions_asked, self.history + [Turn(answer)], self.summary, self.summarized,
+                       self.answer_seq)
+
+    # ------------------ SERIALISATION ------------------
+    def to_list(self) -> list:
+        return [FORMAT_VERSION, self.api_key, self.provider, self.job_role, self.job_desc, self.questions_asked,
+                self.max_questions, self.last_ai_text, self.summary, self.summarized,
+                [x for t in self.history for x in (t.answer, t.flags)], self.answer_seq]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Session':
+        """The old dict-shaped session (still in Redis from before an upgrade)."""
+        context = data.get('context') or {}
+        history = [Turn.of(h['answer'], h['sentiment'], h['vague'], h['confident']) for h in data['history']]
+        return cls(data['api_key'], data['provider'], posting(data['job_role'], data['job_desc']),
+                   data.get('last_ai_text', ''), data['max_questions'], data['questions_asked'], history,
+                   context.get('summary', ''), context.get('summarized', 0))
+
+    @classmethod
+    def from_list(cls, data: list) -> 'Session':
+        (_, api_key, provider, job_role, job_desc, questions_asked, max_questions, last_ai_text,
+         summary, summarized, turns, *rest) = data
+        history = [Turn(turns[i], turns[i + 1]) for i in range(0, len(turns), 2)]
+        return cls(api_key, provider, posting(job_role, job_desc), last_ai_text, max_questions,
+                   questions_asked, history, summary, summarized, rest[0] if rest else 0)
+
+
+def dumps(session: Session) -> bytes:
+    data = session.to_list()
+    if msgpack is not None:
+        return _MSGPACK + msgpack.packb(data, use_bin_type=True)
+    return _JSON + json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def loads(raw: bytes) -> Session:
+    kind, body = raw[:1], raw[1:]
+    if kind == _MSGPACK:
+        if msgpack is None:
+            raise RuntimeError("session was stored with msgpack; install the 'msgpack' package")
+        return Session.from_list(msgpack.unpackb(body, raw=False))
+    if kind == _JSON:
+        return Session.from_list(json.loads(body))
+    if kind == b'{':
+        return Session.from_dict(json.loads(raw))
+    raise ValueError(f"unknown session encoding {kind!r}")
@@ -0,0 +1,148 @@
+# app/conversation/session_store.py
+"""Interview session storage.
+
+`MemorySessionStore` keeps sessions in-process (LRU + sliding TTL);
+`RedisSessionStore` keeps them in Redis so any worker can serve any turn.
+Sessions are `Session` objects (kept as-is in memory, serialised with
+session.dumps() in Redis); call `save()` after mutating one.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .session import Session, dumps, loads
+
+
+class SessionStore:
+    def get(self, key: str) -> Optional[Session]:
+        raise NotImplementedError
+
+    def save(self, key: str, session: Session) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> Optional[Session]:
+        raise NotImplementedError
+
+    def touch(self, key: str, ttl: float) -> None:
+        """Reset a session's time-to-live (e.g. a short grace window after disconnect)."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self, ttl: float = 3600, max_sessions: int = 10000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._data = OrderedDict()   # key -> (expires_at, session), oldest first
+        self._short = {}             # key -> expires_at, for entries touch() gave less than the full ttl
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._data[key]
+                self._short.pop(key, None)
+                return None
+            # Sliding expiry: any access keeps the interview alive
+            self._data[key] = (now + self.ttl, entry[1])
+            self._short.pop(key, None)
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def save(self, key, session):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (now + self.ttl, session)
+            self._data.move_to_end(key)
+            self._short.pop(key, None)
+            self._evict(now)
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            self._short.pop(key, None)
+        return entry[1] if entry else None
+
+    def touch(self, key, ttl):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at = time.monotonic() + ttl
+                self._data[key] = (expires_at, entry[1])
+                if ttl < self.ttl:
+                    self._short[key] = expires_at
+                else:
+                    self._short.pop(key, None)
+
+    def _evict(self, now):
+        # A shortened expiry (a disconnect grace window) is out of order, so those are swept on their own
+        for key in [k for k, expires_at in self._short.items() if expires_at <= now]:
+            del self._data[key], self._short[key]
+        # Everything else was stamped with the full ttl, oldest first, so expired entries cluster at the front
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now and len(self._data) <= self.max_sessions:
+                break
+            del self._data[key]
+            self._short.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisSessionStore(SessionStore):
+    def __init__(self, url: str = "redis://localhost:6379/0", ttl: float = 3600,
+                 prefix: str = "interview:", client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("SESSION_STORE=redis requires the 'redis' package") from e
+            client = redis.Redis.from_url(url)
+        self.client = client   # anything speaking the redis-py API (e.g. fakeredis)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def get(self, key):
+        pipe = self.client.pipeline()
+        pipe.get(self.prefix + key)
+        pipe.expire(self.prefix + key, self.ttl)
+        raw, _ = pipe.execute()
+        return loads(raw) if raw else None
+
+    def save(self, key, session):
+        self.client.set(self.prefix + key, dumps(session), ex=self.ttl)
+
+    def delete(self, key):
+        pipe = self.client.pipeline()
+        pipe.get(self.prefix + key)
+        pipe.delete(self.prefix + key)
+        raw, _ = pipe.execute()
+        return loads(raw) if raw else None
+
+    def touch(self, key, ttl):
+        self.client.expire(self.prefix + key, int(ttl))
+
+    def __len__(self):
+        # A full SCAN of the keyspace: fine for a test or a shell, too slow for every metrics scrape
+        return sum(1 for _ in self.client.scan_iter(match=self.prefix + "*", count=1000))
+
+
+def create_session_store(config) -> SessionStore:
+    backend = config.get('SESSION_STORE', 'memory')
+    ttl = float(config.get('SESSION_TTL', 3600))
+    if backend == 'redis':
+        return RedisSessionStore(config.get('SESSION_REDIS_URL', 'redis://localhost:6379/0'), ttl)
+    if backend == 'memory':
+        return MemorySessionStore(ttl, int(config.get('SESSION_MAX', 10000)))
+    raise ValueError(f"Unknown SESSION_STORE: {backend!r} (use 'memory' or 'redis')")
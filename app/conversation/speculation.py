@@ -0,0 +1,135 @@
+# app/conversation/speculation.py
+"""Speculative next-question generation while the candidate is still speaking.
+
+The browser sends `user_speaking_partial` whenever the interim transcript
+settles for a moment. Once it is long enough we start the LLM request for
+that partial in the background; when the final transcript arrives and is
+close enough to what we speculated on, the (possibly already finished)
+result is reused instead of paying the full provider round trip again.
+
+Requests can't be aborted mid-flight with `requests`, so cancelling just
+marks the speculation stale; its tokens are counted as wasted when it lands.
+One still waiting for the rate limiter is dropped before it's sent, and the
+final answer never waits on it: speculation queues at background priority,
+so the turn's own call gets there first.
+"""
+import threading
+import time
+from difflib import SequenceMatcher
+
+
+def similarity(a: str, b: str) -> float:
+    """Word-level similarity in [0, 1]."""
+    return SequenceMatcher(None, a.lower().split(), b.lower().split(), autojunk=False).ratio()
+
+
+class Speculation:
+    __slots__ = ('text', 'started', 'response', 'tokens', 'cancelled', 'sent', 'done')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.started = time.monotonic()
+        self.response = None
+        self.tokens = 0
+        self.cancelled = False
+        self.sent = False          # past the rate limiter, on its way to the provider
+        self.done = threading.Event()
+
+
+class Speculator:
+    def __init__(self, socketio, enabled=False, min_words=6, threshold=0.85, max_inflight=32, wait_timeout=20.0):
+        self.socketio = socketio
+        self.enabled = enabled
+        self.min_words = min_words
+        self.threshold = threshold
+        self.wait_timeout = wait_timeout
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._specs = {}   # interview_id -> Speculation
+        self._lock = threading.Lock()
+        self.stats = {'started': 0, 'hits': 0, 'misses': 0, 'cancelled': 0, 'wasted_tokens': 0}
+
+    def configure(self, config) -> None:
+        self.enabled = bool(config.get('SPECULATION_ENABLED', self.enabled))
+        self.min_words = int(config.get('SPECULATION_MIN_WORDS', self.min_words))
+        self.threshold = float(config.get('SPECULATION_SIMILARITY', self.threshold))
+        self._slots = threading.BoundedSemaphore(int(config.get('SPECULATION_MAX_INFLIGHT', 32)))
+
+    @property
+    def hit_rate(self) -> float:
+        decided = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / decided if decided else 0.0
+
+    def observe(self, interview_id: str, partial: str, generate) -> None:
+        """Maybe start (or restart) speculation on a settled partial transcript.
+
+        generate(partial, admitted) -> (response_text or None, tokens_used); runs in a background task.
+        It calls admitted() when its request may go, and drops the request if that returns False.
+        """
+        if not self.enabled or len(partial.split()) < self.min_words:
+            return
+        with self._lock:
+            current = self._specs.get(interview_id)
+            if current and not current.cancelled and similarity(current.text, partial) >= self.threshold:
+                return   # what's in flight still matches what they're saying
+            if current:
+                self._cancel(current)
+            if not self._slots.acquire(blocking=False):
+                self._specs.pop(interview_id, None)
+                return   # at capacity: speculation is best-effort
+            spec = Speculation(partial)
+            self._specs[interview_id] = spec
+            self.stats['started'] += 1
+        self.socketio.start_background_task(self._run, spec, generate)
+
+    def _run(self, spec: Speculation, generate) -> None:
+        try:
+            spec.response, spec.tokens = generate(spec.text, lambda: self._admitted(spec))
+        except Exception:
+            spec.response = None
+        finally:
+            self._slots.release()
+            with self._lock:
+                spec.done.set()
+                if spec.cancelled:
+                    self.stats['wasted_tokens'] += spec.tokens
+
+    def _admitted(self, spec: Speculation) -> bool:
+        with self._lock:
+            spec.sent = not spec.cancelled
+            return spec.sent
+
+    def _cancel(self, spec: Speculation) -> None:
+        spec.cancelled = True
+        self.stats['cancelled'] += 1
+        if spec.done.is_set():
+            self.stats['wasted_tokens'] += spec.tokens
+
+    def take(self, interview_id: str, final_text: str):
+        """Reply speculated for a transcript similar to final_text, or None (miss)."""
+        with self._lock:
+            spec = self._specs.pop(interview_id, None)
+            if spec is None:
+                return None
+            if similarity(spec.text, final_text) < self.threshold:
+                self._cancel(spec)
+                self.stats['misses'] += 1
+                return None
+            if not spec.sent and not spec.done.is_set():
+                # Still queued behind the rate limiter: the turn's own call will go sooner
+                self._cancel(spec)
+                self.stats['misses'] += 1
+                return None
+        spec.done.wait(self.wait_timeout)
+        with self._lock:
+            if spec.response is None:
+                self._cancel(spec)
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+        return spec.response
+
+    def discard(self, interview_id: str) -> None:
+        with self._lock:
+            spec = self._specs.pop(interview_id, None)
+            if spec:
+                self._cancel(spec)
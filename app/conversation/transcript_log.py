@@ -0,0 +1,355 @@
+# app/conversation/transcript_log.py
+"""Append-only, write-ahead transcript log: every interview survives a restart.
+
+One compact record per event (interview started, turn answered, interview
+ended) is appended to the current segment file:
+
+    <u32 payload length> <u32 crc32 of payload> <payload: compact JSON>
+
+Appending only copies the encoded record into an in-memory buffer, so it
+costs nothing on the emit path. A background task writes and fsyncs the
+buffer every TRANSCRIPT_LOG_FSYNC_MS (group commit: one fsync for every
+record that arrived in that window; 0 = write and fsync each record inline).
+Segments rotate at TRANSCRIPT_LOG_SEGMENT_BYTES; closed segments are
+compacted into one on a background thread, dropping interviews idle for
+longer than the retention.
+
+On start-up the segments are replayed through a memory-mapped reader and
+unfinished interviews are put back into the session store; the browser's
+`resume_interview` then carries on where it left off. A torn record at the
+end of a segment (crash mid-write) ends that segment's replay. Replay is
+idempotent (turns are numbered), so a crash halfway through compaction
+can't duplicate anything.
+
+Candidate API keys are never written: a recovered session gets its key back
+from the browser on resume.
+
+    python -m app.conversation.transcript_log instance/transcripts [interview_id]   # export as JSON lines
+"""
+import atexit
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:   # Windows: no cross-process locking, compaction assumes a single worker
+    fcntl = None
+
+from .memory import compact_history
+from .session import Session, Turn, posting
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct('<II')
+START, TURN, END = 's', 't', 'e'
+SEGMENT_SUFFIX = '.log'
+
+
+def encode(record: dict) -> bytes:
+    payload = json.dumps(record, separators=(',', ':'), ensure_ascii=False).encode()
+    return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_segment(path: str) -> Iterator[dict]:
+    """Records of one segment, via mmap; stops at the first torn or corrupt record."""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while pos + HEADER.size <= size:
+                length, crc = HEADER.unpack_from(mm, pos)
+                start = pos + HEADER.size
+                if start + length > size:
+                    break
+                payload = mm[start:start + length]
+                if zlib.crc32(payload) != crc:
+                    logger.warning("corrupt record in %s at offset %d; ignoring the rest", path, pos)
+                    break
+                yield json.loads(payload)
+                pos = start + length
+
+
+class _Interview:
+    __slots__ = ('start', 'turns', 'ended', 'last')
+
+    def __init__(self):
+        self.start = None
+        self.turns = {}      # turn number -> record
+        self.ended = False
+        self.last = 0.0
+
+
+class TranscriptLog:
+    def __init__(self, directory: str = None, fsync_ms: int = 50, segment_bytes: int = 64 * 1024 * 1024,
+                 retention_days: float = 30, compact_segments: int = 8):
+        self.directory = directory
+        self.fsync_ms = fsync_ms
+        self.segment_bytes = segment_bytes
+        self.retention = retention_days * 86400
+        self.compact_segments = compact_segments
+        self._buffer = []
+        self._lock = threading.Lock()          # guards the buffer
+        self._write_lock = threading.Lock()    # serialises write + fsync + rotation
+        self._file = None
+        self._path = None
+        self._offload = None
+        self._compacting = False
+        self.stats = {'records': 0, 'bytes': 0, 'flushes': 0, 'fsync_seconds': 0.0, 'rotations': 0,
+                      'compactions': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    def configure(self, config, socketio=None) -> None:
+        self.directory = config.get('TRANSCRIPT_LOG_DIR') or None
+        self.fsync_ms = int(config.get('TRANSCRIPT_LOG_FSYNC_MS', self.fsync_ms))
+        self.segment_bytes = int(config.get('TRANSCRIPT_LOG_SEGMENT_BYTES', self.segment_bytes))
+        self.retention = float(config.get('TRANSCRIPT_LOG_RETENTION_DAYS', self.retention / 86400)) * 86400
+        self.compact_segments = int(config.get('TRANSCRIPT_LOG_COMPACT_SEGMENTS', self.compact_segments))
+        if not self.directory or self.enabled:
+            return
+        self.open()
+        atexit.register(self.close)
+        try:
+            # Under eventlet a plain fsync would stall every greenlet; run it on a real thread
+            from eventlet import patcher, tpool
+            if patcher.is_monkey_patched('thread'):
+                self._offload = tpool.execute
+        except ImportError:
+            pass
+        if self.fsync_ms > 0 and socketio is not None:
+            socketio.start_background_task(self._flusher)
+
+    def open(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._open_segment()
+
+    def segments(self):
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(SEGMENT_SUFFIX))
+        return [os.path.join(self.directory, n) for n in names]
+
+    def _open_segment(self) -> None:
+        # Each writer (worker process) appends only to a segment it created itself
+        seq = 1 + max((int(os.path.basename(p).split('.')[0]) for p in self.segments()), default=0)
+        while True:
+            path = os.path.join(self.directory, f'{seq:010d}{SEGMENT_SUFFIX}')
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o600)
+                break
+            except FileExistsError:
+                seq += 1
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)   # tells compaction (in any worker) this segment is live
+        old, self._file, self._path = self._file, os.fdopen(fd, 'ab', buffering=0), path
+        if old is not None:
+            old.close()
+
+    # ------------------ WRITING ------------------
+    def append(self, record: dict) -> None:
+        if self._file is None:
+            return
+        data = encode(record)
+        with self._lock:
+            self._buffer.append(data)
+        if self.fsync_ms <= 0:
+            self.flush()
+
+    def start(self, interview_id: str, session: Session) -> None:
+        self.append({'k': START, 'i': interview_id, 'role': session.job_role, 'desc': session.job_desc,
+                     'p': session.provider, 'max': session.max_questions, 'w': session.last_ai_text,
+                     't': time.time()})
+
+    def turn(self, interview_id: str, session: Session, reply: str) -> None:
+        entry = session.history[-1]
+        self.append({'k': TURN, 'i': interview_id, 'n': len(session.history), 'a': entry.answer,
+                     's': entry.sentiment, 'v': int(entry.vague), 'c': int(entry.confident),
+                     'r': reply, 'q': session.questions_asked, 'sq': session.answer_seq, 't': time.time()})
+
+    def end(self, interview_id: str) -> None:
+        self.append({'k': END, 'i': interview_id, 't': time.time()})
+
+    def flush(self) -> None:
+        """Write everything buffered and fsync once (group commit)."""
+        with self._write_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch or self._file is None:
+                return
+            data = b''.join(batch)
+            self._file.write(data)
+            start = time.perf_counter()
+            if self._offload is not None:
+                self._offload(os.fsync, self._file.fileno())
+            else:
+                os.fsync(self._file.fileno())
+            self.stats['fsync_seconds'] += time.perf_counter() - start
+            self.stats['records'] += len(batch)
+            self.stats['bytes'] += len(data)
+            self.stats['flushes'] += 1
+            if self._file.tell() >= self.segment_bytes:
+                self._open_segment()
+                self.stats['rotations'] += 1
+                if len(self.segments()) > self.compact_segments:
+                    self._start_compaction()
+
+    def _start_compaction(self) -> None:
+        # Never inline: flush() runs in the turn when fsync_ms is 0, and compaction rewrites whole segments
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        threading.Thread(target=self._compact_in_background, daemon=True, name='transcript-compact').start()
+
+    def _compact_in_background(self) -> None:
+        try:
+            if self._offload is not None:
+                self._offload(self.compact)   # a real thread under eventlet, so the hub keeps running
+            else:
+                self.compact()
+        except Exception:
+            logger.exception("transcript log compaction failed")
+        finally:
+            self._compacting = False
+
+    def _flusher(self) -> None:
+        while self._file is not None:
+            time.sleep(self.fsync_ms / 1000)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("transcript log flush failed")
+
+    def close(self) -> None:
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ------------------ REPLAY ------------------
+    def replay(self, paths=None) -> Dict[str, _Interview]:
+        interviews: Dict[str, _Interview] = {}
+        for path in self.segments() if paths is None else paths:
+            for record in read_segment(path):
+                state = interviews.get(record['i'])
+                if state is None:
+                    state = interviews[record['i']] = _Interview()
+                kind = record['k']
+                if kind == START:
+                    state.start = record
+                elif kind == TURN:
+                    state.turns[record['n']] = record   # duplicates (after a compaction crash) collapse
+                elif kind == END:
+                    state.ended = True
+                state.last = max(state.last, record['t'])
+        return interviews
+
+    def recover(self, max_age: float = None) -> Dict[str, Session]:
+        """Sessions of interviews that never ended (and were active within max_age seconds)."""
+        if not self.directory or not os.path.isdir(self.directory):
+            return {}
+        cutoff = time.time() - max_age if max_age else 0.0
+        sessions = {}
+        for interview_id, state in self.replay().items():
+            if state.ended or state.start is None or state.last < cutoff:
+                continue
+            sessions[interview_id] = build_session(state)
+        return sessions
+
+    def export(self, interview_id: str = None) -> Iterator[dict]:
+        for iid, state in self.replay().items():
+            if state.start is None or (interview_id and iid != interview_id):
+                continue
+            start = state.start
+            yield {'interview_id': iid, 'job_role': start['role'], 'provider': start['p'],
+                   'started_at': state.start['t'], 'last_at': state.last, 'ended': state.ended,
+                   'turns': [{'answer': r['a'], 'reply': r['r'], 'sentiment': r['s'], 'vague': bool(r['v']),
+                              'confident': bool(r['c']), 'at': r['t']}
+                             for _, r in sorted(state.turns.items())]}
+
+    # ------------------ COMPACTION ------------------
+    def compact(self) -> Optional[str]:
+        """Rewrite every closed segment into one, dropping interviews idle past the retention."""
+        closed = []
+        for path in self.segments():
+            if path == self._path:
+                continue
+            if fcntl is not None:
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    os.close(fd)
+                    continue   # another worker's live segment
+                closed.append((path, fd))
+            else:
+                closed.append((path, None))
+        if len(closed) < 2:
+            for _, fd in closed:
+                if fd is not None:
+                    os.close(fd)
+            return None
+        try:
+            paths = [p for p, _ in closed]
+            cutoff = time.time() - self.retention
+            tmp = paths[0] + '.compact'
+            with open(tmp, 'wb') as out:
+                for interview_id, state in self.replay(paths).items():
+                    if state.last < cutoff:
+                        continue
+                    records = ([state.start] if state.start else []) + [r for _, r in sorted(state.turns.items())]
+                    if state.ended:
+                        records.append({'k': END, 'i': interview_id, 't': state.last})
+                    out.write(b''.join(encode(r) for r in records))
+                out.flush()
+                os.fsync(out.fileno())
+            # Replace the first segment, then drop the rest: a crash in between only leaves
+            # duplicates, which replay collapses
+            os.replace(tmp, paths[0])
+            for path in paths[1:]:
+                os.unlink(path)
+            self.stats['compactions'] += 1
+            return paths[0]
+        finally:
+            for _, fd in closed:
+                if fd is not None:
+                    os.close(fd)
+
+
+def build_session(state: _Interview) -> Session:
+    start = state.start
+    turns = [r for _, r in sorted(state.turns.items())]
+    session = Session(None,   # the API key is never logged; the browser supplies it again on resume
+                      start['p'], posting(start['role'], start['desc']),
+                      last_ai_text=turns[-1]['r'] if turns else start['w'], max_questions=start['max'],
+                      questions_asked=turns[-1]['q'] if turns else 0,
+                      history=[Turn.of(r['a'], r['s'], bool(r['v']), bool(r['c'])) for r in turns],
+                      answer_seq=turns[-1].get('sq', 0) if turns else 0)
+    compact_history(session)
+    return session
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: python -m app.conversation.transcript_log DIR [INTERVIEW_ID]", file=sys.stderr)
+        return 2
+    log = TranscriptLog(argv[0])
+    for transcript in log.export(argv[1] if len(argv) > 1 else None):
+        print(json.dumps(transcript, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -108,171 +108,529 @@
 
 # app/events.py
 import asyncio
+import logging
 import random
 import re
-from flask import request
-from flask_socketio import emit
-from .llm.providers import call_llm
-from .llm.utils import sanitize_input
-
-# Global session store (use Redis in production)
-sessions = {}
-
-# --- NEW: Sentiment keywords for analysis ---
-POSITIVE_INDICATORS = [
-    "excited", "love", "passionate", "enjoy", "thrilled", "proud", 
-    "accomplished", "satisfied", "motivated", "inspired"
-]
-NEGATIVE_INDICATORS = [
-    "frustrated", "disappointed", "struggled", "challenged", "difficult", 
-    "tough", "stress", "overwhelmed", "hard", "struggle"
-]
-CONFIDENCE_INDICATORS = [
-    "definitely", "clearly", "absolutely", "confidently", "certainly", 
-    "undoubtedly", "without a doubt", "sure"
-]
-VAGUE_INDICATORS = [
-    "kind of", "sort of", "maybe", "a bit", "somewhat", "pretty much", 
-    "thing is", "well", "um", "uh"
-]
+import time
+import uuid
+from functools import lru_cache
+from flask import current_app, request
+from flask_socketio import emit, join_room
+from . import socketio
+from .analytics.pipeline import AnalyticsPipeline
+from .audio.pipeline import AudioPipeline, check_format
+from .audio.vad import END_OF_TURN, SPEECH_START
+from .conversation.analyzer import analyze_text
+from .conversation.memory import build_context, compact_history, estimate_tokens
+from .conversation.question_bank import question_bank
+from .conversation.speculation import Speculator
+from .conversation.session import Session, Turn, posting
+from .conversation.session_store import MemorySessionStore
+from .conversation.transcript_log import TranscriptLog
+from .executor import TurnExecutor
+from .llm.cache import cache_key, response_cache
+from .llm.prompt_engine import build_turn_prompt, posting_block
+from .llm.local import local_llm
+from .llm.providers import INVALID_PROVIDER, PROVIDER_ENDPOINTS, needs_api_key
+from .llm.router import FALLBACK_REPLY, answered_by, router
+from .llm.scheduler import BACKGROUND, INTERACTIVE, NEW, llm_scheduler
+from .llm.utils import SentenceBuffer, sanitize_input
+from .metrics import BUSY_REJECTIONS, Gauge, TurnTrace
+
+logger = logging.getLogger(__name__)
+
+# Session store; replaced from config by create_app (memory or redis)
+sessions = MemorySessionStore()
+
+# Bounded pool that runs LLM turns off the socket handlers
+executor = TurnExecutor(socketio)
+
+# Speculative replies computed from interim transcripts (process-local)
+speculator = Speculator(socketio)
+
+# Optional server-side STT/TTS (AUDIO_ENABLED); streams are per worker like connections
+audio = AudioPipeline(socketio)
+
+# Write-ahead transcript log (TRANSCRIPT_LOG_DIR); sessions are rebuilt from it on restart
+transcripts = TranscriptLog()
+
+# Post-interview scoring and reports, off the live turn path
+analytics = AnalyticsPipeline(socketio)
+
+# This worker's live connections: sid -> interview_id. Sessions themselves are
+# keyed by interview_id (and joined as a room), so a reconnecting browser can
+# resume on any worker.
+connections = {}
+# interview_id -> seq of the answer whose turn is running on this worker
+turn_seqs = {}
+
+CLOSING_LINE = "That’s all the questions I have for today. Thank you so much for your time—your insights were really valuable!"
+
+REPROMPT = {
+    'text': "I didn’t quite catch that. Could you say it again a bit more clearly?",
+    'ssml': '<speak>I didn’t quite catch that. Could you say it again a bit more clearly?<break time="600ms"/></speak>',
+}
+
+
+# Scrape-time gauges (per worker). The session count is only kept for the in-process store:
+# counting a shared Redis store means scanning its whole keyspace on every scrape.
+Gauge('interview_sessions', 'Interview sessions in this worker\'s store',
+      fn=lambda: len(sessions) if isinstance(sessions, MemorySessionStore) else {})
+Gauge('interview_connections', 'Socket connections on this worker', fn=lambda: len(connections))
+Gauge('interview_turns_inflight', 'Turns running or waiting for a worker slot', fn=lambda: executor.admitted)
+Gauge('speculation_events', 'Speculative reply counters', ('event',),
+      fn=lambda: {(k,): v for k, v in speculator.stats.items()})
+Gauge('response_cache_events', 'Reply cache counters', ('event',),
+      fn=lambda: {(k,): v for k, v in response_cache.stats.items()})
+Gauge('audio_events', 'Server audio counters', ('event',), fn=lambda: {(k,): v for k, v in audio.stats.items()})
+Gauge('llm_provider_circuit_open', '1 while the provider circuit breaker is open or half-open', ('provider',),
+      fn=lambda: {(p,): int(h.state != 'closed') for p, h in router.health.items()})
+Gauge('transcript_log_events', 'Transcript log writer counters', ('event',),
+      fn=lambda: {(k,): v for k, v in transcripts.stats.items()})
+Gauge('question_bank_events', 'Early turns answered from the question bank (hits) or not (misses)', ('event',),
+      fn=lambda: {(k,): v for k, v in question_bank.stats.items()})
+Gauge('analytics_queue_depth', 'Completed interviews waiting to be scored', fn=lambda: analytics.pending)
+Gauge('llm_queue_depth', 'Provider calls waiting for the rate limiter', ('provider', 'priority'),
+      fn=llm_scheduler.depth)
+Gauge('llm_scheduler_events', 'Rate limiter counters', ('event',),
+      fn=lambda: {(k,): v for k, v in llm_scheduler.stats.items()})
+Gauge('local_llm_sequences', 'Local model requests waiting for a batch slot / generating', ('state',),
+      fn=lambda: {('waiting',): local_llm.waiting, ('active',): local_llm.active})
+
+
+@lru_cache(maxsize=1024)
+def welcome_message(job_role: str):
+    """(text, ssml) for the opening line; identical for every candidate of a role."""
+    welcome = (
+        f"Hello! Welcome to your {job_role} interview. I'm really looking forward to learning more about you. "
+        f"To get us started—could you tell me a bit about yourself and your background?"
+    )
+    return welcome, f'<speak>{welcome}<break time="600ms"/></speak>'
+
 
 def register_socketio_events(socketio):
     @socketio.on('start_voice_interview')
     def handle_start(data):
-        sid = request.sid
         api_key = data.get('api_key', '').strip()
         provider = data.get('provider', 'groq').lower()
         job_role = sanitize_input(data.get('job_role', ''))
         job_desc = sanitize_input(data.get('job_desc', ''))
 
-        if not api_key or not job_role or not job_desc:
+        if provider not in PROVIDER_ENDPOINTS:
+            # Rejected here so a made-up name never becomes a metrics label or a session
+            emit('error', {'msg': f'❌ {INVALID_PROVIDER}'})
+            return
+        if (not api_key and needs_api_key(provider)) or not job_role or not job_desc:
             emit('error', {'msg': '❌ Please provide API key, job role, and description.'})
             return
+        if needs_api_key(provider) and not llm_scheduler.admit_new(provider, api_key):
+            # This key (or provider) already has a backlog: keep it for the interviews in progress
+            BUSY_REJECTIONS.inc(reason='rate_limited')
+            emit('error', {'msg': 'We’re at capacity right now. Please try starting again in a minute.'})
+            return
+
+        welcome, welcome_ssml = welcome_message(job_role)
+
+        interview_id = uuid.uuid4().hex
+        # Sessions for the same posting share one Posting; last_ai_text is replayed on resume
+        session = Session(api_key, provider, posting(job_role, job_desc), last_ai_text=welcome, max_questions=5)
+        sessions.save(interview_id, session)
+        transcripts.start(interview_id, session)
 
-        sessions[sid] = {
-            'api_key': api_key,
-            'provider': provider,
-            'job_role': job_role,
-            'job_desc': job_desc,
-            'questions_asked': 0,
-            'max_questions': 5,
-            'history': [],
-            'candidate_sentiment_trend': []  # Track mood changes
-        }
-
-        welcome = (
-            f"Hello! Welcome to your {job_role} interview. I'm really looking forward to learning more about you. "
-            f"To get us started—could you tell me a bit about yourself and your background?"
-        )
+        connections[request.sid] = interview_id
+        join_room(interview_id)
+        if data.get('audio'):
+            open_audio(interview_id, data['audio'])   # on failure the browser falls back to its own speech
+        emit('interview_started', {'interview_id': interview_id, 'audio': audio.get(interview_id) is not None,
+                                   'vad': audio.vad})
         # Emit with SSML pause
-        emit('ai_speak', {'text': welcome, 'ssml': f'<speak>{welcome}<break time="600ms"/></speak>'})
+        emit('ai_speak', {'text': welcome, 'ssml': welcome_ssml})
+        audio.speak(interview_id, welcome)
 
-    @socketio.on('user_spoke')
-    def handle_user_answer(data):
-        sid = request.sid
-        session = sessions.get(sid)
+    @socketio.on('resume_interview')
+    def handle_resume(data):
+        interview_id = str(data.get('interview_id', ''))
+        session = sessions.get(interview_id) if interview_id else None
         if not session:
             emit('error', {'msg': 'Session expired. Please restart the interview.'})
             return
+        if not session.api_key and needs_api_key(session.provider):
+            # Rebuilt from the transcript log after a restart: keys are never logged
+            api_key = str(data.get('api_key', '')).strip()
+            if not api_key:
+                emit('error', {'msg': 'Please enter your API key again to continue the interview.'})
+                return
+            session.api_key = api_key
+            sessions.save(interview_id, session)
+
+        connections[request.sid] = interview_id
+        join_room(interview_id)
+        emit('interview_resumed', {
+            'interview_id': interview_id,
+            'answers_received': len(session.history),
+            'questions_asked': session.questions_asked,
+            'last_ai_text': session.last_ai_text,
+        })
 
-        user_answer = sanitize_input(data.get('text', ''))
-        if not user_answer or len(user_answer.strip()) < 5:
-            emit('ai_speak', {'text': "I didn’t quite catch that. Could you say it again a bit more clearly?", 
-                              'ssml': '<speak>I didn’t quite catch that. Could you say it again a bit more clearly?<break time="600ms"/></speak>'})
+    @socketio.on('user_spoke')
+    def handle_user_answer(data):
+        seq = data.get('seq')
+        submit_answer(connections.get(request.sid), data.get('text', ''),
+                      seq if isinstance(seq, int) and not isinstance(seq, bool) else None)
+
+    @socketio.on('user_speaking_partial')
+    def handle_partial(data):
+        # Interim transcript settled for a moment: speculatively start the next question
+        observe_partial(connections.get(request.sid), data.get('text', ''))
+
+    @socketio.on('start_audio')
+    def handle_start_audio(data):
+        # (Re)open server-side audio for this connection's interview, e.g. after a resume
+        interview_id = connections.get(request.sid)
+        if not interview_id or not sessions.get(interview_id):
+            emit('error', {'msg': 'Session expired. Please restart the interview.'})
             return
+        if open_audio(interview_id, data or {}):
+            emit('audio_started', {'interview_id': interview_id})
 
-        # --- ANALYTICAL TASKS ---
-        # 1. Sentiment Analysis
-        sentiment_score = analyze_sentiment(user_answer)
-        session['candidate_sentiment_trend'].append(sentiment_score)
-
-        # 2. Detect vagueness, confidence, etc.
-        is_vague = any(v in user_answer.lower() for v in VAGUE_INDICATORS)
-        is_confident = any(c in user_answer.lower() for c in CONFIDENCE_INDICATORS)
-
-        # 3. Adjust pause based on complexity
-        pause_duration = calculate_thinking_pause(user_answer, is_vague)
-        socketio.sleep(pause_duration)
-
-        # Store full context
-        session['history'].append({
-            'answer': user_answer,
-            'sentiment': sentiment_score,
-            'vague': is_vague,
-            'confident': is_confident
-        })
+    @socketio.on('audio_frame')
+    def handle_audio_frame(frame):
+        interview_id = connections.get(request.sid)
+        if not interview_id or not isinstance(frame, (bytes, bytearray)):
+            return
+        result = audio.feed(interview_id, frame)
+        if result is None:
+            return
+        if result.partial:
+            emit('user_transcript', {'text': result.partial, 'final': False})
+            observe_partial(interview_id, result.partial)
+        for event in result.events:
+            if event.kind == SPEECH_START:
+                # Barge-in: the candidate is talking over the interviewer
+                cancelled = audio.barge_in(interview_id)
+                if cancelled is not None:
+                    emit('ai_speak_cancel', {'utterance': cancelled})
+            elif event.kind == END_OF_TURN:
+                # Speech the recogniser couldn't make words of is ignored
+                submit_transcript(interview_id, audio.finish(interview_id))
+
+    @socketio.on('audio_end')
+    def handle_audio_end(data=None):
+        interview_id = connections.get(request.sid)
+        text = audio.finish(interview_id) if interview_id else None
+        if text is None:
+            return
+        submit_transcript(interview_id, text)
+
+    @socketio.on('disconnect')
+    def handle_disconnect():
+        # Keep the session only for a short grace window so the browser can
+        # resume (possibly on another worker); otherwise it's reclaimed.
+        interview_id = connections.pop(request.sid, None)
+        if interview_id:
+            speculator.discard(interview_id)
+            audio.close(interview_id)
+            sessions.touch(interview_id, current_app.config.get('SESSION_RESUME_GRACE', 120))
+
+
+def open_audio(interview_id: str, options: dict) -> bool:
+    if not audio.enabled:
+        emit('error', {'msg': 'Server-side audio is not enabled on this server.'})
+        return False
+    try:
+        codec, sample_rate = str(options.get('codec', 'pcm16')), int(options.get('sample_rate', 16000))
+        check_format(codec, sample_rate)
+        audio.open(interview_id, codec, sample_rate)
+    except (TypeError, ValueError, RuntimeError) as e:
+        emit('error', {'msg': f'Could not start audio: {e}'})
+        return False
+    return True
+
+
+def submit_transcript(interview_id: str, text: str):
+    """Our recogniser's final transcript: numbered like a browser answer, echoed, then submitted."""
+    session = sessions.get(interview_id)
+    seq = session.answer_seq + 1 if session else None
+    emit('user_transcript', {'text': text, 'final': True, 'seq': seq})
+    if text:
+        submit_answer(interview_id, text, seq)
+
+
+def submit_answer(interview_id: str, text: str, seq: int = None):
+    """Validate a final transcript (typed by the browser recognizer or ours) and queue its turn.
+
+    seq numbers the client's answers; after a reconnect the browser re-sends its unanswered
+    answer with the same seq, and an answer already taken into a turn is not answered twice.
+    """
+    session = sessions.get(interview_id) if interview_id else None
+    if not session:
+        emit('error', {'msg': 'Session expired. Please restart the interview.'})
+        return
+    if seq is not None:
+        if turn_seqs.get(interview_id) == seq:
+            return   # still running here; its reply goes to the room this socket has joined
+        if seq <= session.answer_seq:
+            # Answered before the reply could reach the old connection: send it again
+            emit('ai_speak', {'text': session.last_ai_text, 'pause_ms': 0})
+            audio.speak(interview_id, session.last_ai_text)
+            return
 
-        # --- CRITICAL THINKING LOGIC ---
-        # Build context from past answers
-        history_text = "\n".join([f"Answer {i+1}: {h['answer']}" 
-                                  for i, h in enumerate(session['history'][-3:])])
-
-        # Adjust system prompt based on candidate's mood
-        emotional_tone = "empathetic and encouraging" if sentiment_score < 0 else "professional and probing"
-        if is_vague:
-            emotional_tone += " and probing for more detail"
-
-        # Enhanced prompt for analytical depth
-        prompt = f"""
-You are a {emotional_tone} senior hiring manager for a {session['job_role']} role.
-Job description: {session['job_desc'][:200]}
-
-Previous candidate answers:
-{history_text}
-
-Latest answer: "{user_answer}"
-
-Instructions:
-- First, acknowledge their answer with 1 sentence (adjust tone based on mood).
-- If they were vague, ask for a specific example or detail.
-- If they mentioned a challenge, ask how they felt or what they learned.
-- Then ask a thoughtful follow-up question that shows you were listening.
-- Do NOT repeat previous topics.
-- Keep total response under 40 words.
-- Sound like a real person—use natural pauses and transitions.
-        """.strip()
-
-        response = call_llm(
-            session['api_key'],
-            user_message=prompt,
-            system_prompt="You are a human-like, thoughtful, and analytical interviewer. Always probe deeper.",
-            provider=session['provider']
-        )
-
-        session['questions_asked'] += 1
-
-        # Add SSML for natural pauses in TTS
-        ssml_response = f"""
-        <speak>
-            {response}
-            <break time="{random.randint(400, 800)}ms"/>
-        </speak>
-        """
-
-        # Handle interview end
-        if session['questions_asked'] >= session['max_questions']:
-            closing = f"{response} That’s all the questions I have for today. Thank you so much for your time—your insights were really valuable!"
-            emit('ai_speak', {'text': closing, 
-                              'ssml': f'<speak>{closing}<break time="800ms"/></speak>'})
-            emit('interview_complete', {'history': session['history']})
-            sessions.pop(sid, None)
+    user_answer = sanitize_input(text)
+    if not user_answer or len(user_answer.strip()) < 5:
+        emit('ai_speak', REPROMPT)
+        audio.speak(interview_id, REPROMPT['text'])
+        return
+
+    streamed = current_app.config.get('LLM_STREAM', True)
+    running = turn_seqs.get(interview_id)
+    if seq is not None:
+        turn_seqs[interview_id] = seq
+    busy = executor.submit(interview_id, run_answer, interview_id, session, user_answer, streamed, seq)
+    if busy:
+        if running is not None:
+            turn_seqs[interview_id] = running
+        elif seq is not None:
+            turn_seqs.pop(interview_id, None)
+        # Back-pressure: tell the client instead of queueing without bound
+        BUSY_REJECTIONS.inc(reason=busy)
+        msg = "Sorry, give me just a moment—could you repeat that?"
+        emit('busy', {'msg': msg, 'reason': busy})
+        audio.speak(interview_id, msg)
+
+
+def turn_failed(interview_id: str):
+    """A turn raised (already logged by the executor): reply so the candidate can carry on."""
+    socketio.emit('ai_speak', {'text': FALLBACK_REPLY}, to=interview_id)
+    audio.speak(interview_id, FALLBACK_REPLY)
+
+
+executor.on_error = turn_failed
+
+
+def observe_partial(interview_id: str, text: str):
+    if not interview_id or not speculator.enabled:
+        return
+    session = sessions.get(interview_id)
+    if not session:
+        return
+    partial = sanitize_input(text)
+    speculator.observe(interview_id, partial, lambda text, admitted: speculate_reply(session, text, admitted))
+
+
+def run_answer(interview_id: str, session: Session, user_answer: str, streamed: bool, seq: int = None):
+    if seq is not None:
+        session.answer_seq = seq   # saved with the turn
+    try:
+        trace = TurnTrace(interview_id, session.provider)
+        with trace.active():   # provider code adds its connect/TTFB spans to this turn
+            run_turn(interview_id, session, user_answer, streamed, trace)
+    finally:
+        if turn_seqs.get(interview_id) == seq:
+            turn_seqs.pop(interview_id, None)
+
+
+def run_turn(interview_id: str, session: Session, user_answer: str, streamed: bool, trace: TurnTrace):
+    """Analyse the answer, call the LLM and emit the reply. Runs on the turn executor."""
+
+    # --- ANALYTICAL TASKS ---
+    # 1-2. Sentiment, vagueness, confidence in one pass over the answer
+    with trace.span('analysis'):
+        analysis = analyze_text(user_answer)
+    is_vague = analysis.vague
+
+    # 3. Adjust pause based on complexity. Not slept here: it's sent as a rendering
+    # hint and the browser only waits whatever is left after the LLM latency.
+    pause_ms = int(calculate_thinking_pause(user_answer, is_vague) * 1000)
+
+    # Store full context (the sentiment trend is read back from the turns)
+    session.history.append(Turn.of(user_answer, analysis.sentiment, is_vague, analysis.confident))
+
+    # --- CRITICAL THINKING LOGIC ---
+    with trace.span('prompt_build'):
+        built = build_prompt(session, user_answer, analysis)
+    prompt, system_prompt = built.user, built.system
+    trace.attrs['prompt_chars'] = len(built.system) + len(built.user)
+    logger.debug("prompt %d chars, %d cacheable prefix", len(built.system) + len(built.user), built.prefix_chars)
+
+    # Reuse the reply speculated while they were still talking, if it matches what they said,
+    # or one already generated for the same prompt (same posting, same opening answer, ...),
+    # or, early in the interview, a prepared question for the role
+    source = 'speculation'
+    with trace.span('speculation'):
+        response = speculator.take(interview_id, user_answer)
+    if response is None:
+        source = 'cache'
+        with trace.span('cache'):
+            response = cached_reply(session, built, user_answer, analysis)
+    # First answer: a new interview, queued behind ones already in progress if the key is busy
+    priority = NEW if len(session.history) == 1 else INTERACTIVE
+    if response is None and question_bank.enabled and len(session.history) <= question_bank.max_turns:
+        source = 'bank'
+        with trace.span('bank'):
+            response = question_bank.reply(session.job_role, session.job_desc, user_answer, analysis,
+                                           exclude=session.last_ai_text)
+    if response is not None:
+        if streamed:
+            emit_sentences(interview_id, response, pause_ms, trace)
+    else:
+        source = 'llm'
+        if streamed:
+            # Push each sentence as soon as it's complete so browser TTS can start early
+            response = stream_response(interview_id, session, prompt, system_prompt, pause_ms, trace, priority)
         else:
-            emit('ai_speak', {'text': response, 'ssml': ssml_response})
+            with trace.span('llm'):
+                response = router.complete(
+                    session.api_key,
+                    user_message=prompt,
+                    system_prompt=system_prompt,
+                    provider=session.provider,
+                    priority=priority
+                )
+        store_reply(session, built, user_answer, analysis, response)
+
+    session.questions_asked += 1
+
+    # Add SSML for natural pauses in TTS
+    ssml_response = f"""
+    <speak>
+        {response}
+        <break time="{random.randint(400, 800)}ms"/>
+    </speak>
+    """
+
+    # Handle interview end
+    if session.questions_asked >= session.max_questions:
+        if streamed:
+            emit_partial(interview_id, CLOSING_LINE, pause_ms)
+        closing = f"{response} {CLOSING_LINE}"
+        with trace.span('emit'):
+            socketio.emit('ai_speak', {'text': closing, 'streamed': streamed, 'pause_ms': pause_ms,
+                                       'ssml': f'<speak>{closing}<break time="800ms"/></speak>'}, to=interview_id)
+            if not streamed:
+                audio.speak(interview_id, closing)
+        socketio.emit('interview_complete', {'history': [t.to_dict() for t in session.history],
+                                             'interview_id': interview_id,
+                                             'report_queued': analytics.submit(interview_id, session)},
+                      to=interview_id)
+        transcripts.turn(interview_id, session, closing)
+        transcripts.end(interview_id)
+        trace.finish(streamed, source)
+        sessions.delete(interview_id)
+        audio.close(interview_id)   # queued closing audio is still synthesised
+    else:
+        session.last_ai_text = response
+        with trace.span('session_save'):
+            sessions.save(interview_id, session)
+        with trace.span('emit'):
+            socketio.emit('ai_speak', {'text': response, 'ssml': ssml_response, 'streamed': streamed,
+                                       'pause_ms': pause_ms}, to=interview_id)
+            if not streamed:
+                audio.speak(interview_id, response)
+        transcripts.turn(interview_id, session, response)   # buffered; fsynced in the background
+        trace.finish(streamed, source)
+
+        # Reply is out; now fold older answers into the running summary
+        compact_history(session)
+        sessions.save(interview_id, session)
+
+
+def build_prompt(session: Session, user_answer: str, analysis):
+    # Build context from past answers (token-budgeted: summary + recent answers)
+    history_text = build_context(session)
+
+    # Static-first prompt (precompiled templates) so providers can cache the prefix
+    return build_turn_prompt(session.job_role, session.job_desc, reply_tone(analysis), history_text, user_answer)
+
+
+def reply_tone(analysis) -> str:
+    # Adjust tone based on candidate's mood
+    emotional_tone = "empathetic and encouraging" if analysis.sentiment < 0 else "professional and probing"
+    if analysis.vague:
+        emotional_tone += " and probing for more detail"
+    return emotional_tone
+
+
+def reply_cache_keys(session: Session, built, analysis, provider: str = None):
+    """(prompt key, posting key) of an opening turn, else None: later prompts carry the candidate's own
+    answers and never repeat. The posting key groups the opening turns of one posting."""
+    if len(session.history) != 1:
+        return None
+    provider = provider or session.provider
+    model = PROVIDER_ENDPOINTS[provider]['model']
+    key = cache_key(provider, model, built.system, built.user)
+    posting = cache_key(provider, model, built.system,
+                        posting_block(session.job_role, session.job_desc), reply_tone(analysis))
+    return key, posting
+
+
+def cached_reply(session: Session, built, user_answer: str, analysis):
+    if not response_cache.enabled or session.provider not in PROVIDER_ENDPOINTS:
+        return None
+    keys = reply_cache_keys(session, built, analysis)
+    return response_cache.get_opening(keys[1], user_answer) if keys else None
+
+
+def store_reply(session: Session, built, user_answer: str, analysis, response: str) -> None:
+    # Keyed on the provider that actually answered (a fallback route's reply is only reused for that
+    # provider); never the neutral fallback line or an invalid-provider message, which have none
+    provider = answered_by.get()
+    if not response_cache.enabled or provider is None or response == FALLBACK_REPLY:
+        return
+    keys = reply_cache_keys(session, built, analysis, provider)
+    if keys:
+        response_cache.put_opening(keys[1], user_answer, keys[0], response)
+
+
+def speculate_reply(session: Session, partial: str, admitted=None):
+    """Generate the reply for a partial transcript without touching the real session."""
+    built = build_prompt(session.preview(partial), partial, analyze_text(partial))
+    response = router.complete(session.api_key, user_message=built.user, system_prompt=built.system,
+                               provider=session.provider, priority=BACKGROUND, admitted=admitted)
+    if response == FALLBACK_REPLY:
+        return None, 0   # dropped or failed: the turn makes its own call
+    return response, estimate_tokens(built.system + built.user) + estimate_tokens(response)
+
+
+def emit_partial(interview_id: str, sentence: str, pause_ms: int = 0, trace=None):
+    if trace is not None and 'first_sentence' not in trace.spans:
+        trace.add('first_sentence', time.perf_counter() - trace.started)
+    start = time.perf_counter()
+    socketio.emit('ai_speak_partial', {'text': sentence, 'pause_ms': pause_ms}, to=interview_id)
+    audio.speak(interview_id, sentence)   # no-op unless the interview is in server audio mode
+    if trace is not None:
+        trace.add('emit', time.perf_counter() - start)
+
+
+def emit_sentences(interview_id: str, text: str, pause_ms: int = 0, trace=None):
+    buffer = SentenceBuffer()
+    for sentence in buffer.feed(text + " ") + [buffer.flush()]:
+        if sentence:
+            emit_partial(interview_id, sentence, pause_ms, trace)
+
+
+def stream_response(interview_id: str, session: Session, prompt: str, system_prompt: str, pause_ms: int = 0,
+                    trace=None, priority: int = INTERACTIVE) -> str:
+    """Stream the LLM reply, emitting `ai_speak_partial` per sentence. Returns the full text."""
+    buffer = SentenceBuffer()
+    parts = []
+    start = time.perf_counter()
+    for chunk in router.stream(session.api_key, prompt, system_prompt, session.provider, priority):
+        parts.append(chunk)
+        for sentence in buffer.feed(chunk):
+            emit_partial(interview_id, sentence, pause_ms, trace)
+            socketio.sleep(0)  # let the hub flush the packet before we block on the next read
+    tail = buffer.flush()
+    if tail:
+        emit_partial(interview_id, tail, pause_ms, trace)
+    if trace is not None:
+        trace.add('llm', time.perf_counter() - start)
+    return "".join(parts).strip()
 
 
 # --- NEW: Sentiment Analysis Function ---
 def analyze_sentiment(text: str) -> int:
     """Returns: -1 (negative), 0 (neutral), 1 (positive)"""
-    text_lower = text.lower()
-    pos_count = sum(1 for word in POSITIVE_INDICATORS if word in text_lower)
-    neg_count = sum(1 for word in NEGATIVE_INDICATORS if word in text_lower)
-    
-    if pos_count > neg_count:
-        return 1
-    elif neg_count > pos_count:
-        return -1
-    else:
-        return 0  # Neutral
+    return analyze_text(text).sentiment
 
 
 # --- NEW: Dynamic Pause Calculation ---
@@ -0,0 +1,83 @@
+# app/executor.py
+"""Bounded execution of interview turns off the socket handler.
+
+Socket handlers only validate and admit work; the LLM round trip runs in a
+background task (a greenlet under eventlet, a thread otherwise). Admission
+is refused — rather than queued without limit — when the session already
+has a turn in flight or the process-wide queue is full, so tail latency
+stays predictable under load. A turn that raises is logged and the room
+(the sid) gets `on_error(sid)`, by default an 'error' event, so the
+candidate isn't left waiting for a reply that will never come.
+"""
+import logging
+import threading
+import time
+
+from .metrics import TURN_STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+BUSY_SESSION = 'session'      # this candidate already has a turn in flight
+BUSY_OVERLOADED = 'overloaded'  # worker pool + queue are full
+
+
+class TurnExecutor:
+    def __init__(self, socketio, max_workers=64, max_queue=256, max_inflight_per_session=1):
+        self.socketio = socketio
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_inflight_per_session = max_inflight_per_session
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self._inflight = {}   # sid -> admitted turns
+        self.admitted = 0     # running + waiting for a slot
+        self.on_error = None  # on_error(sid) after fn raised; None emits 'error' to the room
+
+    def configure(self, config) -> None:
+        self.max_workers = int(config.get('TURN_MAX_WORKERS', self.max_workers))
+        self.max_queue = int(config.get('TURN_MAX_QUEUE', self.max_queue))
+        self.max_inflight_per_session = int(config.get('TURN_MAX_INFLIGHT_PER_SESSION',
+                                                       self.max_inflight_per_session))
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+
+    def submit(self, sid, fn, *args):
+        """Run fn(*args) in the background. Returns None if admitted, else a BUSY_* reason."""
+        with self._lock:
+            if self._inflight.get(sid, 0) >= self.max_inflight_per_session:
+                return BUSY_SESSION
+            if self.admitted >= self.max_workers + self.max_queue:
+                return BUSY_OVERLOADED
+            self._inflight[sid] = self._inflight.get(sid, 0) + 1
+            self.admitted += 1
+        self.socketio.start_background_task(self._run, sid, fn, args, time.perf_counter())
+        return None
+
+    def _run(self, sid, fn, args, submitted):
+        try:
+            with self._slots:
+                TURN_STAGE_SECONDS.observe(time.perf_counter() - submitted, stage='queue')
+                fn(*args)
+        except Exception:
+            logger.exception("turn for %s failed", sid)
+            self._failed(sid)
+        finally:
+            with self._lock:
+                self.admitted -= 1
+                remaining = self._inflight.get(sid, 0) - 1
+                if remaining > 0:
+                    self._inflight[sid] = remaining
+                else:
+                    self._inflight.pop(sid, None)
+
+    def _failed(self, sid):
+        try:
+            if self.on_error is not None:
+                self.on_error(sid)
+            else:
+                self.socketio.emit('error', {'msg': 'Something went wrong with that answer. Please try again.'},
+                                   to=sid)
+        except Exception:
+            logger.exception("could not tell %s its turn failed", sid)
+
+    def inflight(self, sid) -> int:
+        return self._inflight.get(sid, 0)
@@ -0,0 +1,228 @@
+# app/llm/cache.py
+"""Cache of opening-turn interviewer replies keyed on the normalised (provider, model, prompt).
+
+During a hiring drive hundreds of candidates interview for the same posting,
+so opening prompts recur (with the static-first layout, their only
+per-candidate part is the first answer; later turns carry the candidate's
+own history and are never cached). Exact hits skip the provider call
+entirely. The optional near-duplicate mode also reuses an opening-turn reply
+when the candidate's first answer is close enough (word similarity) to one
+already answered for the same posting.
+
+Entries are evicted LRU-first once over RESPONSE_CACHE_MAX entries or
+RESPONSE_CACHE_MAX_BYTES of text, and expire after RESPONSE_CACHE_TTL
+seconds; the per-posting index of opening answers is LRU-capped at
+RESPONSE_CACHE_MAX_POSTINGS postings. With RESPONSE_CACHE_PATH set the cache is loaded from / written to
+a JSON file so it survives restarts.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from ..conversation.speculation import similarity
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def cache_key(provider: str, model: str, *parts: str) -> str:
+    raw = "\x1f".join([provider.lower(), model] + [normalize(p) for p in parts])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, enabled=True, max_entries=2048, max_bytes=16 * 1024 * 1024, ttl=86400.0,
+                 path=None, semantic=False, threshold=0.9, max_openings_per_posting=64, max_postings=1024,
+                 persist_every=100):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.path = path
+        self.semantic = semantic
+        self.threshold = threshold
+        self.max_openings_per_posting = max_openings_per_posting
+        self.max_postings = max_postings
+        self.persist_every = persist_every   # stores between snapshots to disk
+        self._data = OrderedDict()      # key -> (expires_at, response), oldest first; wall clock so it persists
+        self._openings = OrderedDict()  # posting key -> OrderedDict(answer -> response key), oldest first
+        self._bytes = 0
+        self._dirty = 0
+        self._atexit = False
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'near_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def configure(self, config) -> None:
+        self.enabled = bool(config.get('RESPONSE_CACHE_ENABLED', self.enabled))
+        self.max_entries = int(config.get('RESPONSE_CACHE_MAX', self.max_entries))
+        self.max_bytes = int(config.get('RESPONSE_CACHE_MAX_BYTES', self.max_bytes))
+        self.ttl = float(config.get('RESPONSE_CACHE_TTL', self.ttl))
+        self.path = config.get('RESPONSE_CACHE_PATH') or None
+        self.semantic = bool(config.get('RESPONSE_CACHE_SEMANTIC', self.semantic))
+        self.threshold = float(config.get('RESPONSE_CACHE_SIMILARITY', self.threshold))
+        self.max_postings = int(config.get('RESPONSE_CACHE_MAX_POSTINGS', self.max_postings))
+        with self._lock:
+            self._data.clear()
+            self._openings.clear()
+            self._bytes = 0
+        if self.enabled and self.path:
+            self.load()
+            if not self._atexit:   # configure() runs once per create_app(); persist once at exit
+                atexit.register(self.persist)
+                self._atexit = True
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.stats['hits'] + self.stats['near_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    # ------------------ LOOKUP ------------------
+    def get(self, key: str):
+        if not self.enabled:
+            return None
+        with self._lock:
+            response = self._get_locked(key)
+            self.stats['hits' if response is not None else 'misses'] += 1
+        return response
+
+    def get_opening(self, posting_key: str, answer: str):
+        """Exact-or-near-duplicate lookup for an opening turn; returns the cached reply or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            openings = self._openings.get(posting_key)
+            if openings:
+                self._openings.move_to_end(posting_key)
+                exact = openings.get(normalize(answer))
+                response = self._get_locked(exact) if exact else None
+                if response is not None:
+                    self.stats['hits'] += 1
+                    return response
+                if self.semantic:
+                    best, best_score = None, self.threshold
+                    for seen, key in openings.items():
+                        score = similarity(seen, answer)
+                        if score >= best_score:
+                            best, best_score = key, score
+                    response = self._get_locked(best) if best else None
+                    if response is not None:
+                        self.stats['near_hits'] += 1
+                        return response
+            self.stats['misses'] += 1
+        return None
+
+    def _get_locked(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return entry[1]
+
+    # ------------------ STORE ------------------
+    def put(self, key: str, response: str) -> None:
+        if not self.enabled or not response:
+            return
+        with self._lock:
+            self._put_locked(key, response)
+        self._maybe_persist()
+
+    def put_opening(self, posting_key: str, answer: str, key: str, response: str) -> None:
+        if not self.enabled or not response:
+            return
+        with self._lock:
+            self._put_locked(key, response)
+            openings = self._openings.setdefault(posting_key, OrderedDict())
+            self._openings.move_to_end(posting_key)
+            openings[normalize(answer)] = key
+            openings.move_to_end(normalize(answer))
+            while len(openings) > self.max_openings_per_posting:
+                openings.popitem(last=False)   # bounds the near-duplicate scan per posting
+            self._evict_postings()
+        self._maybe_persist()
+
+    def _put_locked(self, key, response, expires_at=None):
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (expires_at or time.time() + self.ttl, response)
+        self._bytes += len(response)
+        self.stats['stores'] += 1
+        self._dirty += 1
+        self._evict()
+
+    def _remove(self, key):
+        _, response = self._data.pop(key)
+        self._bytes -= len(response)
+
+    def _evict(self):
+        now = time.time()
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now and len(self._data) <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            self.stats['evictions'] += 1
+
+    def _evict_postings(self):
+        while len(self._openings) > self.max_postings:
+            self._openings.popitem(last=False)   # least recently used posting
+
+    # ------------------ PERSISTENCE ------------------
+    def load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return   # no cache yet, or a corrupt one: start empty
+        now = time.time()
+        with self._lock:
+            for key, expires_at, response in saved.get("entries", []):
+                if expires_at > now:
+                    self._put_locked(key, response, expires_at)
+            for posting_key, answers in saved.get("openings", {}).items():
+                self._openings[posting_key] = OrderedDict(
+                    (answer, key) for answer, key in answers if key in self._data)
+            self._evict_postings()   # saved oldest first, so the most recent postings are kept
+            self.stats['stores'] = 0
+            self._dirty = 0
+        logger.info("loaded %d cached responses from %s", len(self._data), self.path)
+
+    def _maybe_persist(self):
+        if self.path and self._dirty >= self.persist_every:
+            try:
+                self.persist()
+            except OSError as e:
+                logger.warning("could not persist response cache to %s: %s", self.path, e)
+
+    def persist(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            saved = {
+                "entries": [[key, expires_at, response] for key, (expires_at, response) in self._data.items()],
+                "openings": {p: list(answers.items()) for p, answers in self._openings.items()},
+            }
+            self._dirty = 0
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(saved, f, separators=(",", ":"))
+        os.replace(tmp, self.path)   # never leave a half-written cache behind
+
+    def __len__(self):
+        return len(self._data)
+
+
+response_cache = ResponseCache()
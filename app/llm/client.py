@@ -0,0 +1,108 @@
+# app/llm/client.py
+"""Shared, pooled HTTP client for all LLM providers.
+
+One keep-alive `requests.Session` per provider, so interview turns reuse
+warm TCP/TLS connections instead of handshaking on every call.
+
+Connection errors and 5xx answers are retried here with a short, bounded
+backoff. A 429 is not: its Retry-After can be a minute, which would stall
+the turn inside the call. It goes straight back to the router, whose rate
+limiter holds the key while the turn hedges or falls back.
+"""
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from ..metrics import PROVIDER_CONNECT_SECONDS, add_span
+
+# Defaults; overridden from app.config by configure()
+settings = {
+    'LLM_POOL_SIZE': 20,           # max keep-alive connections per provider
+    'LLM_CONNECT_TIMEOUT': 3.05,
+    'LLM_READ_TIMEOUT': 20.0,
+    'LLM_MAX_RETRIES': 2,
+    'LLM_RETRY_BACKOFF': 0.3,      # exponential backoff factor (seconds)
+    'LLM_RETRY_JITTER': 0.2,       # random extra 0..N seconds per retry
+}
+
+RETRY_STATUSES = (500, 502, 503, 504)   # not 429: see above
+
+_sessions = {}
+
+
+def configure(config) -> None:
+    """Apply pool/timeout/retry settings and drop existing pools."""
+    for key in settings:
+        if config.get(key) is not None:
+            settings[key] = type(settings[key])(config[key])
+    close_all()
+
+
+def _timed_pools(provider: str) -> dict:
+    """urllib3 pool classes whose new connections record their set-up time for this provider."""
+    def timed(base):
+        class TimedConnection(base):
+            def connect(self):
+                start = time.perf_counter()
+                super().connect()
+                elapsed = time.perf_counter() - start
+                PROVIDER_CONNECT_SECONDS.observe(elapsed, provider=provider)
+                add_span('llm_connect', elapsed)
+        return TimedConnection
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = timed(HTTPConnection)
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = timed(HTTPSConnection)
+
+    return {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+
+def _build_session(provider: str) -> requests.Session:
+    retry = Retry(
+        total=settings['LLM_MAX_RETRIES'],
+        connect=settings['LLM_MAX_RETRIES'],
+        read=0,                      # never replay a request the provider may have processed
+        status=settings['LLM_MAX_RETRIES'],
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=None,        # chat completions are POST
+        backoff_factor=settings['LLM_RETRY_BACKOFF'],
+        backoff_jitter=settings['LLM_RETRY_JITTER'],
+        respect_retry_after_header=False,   # a 503's Retry-After is unbounded too: backoff only
+        raise_on_status=False,       # hand the last 5xx back to the caller
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings['LLM_POOL_SIZE'],
+        pool_block=False,
+        max_retries=retry,
+    )
+    adapter.poolmanager.pool_classes_by_scheme = _timed_pools(provider)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(provider: str) -> requests.Session:
+    session = _sessions.get(provider)
+    if session is None:
+        session = _sessions.setdefault(provider, _build_session(provider))
+    return session
+
+
+def post(provider: str, url: str, **kwargs) -> requests.Response:
+    """POST through the provider's pool with the configured (connect, read) timeouts."""
+    kwargs.setdefault('timeout', (settings['LLM_CONNECT_TIMEOUT'], settings['LLM_READ_TIMEOUT']))
+    return get_session(provider).post(url, **kwargs)
+
+
+def close_all() -> None:
+    for session in _sessions.values():
+        session.close()
+    _sessions.clear()
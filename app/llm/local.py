@@ -0,0 +1,286 @@
+# app/llm/local.py
+"""The `local` provider: one CPU model shared by every session, continuously batched.
+
+Each interview turn becomes a sequence in a shared scheduler instead of its
+own request. A single loop drives the engine one forward pass at a time:
+
+- When the model is idle, the first request waits up to LOCAL_LLM_MAX_WAIT_MS
+  for others, so a burst of turns starts as one batch.
+- While a batch is running, new requests join at the next step (up to
+  LOCAL_LLM_MAX_BATCH sequences and the KV-cache budget), and finished ones
+  leave. Nobody waits for the slowest reply in the batch.
+- Every step feeds one token per running sequence first, then as much of the
+  newly admitted prompts as fits LOCAL_LLM_BATCH_TOKENS (chunked prefill).
+  A long prompt never stalls the replies that are already streaming.
+
+Tokens are pushed to each caller's queue as they're sampled. Callers speak
+the OpenAI chat-completions shapes (`create_chat_completion`), so the
+provider layer treats `local` like any other endpoint, minus the network.
+"""
+import codecs
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Iterator, List
+
+import numpy as np
+
+from . import client
+from .local_engines import LocalEngine, create_engine
+from ..metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+BATCH_SEQUENCES = Histogram('local_llm_batch_sequences', 'Sequences in each forward pass of the local model',
+                            buckets=(1, 2, 4, 8, 16, 32, 64))
+LOCAL_TOKENS = Counter('local_llm_tokens_total', 'Tokens processed by the local model', ('kind',))
+LOCAL_QUEUE_SECONDS = Histogram('local_llm_queue_seconds', 'Request submitted to joining the running batch')
+
+
+class LocalLLMError(Exception):
+    """The local model can't serve a request (not configured, prompt too long, engine failure)."""
+
+
+class _Sequence:
+    __slots__ = ('prompt', 'pending', 'pos', 'output', 'max_tokens', 'temperature', 'slot', 'chunks',
+                 'decoder', 'emitted', 'finish_reason', 'cancelled', 'submitted')
+
+    def __init__(self, prompt: List[int], max_tokens: int, temperature: float):
+        self.prompt = prompt
+        self.pending = list(prompt)    # tokens not yet in the KV cache
+        self.pos = 0                   # tokens already in it
+        self.output = []
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.slot = None
+        self.chunks = queue.Queue()    # text pieces, then None (done) or an exception
+        self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self.emitted = False
+        self.finish_reason = None
+        self.cancelled = False
+        self.submitted = time.monotonic()
+
+    @property
+    def reserved(self) -> int:
+        return len(self.prompt) + self.max_tokens
+
+
+class LocalLLM:
+    def __init__(self):
+        self.engine: LocalEngine = None
+        self.max_batch = 16
+        self.max_wait = 0.005
+        self._waiting = deque()
+        self._active: List[_Sequence] = []
+        self._slots = []
+        self._reserved = 0             # KV tokens promised to active sequences
+        self._cond = threading.Condition()
+        self._offload = None
+        self._rng = np.random.default_rng()
+        self.stats = {'requests': 0, 'rejected': 0, 'steps': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine is not None
+
+    @property
+    def model(self) -> str:
+        return self.engine.model if self.engine is not None else 'local'
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    @property
+    def active(self) -> int:
+        return len(self._active)
+
+    def configure(self, config, socketio=None) -> None:
+        self.max_batch = int(config.get('LOCAL_LLM_MAX_BATCH', self.max_batch))
+        self.max_wait = float(config.get('LOCAL_LLM_MAX_WAIT_MS', self.max_wait * 1000)) / 1000
+        if not config.get('LOCAL_LLM_ENGINE') or self.enabled:
+            return
+        engine = create_engine(config)
+        try:
+            # Under eventlet a forward pass would stall every greenlet; run it on a real thread
+            from eventlet import patcher, tpool
+            if patcher.is_monkey_patched('thread'):
+                self._offload = tpool.execute
+        except ImportError:
+            pass
+        self.start(engine, socketio.start_background_task if socketio is not None else None)
+
+    def start(self, engine: LocalEngine, spawn=None) -> None:
+        """Serve `engine` from a scheduler loop (spawned with `spawn`, default a daemon thread)."""
+        from .providers import PROVIDER_ENDPOINTS
+        self.engine = engine
+        self._slots = list(range(self.max_batch - 1, -1, -1))
+        PROVIDER_ENDPOINTS['local']['model'] = engine.model   # part of every reply-cache key
+        if spawn is None:
+            threading.Thread(target=self._run, name='local-llm', daemon=True).start()
+        else:
+            spawn(self._run)
+
+    # ------------------ CALLERS ------------------
+    def submit(self, messages: List[dict], max_tokens: int = 150, temperature: float = 0.7) -> _Sequence:
+        if self.engine is None:
+            raise LocalLLMError("local provider is not configured (set LOCAL_LLM_ENGINE)")
+        prompt = self.engine.encode(messages)
+        if len(prompt) + max_tokens > self.engine.n_ctx:
+            self.stats['rejected'] += 1
+            raise LocalLLMError(f"prompt of {len(prompt)} tokens doesn't fit LOCAL_LLM_CONTEXT")
+        seq = _Sequence(prompt, max_tokens, temperature)
+        with self._cond:
+            self._waiting.append(seq)
+            self.stats['requests'] += 1
+            self._cond.notify()
+        return seq
+
+    def pieces(self, seq: _Sequence) -> Iterator[str]:
+        """Text of `seq` as it's generated; closing early frees its slot at the next step."""
+        timeout = client.settings['LLM_READ_TIMEOUT']
+        try:
+            while True:
+                try:
+                    item = seq.chunks.get(timeout=timeout)
+                except queue.Empty:
+                    raise LocalLLMError(f"no token for {timeout:.0f}s (local model overloaded)") from None
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            seq.cancelled = seq.finish_reason is None
+
+    def create_chat_completion(self, request: dict):
+        """OpenAI chat completions, in-process: a request dict in, a response dict out
+        (or, with "stream": true, an iterator of chunk dicts)."""
+        seq = self.submit(request['messages'], int(request.get('max_tokens') or 150),
+                          float(request.get('temperature', 0.7)))
+        head = {'id': f'chatcmpl-{uuid.uuid4().hex}', 'created': int(time.time()), 'model': self.model}
+        if request.get('stream'):
+            return self._chunk_dicts(seq, head)
+        text = ''.join(self.pieces(seq))
+        return {**head, 'object': 'chat.completion',
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text},
+                             'finish_reason': seq.finish_reason}],
+                'usage': {'prompt_tokens': len(seq.prompt), 'completion_tokens': len(seq.output),
+                          'total_tokens': len(seq.prompt) + len(seq.output)}}
+
+    def _chunk_dicts(self, seq, head):
+        for text in self.pieces(seq):
+            yield {**head, 'object': 'chat.completion.chunk',
+                   'choices': [{'index': 0, 'delta': {'content': text}, 'finish_reason': None}]}
+        yield {**head, 'object': 'chat.completion.chunk',
+               'choices': [{'index': 0, 'delta': {}, 'finish_reason': seq.finish_reason}]}
+
+    # ------------------ SCHEDULER ------------------
+    def _admit(self) -> None:
+        with self._cond:
+            if not self._active:
+                while not self._waiting:
+                    self._cond.wait()
+                # A fresh batch waits briefly for company
+                deadline = time.monotonic() + self.max_wait
+                while len(self._waiting) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            now = time.monotonic()
+            while self._waiting and self._slots:
+                seq = self._waiting[0]
+                if seq.cancelled:
+                    self._waiting.popleft()
+                    continue
+                if self._reserved + seq.reserved > self.engine.n_ctx:
+                    break   # KV cache is spoken for; admit when a sequence finishes
+                self._waiting.popleft()
+                seq.slot = self._slots.pop()
+                self._reserved += seq.reserved
+                self._active.append(seq)
+                LOCAL_QUEUE_SECONDS.observe(now - seq.submitted)
+
+    def _release(self, seq: _Sequence) -> None:
+        self._active.remove(seq)
+        self.engine.release(seq.slot)
+        with self._cond:
+            self._slots.append(seq.slot)
+            self._reserved -= seq.reserved
+
+    def _finish(self, seq: _Sequence, reason: str) -> None:
+        tail = seq.decoder.decode(b'', final=True)
+        if tail:
+            seq.chunks.put(tail)
+        seq.finish_reason = reason
+        seq.chunks.put(None)
+        self._release(seq)
+
+    def _step(self) -> None:
+        for seq in [s for s in self._active if s.cancelled]:
+            self._release(seq)
+        # Running sequences' next tokens first, then prompt chunks of new ones
+        order = sorted(self._active, key=lambda s: len(s.pending) > 1)
+        entries, fed, budget = [], [], self.engine.n_batch
+        for seq in order:
+            if budget <= 0:
+                break
+            take = seq.pending[:budget]
+            entries.append((seq.slot, take, seq.pos, len(take) == len(seq.pending)))
+            fed.append(seq)
+            budget -= len(take)
+        if not entries:
+            return
+        if self._offload is not None:
+            logits = self._offload(self.engine.forward, entries)
+        else:
+            logits = self.engine.forward(entries)
+
+        prompt_tokens = row = 0
+        for seq, (_, take, _, want) in zip(fed, entries):
+            seq.pos += len(take)
+            del seq.pending[:len(take)]
+            if not seq.output:
+                prompt_tokens += len(take)
+            if not want:
+                continue
+            token = self.engine.sample(seq, logits[row], self._rng)
+            row += 1
+            if self.engine.is_stop(token):
+                self._finish(seq, 'stop')
+                continue
+            seq.output.append(token)
+            seq.pending.append(token)
+            text = seq.decoder.decode(self.engine.piece(token))
+            if not seq.emitted:
+                text = text.lstrip()
+            if text:
+                seq.emitted = True
+                seq.chunks.put(text)
+            if len(seq.output) >= seq.max_tokens:
+                self._finish(seq, 'length')
+
+        self.stats['steps'] += 1
+        self.stats['prompt_tokens'] += prompt_tokens
+        self.stats['completion_tokens'] += row
+        BATCH_SEQUENCES.observe(len(fed))
+        LOCAL_TOKENS.inc(prompt_tokens, kind='prompt')
+        LOCAL_TOKENS.inc(row, kind='completion')
+
+    def _run(self) -> None:
+        while True:
+            self._admit()
+            try:
+                self._step()
+            except Exception as e:
+                logger.exception("local model step failed")
+                for seq in list(self._active):
+                    seq.chunks.put(LocalLLMError(f"local model failed: {e}"))
+                    self._release(seq)
+
+
+local_llm = LocalLLM()
@@ -0,0 +1,221 @@
+# app/llm/local_engines.py
+"""CPU inference engines behind the `local` provider.
+
+The scheduler in `local.py` drives an engine one forward pass at a time and
+owns everything else (admission, sampling, streaming). An engine only has to
+implement the small interface below; `create_engine` picks one by name from
+ENGINES (add your own class there). Real engines are optional dependencies,
+imported on first use:
+
+    LOCAL_LLM_ENGINE=llama_cpp  pip install llama-cpp-python  LOCAL_LLM_MODEL_PATH=/models/llama-3.2-1b-instruct-q4_k_m.gguf
+    LOCAL_LLM_ENGINE=synthetic  (no model: for load tests and CI)
+
+Every active sequence owns a slot (0..max_seqs-1) and its own positions in
+the engine's shared KV cache, so one forward pass can mix prompt chunks of
+newly admitted sequences with the next token of every running one.
+"""
+import os
+import zlib
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# (slot, tokens to feed, position of the first of them, return logits for the last one?)
+Entry = Tuple[int, List[int], int, bool]
+
+
+class LocalEngine:
+    model = 'local'
+    n_ctx = 16384      # KV cache tokens shared by every sequence
+    n_batch = 512      # most tokens one forward pass takes
+
+    def encode(self, messages: List[dict]) -> List[int]:
+        """Chat messages -> prompt tokens (chat template applied)."""
+        raise NotImplementedError
+
+    def piece(self, token: int) -> bytes:
+        """Bytes of one generated token (may be part of a UTF-8 character)."""
+        raise NotImplementedError
+
+    def is_stop(self, token: int) -> bool:
+        raise NotImplementedError
+
+    def forward(self, entries: Sequence[Entry]) -> np.ndarray:
+        """One batched forward pass; returns a (n wanted, vocab) float32 logits array in entry order."""
+        raise NotImplementedError
+
+    def sample(self, seq, logits: np.ndarray, rng: np.random.Generator) -> int:
+        if seq.temperature <= 0:
+            return int(np.argmax(logits))
+        z = logits.astype(np.float64) / seq.temperature
+        z -= z.max()
+        p = np.exp(z)
+        return int(rng.choice(len(p), p=p / p.sum()))
+
+    def release(self, slot: int) -> None:
+        """Forget a finished sequence's KV entries so the slot can be reused."""
+
+
+# ------------------ LOAD-TEST ENGINE ------------------
+SYNTHETIC_REPLIES = (
+    "That sounds like a solid piece of work. Can you walk me through a specific decision you made "
+    "and what you learned from it?",
+    "Thanks for sharing that. What was the hardest trade-off you faced, and how did you decide?",
+    "Interesting. If you had to do it again, what would you change about your approach?",
+    "Got it. How did you measure whether it worked, and what did the numbers show?",
+)
+
+
+class SyntheticEngine(LocalEngine):
+    """No model file. Each forward pass does the matrix work of a small model (token embeddings
+    through `layers` dim x dim projections and a vocab-sized output head, all sequences' tokens
+    in one matrix) but there is no attention, and the text is a canned follow-up question picked
+    by the prompt. Batching behaves like the real thing; answers don't."""
+    model = 'synthetic'
+
+    def __init__(self, n_ctx: int = 16384, n_batch: int = 512, dim: int = 512, layers: int = 8,
+                 vocab: int = 8192, seed: int = 0):
+        self.n_ctx = n_ctx
+        self.n_batch = n_batch
+        rng = np.random.default_rng(seed)
+        self.embed = rng.standard_normal((vocab, dim), dtype=np.float32)
+        self.layers = [rng.standard_normal((dim, dim), dtype=np.float32) / np.sqrt(dim) for _ in range(layers)]
+        self.head = rng.standard_normal((dim, vocab), dtype=np.float32) / np.sqrt(dim)
+        self.words = sorted({w for reply in SYNTHETIC_REPLIES for w in reply.split()})
+        ids = {w: i for i, w in enumerate(self.words)}
+        self.scripts = [[ids[w] for w in reply.split()] for reply in SYNTHETIC_REPLIES]
+        self.eos = vocab - 1
+        self.vocab = vocab
+
+    def encode(self, messages):
+        # One token per word, hashed into the vocabulary
+        text = " ".join(m.get("content") or "" for m in messages)
+        return [zlib.crc32(w.encode()) % self.eos for w in text.split()] or [0]
+
+    def piece(self, token):
+        return (" " + self.words[token]).encode() if token < len(self.words) else b""
+
+    def is_stop(self, token):
+        return token == self.eos
+
+    def forward(self, entries):
+        tokens = np.fromiter((t for _, toks, _, _ in entries for t in toks), dtype=np.intp)
+        h = self.embed[tokens]
+        for w in self.layers:
+            h = np.tanh(h @ w)
+        ends = np.cumsum([len(toks) for _, toks, _, _ in entries]) - 1
+        wanted = [end for end, (_, _, _, want) in zip(ends, entries) if want]
+        return h[wanted] @ self.head
+
+    def sample(self, seq, logits, rng):
+        script = self.scripts[hash(tuple(seq.prompt[-32:])) % len(self.scripts)]
+        i = len(seq.output)
+        return script[i] if i < len(script) else self.eos
+
+
+# ------------------ LLAMA.CPP ------------------
+class LlamaCppEngine(LocalEngine):
+    """A GGUF model through llama.cpp's batch API: one `llama_decode` per step for every sequence."""
+
+    def __init__(self, model_path: str, n_ctx: int = 16384, n_batch: int = 512, threads: int = 0,
+                 max_seqs: int = 16):
+        try:
+            import llama_cpp
+            from llama_cpp.llama_chat_format import Jinja2ChatFormatter
+        except ImportError as e:
+            raise RuntimeError("LOCAL_LLM_ENGINE=llama_cpp requires the 'llama-cpp-python' package") from e
+        if not model_path:
+            raise RuntimeError("LOCAL_LLM_ENGINE=llama_cpp requires LOCAL_LLM_MODEL_PATH")
+        self._lib = llama_cpp
+        self.model = os.path.basename(model_path)
+        self.n_ctx = n_ctx
+        self.n_batch = n_batch
+        # The high-level object loads the weights and gives us the tokenizer and chat template;
+        # its own single-sequence context is kept tiny and never used for generation
+        self.llm = llama_cpp.Llama(model_path, n_ctx=256, n_threads=threads or None, verbose=False)
+        params = llama_cpp.llama_context_default_params()
+        params.n_ctx = n_ctx
+        params.n_batch = n_batch
+        params.n_seq_max = max_seqs
+        if threads:
+            params.n_threads = params.n_threads_batch = threads
+        new_context = getattr(llama_cpp, 'llama_init_from_model', None) or llama_cpp.llama_new_context_with_model
+        self.ctx = new_context(self.llm._model.model, params)
+        if not self.ctx:
+            raise RuntimeError("llama.cpp could not create a context; lower LOCAL_LLM_CONTEXT")
+        self.batch = llama_cpp.llama_batch_init(n_batch, 0, max_seqs)
+        self.n_vocab = self.llm.n_vocab()
+
+        eos = self.llm.token_eos()
+        template = self.llm.metadata.get('tokenizer.chat_template')
+        self._formatter = None
+        stops = []
+        if template:
+            special = lambda t: self.llm.detokenize([t], special=True).decode('utf-8', 'ignore')
+            self._formatter = Jinja2ChatFormatter(template, eos_token=special(eos),
+                                                  bos_token=special(self.llm.token_bos()))
+            stops = ['<|eot_id|>', '<|im_end|>', '<|end|>', '<end_of_turn>']
+        self._stop = {eos}
+        for text in stops:
+            ids = self.llm.tokenize(text.encode(), add_bos=False, special=True)
+            if len(ids) == 1:
+                self._stop.add(ids[0])
+
+    def encode(self, messages):
+        if self._formatter is not None:
+            prompt = self._formatter(messages=messages).prompt
+            return self.llm.tokenize(prompt.encode(), add_bos=False, special=True)
+        prompt = "".join(f"### {m['role'].title()}:\n{m['content']}\n\n" for m in messages) + "### Assistant:\n"
+        return self.llm.tokenize(prompt.encode(), add_bos=True)
+
+    def piece(self, token):
+        return self.llm.detokenize([token])
+
+    def is_stop(self, token):
+        return token in self._stop
+
+    def forward(self, entries):
+        lib, batch = self._lib, self.batch
+        n, rows = 0, []
+        for slot, tokens, pos, want in entries:
+            last = len(tokens) - 1
+            for j, token in enumerate(tokens):
+                batch.token[n] = token
+                batch.pos[n] = pos + j
+                batch.n_seq_id[n] = 1
+                batch.seq_id[n][0] = slot
+                batch.logits[n] = want and j == last
+                if want and j == last:
+                    rows.append(n)
+                n += 1
+        batch.n_tokens = n
+        if lib.llama_decode(self.ctx, batch) != 0:
+            raise RuntimeError("llama_decode failed (KV cache full?)")
+        out = np.empty((len(rows), self.n_vocab), dtype=np.float32)
+        for r, i in enumerate(rows):
+            out[r] = np.ctypeslib.as_array(lib.llama_get_logits_ith(self.ctx, i), shape=(self.n_vocab,))
+        return out
+
+    def release(self, slot):
+        lib = self._lib
+        # The KV-cache API was renamed twice upstream
+        if hasattr(lib, 'llama_memory_seq_rm'):
+            lib.llama_memory_seq_rm(lib.llama_get_memory(self.ctx), slot, -1, -1)
+        else:
+            (getattr(lib, 'llama_kv_self_seq_rm', None) or lib.llama_kv_cache_seq_rm)(self.ctx, slot, -1, -1)
+
+
+ENGINES = {'synthetic': SyntheticEngine, 'llama_cpp': LlamaCppEngine}
+
+
+def create_engine(config) -> LocalEngine:
+    name = config.get('LOCAL_LLM_ENGINE')
+    if name not in ENGINES:
+        raise ValueError(f"Unknown LOCAL_LLM_ENGINE: {name!r} (choose from {', '.join(ENGINES)})")
+    n_ctx = int(config.get('LOCAL_LLM_CONTEXT', 16384))
+    n_batch = int(config.get('LOCAL_LLM_BATCH_TOKENS', 512))
+    if name == 'synthetic':
+        return SyntheticEngine(n_ctx=n_ctx, n_batch=n_batch)
+    return LlamaCppEngine(config.get('LOCAL_LLM_MODEL_PATH'), n_ctx=n_ctx, n_batch=n_batch,
+                          threads=int(config.get('LOCAL_LLM_THREADS', 0)),
+                          max_seqs=int(config.get('LOCAL_LLM_MAX_BATCH', 16)))
@@ -1,8 +1,79 @@
 # app/llm/prompt_engine.py
-def build_interviewer_prompt(context: str, follow_up_hint: str = "") -> str:
-    base = f"""
+"""Interviewer prompt templates, compiled once at import time.
+
+Prompts are laid out static-first so providers' prompt (prefix) caching can
+kick in: the system message is byte-identical for every turn of every
+interview, the job posting block is identical for every candidate of that
+posting, and only the tail (tone, history, latest answer) changes per turn.
+"""
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+_FIELD = re.compile(r"\$\{(\w+)\}")
+
+
+class PromptTemplate:
+    """`${name}` placeholders, pre-split into literal segments so rendering is a single join."""
+
+    def __init__(self, text: str):
+        parts = _FIELD.split(text)
+        self._literals = parts[0::2]
+        self.fields = parts[1::2]
+        self.static_prefix = self._literals[0]   # text before the first placeholder
+
+    def render(self, **values) -> str:
+        out = [self._literals[0]]
+        for name, literal in zip(self.fields, self._literals[1:]):
+            out.append(str(values[name]))
+            out.append(literal)
+        return "".join(out)
+
+
+class BuiltPrompt(NamedTuple):
+    system: str
+    user: str
+    prefix_chars: int   # leading chars (system + user) identical across sessions for this posting
+
+
+INTERVIEWER_SYSTEM = PromptTemplate("""
+You are a human-like, thoughtful, and analytical senior hiring manager conducting a voice interview. Always probe deeper.
+
+Instructions:
+- First, acknowledge their answer with 1 sentence (adjust tone based on mood).
+- If they were vague, ask for a specific example or detail.
+- If they mentioned a challenge, ask how they felt or what they learned.
+- Then ask a thoughtful follow-up question that shows you were listening.
+- Do NOT repeat previous topics.
+- Keep total response under 40 words.
+- Sound like a real person—use natural pauses and transitions.
+""".strip())
+
+INTERVIEWER_POSTING = PromptTemplate("Role: ${job_role}\nJob description: ${job_desc}\n\n")
+
+INTERVIEWER_TURN = PromptTemplate(
+    "Previous candidate answers:\n${history}\n\n"
+    "Latest answer: ${answer}\n\n"
+    "Tone for this reply: ${tone}"
+)
+
+SYSTEM_PROMPT = INTERVIEWER_SYSTEM.render()
+
+
+@lru_cache(maxsize=1024)
+def posting_block(job_role: str, job_desc: str) -> str:
+    """Per-posting block; cached so every candidate for a posting shares one string."""
+    return INTERVIEWER_POSTING.render(job_role=job_role, job_desc=job_desc[:200])
+
+
+def build_turn_prompt(job_role: str, job_desc: str, tone: str, history: str, answer: str) -> BuiltPrompt:
+    posting = posting_block(job_role, job_desc)
+    user = posting + INTERVIEWER_TURN.render(history=history, answer=answer, tone=tone)
+    return BuiltPrompt(SYSTEM_PROMPT, user, len(SYSTEM_PROMPT) + len(posting) + len(INTERVIEWER_TURN.static_prefix))
+
+
+BASE_GUIDELINES = PromptTemplate("""
     You are a senior hiring manager conducting a voice interview.
-    Previous conversation context: "{context}"
 
     Guidelines:
     - Acknowledge the candidate's last point briefly.
@@ -10,7 +81,13 @@ def build_interviewer_prompt(context: str, follow_up_hint: str = "") -> str:
     - If they mentioned a skill, ask how they applied it under pressure.
     - Keep responses concise (1–2 sentences max).
     - NEVER sound robotic or repetitive.
-    """
+
+    Previous conversation context: "${context}"
+    """)
+
+
+def build_interviewer_prompt(context: str, follow_up_hint: str = "") -> str:
+    base = BASE_GUIDELINES.render(context=context)
     if follow_up_hint:
         base += f"\nSpecifically probe: {follow_up_hint}"
-    return base
\ No newline at end of file
+    return base
@@ -1,132 +1,186 @@
-import requests
-from .utils import sanitize_input
+import json
+import os
+import time
+from . import client
+from .local import LocalLLMError, local_llm
+from ..metrics import PROVIDER_SECONDS, PROVIDER_TTFB_SECONDS, add_span
 
-# ------------------ GROQ ------------------
-def call_groq_llm(api_key: str, user_message: str, system_prompt: str = "") -> str:
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-    payload = {
-        "model": "llama-3.1-8b-instant",
-        "messages": [
-            {"role": "system", "content": system_prompt or "You are a helpful assistant."},
-            {"role": "user", "content": user_message}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 150
-    }
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=20)
-        if response.status_code == 200:
-            return response.json()["choices"][0]["message"]["content"].strip()
-        else:
-            return f"Groq Error {response.status_code}: {response.text[:100]}"
-    except Exception as e:
-        return f"Groq Error: {str(e)[:100]}"
+PROMPT_MAX_CHARS = 8000
 
-# ------------------ TOGETHER AI ------------------
-def call_together_llm(api_key: str, user_message: str, system_prompt: str = "") -> str:
-    url = "https://api.together.xyz/v1/chat/completions"
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-    payload = {
+# Chat-completions endpoint + model per provider (all OpenAI-compatible).
+# URLs can be overridden via env, e.g. GROQ_API_URL=http://127.0.0.1:8001/v1/chat/completions
+# `local` is served in-process by the CPU model in local.py (no URL, no API key).
+PROVIDER_ENDPOINTS = {
+    "groq": {
+        "label": "Groq",
+        "url": os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions"),
+        "model": "llama-3.1-8b-instant",
+        "headers": {},
+    },
+    "together": {
+        "label": "Together",
+        "url": os.getenv("TOGETHER_API_URL", "https://api.together.xyz/v1/chat/completions"),
         "model": "meta-llama/Llama-3-8b-chat-hf",
-        "messages": [
-            {"role": "system", "content": system_prompt or "You are a helpful assistant."},
-            {"role": "user", "content": user_message}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 150
-    }
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=20)
-        if response.status_code == 200:
-            return response.json()["choices"][0]["message"]["content"].strip()
-        else:
-            return f"Together Error {response.status_code}: {response.text[:100]}"
-    except Exception as e:
-        return f"Together Error: {str(e)[:100]}"
-
-# ------------------ OPENROUTER ------------------
-def call_openrouter_llm(api_key: str, user_message: str, system_prompt: str = "") -> str:
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "http://localhost:5000",
-        "X-Title": "Voice AI Interviewer"
-    }
-    payload = {
+        "headers": {},
+    },
+    "openrouter": {
+        "label": "OpenRouter",
+        "url": os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions"),
         "model": "meta-llama/llama-3.1-8b-instruct:free",
-        "messages": [
-            {"role": "system", "content": system_prompt or "You are a helpful assistant."},
-            {"role": "user", "content": user_message}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 150
-    }
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=20)
-        if response.status_code == 200:
-            return response.json()["choices"][0]["message"]["content"].strip()
-        else:
-            return f"OpenRouter Error {response.status_code}: {response.text[:100]}"
-    except Exception as e:
-        return f"OpenRouter Error: {str(e)[:100]}"
+        "headers": {"HTTP-Referer": "http://localhost:5000", "X-Title": "Voice AI Interviewer"},
+    },
+    "perplexity": {
+        "label": "Perplexity",
+        "url": os.getenv("PERPLEXITY_API_URL", "https://api.perplexity.ai/chat/completions"),
+        "model": "llama-3.1-sonar-small-128k-online",
+        "headers": {},
+    },
+    "local": {
+        "label": "Local",
+        "url": None,
+        "model": "local",          # set to the engine's model when it starts
+        "headers": {},
+        "in_process": True,
+    },
+}
+
+LOCAL = "local"
+INVALID_PROVIDER = "Invalid provider. Choose: groq, together, openrouter, perplexity, or local"
+
+
+def needs_api_key(provider: str) -> bool:
+    return not PROVIDER_ENDPOINTS.get(provider, {}).get("in_process")
+
+# ------------------ STREAMING (SSE) ------------------
+def iter_sse_deltas(lines):
+    """Yield content deltas from OpenAI-style `data: {...}` SSE lines."""
+    for raw in lines:
+        if not raw:
+            continue
+        line = raw.decode("utf-8", "ignore") if isinstance(raw, bytes) else raw
+        if not line.startswith("data:"):
+            continue  # comments / keep-alives / event names
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            choice = json.loads(data)["choices"][0]
+        except (ValueError, KeyError, IndexError):
+            continue
+        delta = (choice.get("delta") or {}).get("content") or ""
+        if delta:
+            yield delta
+
+
+class ProviderError(Exception):
+    """A provider call failed (HTTP error status or transport error)."""
+
+    def __init__(self, provider: str, message: str, status: int = None, retry_after: float = None):
+        super().__init__(f"{PROVIDER_ENDPOINTS[provider]['label']} Error{f' {status}' if status else ''}: {message[:100]}")
+        self.provider = provider
+        self.status = status
+        self.retry_after = retry_after   # seconds, from a 429's Retry-After header
+
 
-# ------------------ PERPLEXITY ------------------
-def call_perplexity_llm(api_key: str, user_message: str, system_prompt: str = "") -> str:
-    url = "https://api.perplexity.ai/chat/completions"
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+def _status_error(provider: str, response) -> ProviderError:
+    retry_after = None
+    if response.status_code == 429:
+        try:
+            retry_after = float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            pass   # absent, or an HTTP date
+    return ProviderError(provider, response.text, response.status_code, retry_after)
+
+
+def _chat_request(provider: str, api_key: str, user_message: str, system_prompt: str, stream: bool = False,
+                  max_tokens: int = 150):
+    endpoint = PROVIDER_ENDPOINTS[provider]
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json", **endpoint["headers"]}
     payload = {
-        "model": "llama-3.1-sonar-small-128k-online",
+        "model": endpoint["model"],
         "messages": [
             {"role": "system", "content": system_prompt or "You are a helpful assistant."},
             {"role": "user", "content": user_message}
         ],
         "temperature": 0.7,
-        "max_tokens": 150
+        "max_tokens": max_tokens
     }
+    if stream:
+        payload["stream"] = True
+    return endpoint["url"], headers, payload
+
+
+def request_completion(provider: str, api_key: str, user_message: str, system_prompt: str = "",
+                       max_tokens: int = 150) -> str:
+    """Like call_<provider>_llm, but raises ProviderError instead of returning an error string."""
+    url, headers, payload = _chat_request(provider, api_key, user_message, system_prompt, max_tokens=max_tokens)
+    labels = {"provider": provider, "model": payload["model"]}
+    start = time.perf_counter()
+    outcome = "error"
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=20)
-        if response.status_code == 200:
-            return response.json()["choices"][0]["message"]["content"].strip()
-        else:
-            return f"Perplexity Error {response.status_code}: {response.text[:100]}"
-    except Exception as e:
-        return f"Perplexity Error: {str(e)[:100]}"
-
-# ------------------ MAIN DISPATCHER ------------------
-def call_llm(api_key: str, user_message: str, system_prompt: str = "", provider: str = "groq") -> str:
-    user_message = sanitize_input(user_message)
-    system_prompt = sanitize_input(system_prompt) or "You are a helpful assistant."
-    
-    providers = {
-        "groq": call_groq_llm,
-        "together": call_together_llm,
-        "openrouter": call_openrouter_llm,
-        "perplexity": call_perplexity_llm
-    }
-    
-    func = providers.get(provider.lower())
-    if func:
-        return func(api_key, user_message, system_prompt)
-    else:
-        return "Invalid provider. Choose: groq, together, openrouter, or perplexity"
-    
+        if provider == LOCAL:
+            try:
+                text = local_llm.create_chat_completion(payload)["choices"][0]["message"]["content"].strip()
+            except LocalLLMError as e:
+                raise ProviderError(provider, str(e)) from e
+            outcome = "ok"
+            return text
+        try:
+            response = client.post(provider, url, headers=headers, json=payload)
+        except Exception as e:
+            raise ProviderError(provider, str(e)) from e
+        PROVIDER_TTFB_SECONDS.observe(response.elapsed.total_seconds(), **labels)
+        add_span('llm_ttfb', response.elapsed.total_seconds(), first=True)
+        if response.status_code != 200:
+            raise _status_error(provider, response)
+        try:
+            text = response.json()["choices"][0]["message"]["content"].strip()
+        except (ValueError, KeyError, IndexError) as e:
+            raise ProviderError(provider, f"malformed response: {e}") from e
+        outcome = "ok"
+        return text
+    finally:
+        PROVIDER_SECONDS.observe(time.perf_counter() - start, outcome=outcome, **labels)
+
 
+def _http_deltas(provider: str, url: str, headers: dict, payload: dict):
+    try:
+        response = client.post(provider, url, headers=headers, json=payload, stream=True)
+    except Exception as e:
+        raise ProviderError(provider, str(e)) from e
+    with response:
+        if response.status_code != 200:
+            raise _status_error(provider, response)
+        yield from iter_sse_deltas(response.iter_lines())
 
 
+def _local_deltas(payload: dict):
+    try:
+        for chunk in local_llm.create_chat_completion(payload):
+            delta = chunk["choices"][0]["delta"].get("content") or ""
+            if delta:
+                yield delta
+    except LocalLLMError as e:
+        raise ProviderError(LOCAL, str(e)) from e
 
 
- # Alias for compatibility with events.py
-def get_llm_response(prompt: str, system_prompt: str = "", provider: str = "groq") -> str:
-    """
-    Unified interface for LLM calls. Uses GROQ by default.
-    """
-    from flask import current_app
+def open_stream(provider: str, api_key: str, user_message: str, system_prompt: str = ""):
+    """Generator of text chunks; raises ProviderError (before any chunk) if the request fails."""
+    url, headers, payload = _chat_request(provider, api_key, user_message, system_prompt, stream=True)
+    labels = {"provider": provider, "model": payload["model"]}
+    start = time.perf_counter()
+    outcome = "error"
+    deltas = _local_deltas(payload) if provider == LOCAL else _http_deltas(provider, url, headers, payload)
     try:
-        api_key = current_app.config.get("LLM_API_KEY")
-        if not api_key:
-            return "Error: LLM API key not configured."
-        return call_llm(api_key, prompt, system_prompt, provider)
-    except Exception as e:
-        return f"LLM call failed: {str(e)[:100]}"   
\ No newline at end of file
+        first = True
+        for delta in deltas:
+            if first:
+                ttfb = time.perf_counter() - start   # first token
+                PROVIDER_TTFB_SECONDS.observe(ttfb, **labels)
+                add_span('llm_ttfb', ttfb, first=True)
+                first = False
+            yield delta
+        outcome = "ok"
+    finally:
+        deltas.close()   # stopped early: drop the HTTP stream / free the local sequence now
+        PROVIDER_SECONDS.observe(time.perf_counter() - start, outcome=outcome, **labels)
@@ -0,0 +1,329 @@
+# app/llm/router.py
+"""Latency-aware provider routing with hedged requests and circuit breakers.
+
+Each provider's rolling latency and error rate are tracked as EWMAs. A turn
+goes to the fastest healthy provider the request has a key for: the
+candidate's own provider, plus, only with LLM_SERVER_FALLBACK on (calls are
+then billed to the server), any provider the server has a fallback key for
+(GROQ_API_KEY, TOGETHER_API_KEY, ...). A turn on the in-process `local`
+model never leaves the machine. If no answer arrives within the
+hedge delay (the provider's recent p95 by default), a second request is
+fired at the next-best provider and whichever answers first wins. The loser
+can't be aborted mid-request, so its result is simply dropped. With a single
+route there is no hedge unless LLM_HEDGE_SAME_ROUTE asks for a duplicate on
+the same provider and key (twice the spend, and twice the rate-limit budget).
+
+Repeated failures open a provider's circuit breaker for a cooldown; after
+that a single trial request decides whether it closes again. Failures never
+reach the candidate as "Groq Error 429..." text: if every route fails the
+interviewer says a neutral line and the error is logged.
+
+Every HTTP call first waits its turn in the rate limiter (scheduler.py),
+which shares each provider fairly across API keys. A 429
+holds that key in the limiter rather than counting against the provider's
+breaker, since it says nothing about the provider's health for other keys.
+"""
+import contextvars
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from .providers import (INVALID_PROVIDER, LOCAL, PROVIDER_ENDPOINTS, PROMPT_MAX_CHARS, ProviderError, needs_api_key,
+                        open_stream, request_completion)
+from .scheduler import INTERACTIVE, RateLimited, llm_scheduler
+from .utils import sanitize_input
+from ..conversation.memory import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_REPLY = "Sorry, I lost my train of thought for a second. Could you tell me a little more about that?"
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+# The provider whose reply the caller's last complete()/stream() returned; None for the fallback line
+answered_by = contextvars.ContextVar('answered_by', default=None)
+
+
+class Abandoned(Exception):
+    """The caller no longer wanted the reply by the time the rate limiter let the call go."""
+
+
+class ProviderHealth:
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.latency = None          # EWMA seconds (successful calls)
+        self.error_rate = 0.0        # EWMA of 0/1 failures
+        self.recent = deque(maxlen=200)
+        self.ttft = deque(maxlen=200)    # time to first token of streams (not comparable to full calls)
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def p95(self):
+        if len(self.recent) < 20:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+class LLMRouter:
+    def __init__(self):
+        self.hedging = True
+        self.hedge_delay = 0.0           # seconds; 0 = use the provider's rolling p95
+        self.default_hedge_delay = 2.0   # until there are enough samples for a p95
+        self.hedge_same_route = False    # with one route, hedge by repeating it
+        self.breaker_threshold = 5
+        self.breaker_cooldown = 30.0
+        self.server_fallback = False     # add the server's keys as routes for every turn
+        self.fallback_keys = {}          # provider -> server-side API key
+        self.alpha = 0.2
+        self.health = {name: ProviderHealth(self.alpha) for name in PROVIDER_ENDPOINTS}
+        self.scheduler = llm_scheduler
+        self._lock = threading.Lock()
+
+    def configure(self, config) -> None:
+        self.hedging = bool(config.get('LLM_HEDGING', self.hedging))
+        self.hedge_delay = float(config.get('LLM_HEDGE_DELAY', self.hedge_delay))
+        self.hedge_same_route = bool(config.get('LLM_HEDGE_SAME_ROUTE', self.hedge_same_route))
+        self.breaker_threshold = int(config.get('LLM_BREAKER_THRESHOLD', self.breaker_threshold))
+        self.breaker_cooldown = float(config.get('LLM_BREAKER_COOLDOWN', self.breaker_cooldown))
+        self.server_fallback = bool(config.get('LLM_SERVER_FALLBACK', self.server_fallback))
+        self.fallback_keys = {p: k for p, k in (config.get('LLM_FALLBACK_KEYS') or {}).items() if k}
+        self.health = {name: ProviderHealth(self.alpha) for name in PROVIDER_ENDPOINTS}
+
+    # ------------------ HEALTH ------------------
+    def _available(self, provider: str, now: float) -> bool:
+        h = self.health[provider]
+        if h.state == CLOSED:
+            return True
+        if h.state == OPEN and now - h.opened_at >= self.breaker_cooldown:
+            h.state = HALF_OPEN
+        if h.state == HALF_OPEN and not h.trial_in_flight:
+            return True
+        return False
+
+    def record(self, provider: str, elapsed: float, ok: bool, streamed: bool = False) -> None:
+        """streamed=True: elapsed is a stream's time to first token, kept apart from full-call latency."""
+        with self._lock:
+            h = self.health[provider]
+            h.trial_in_flight = False
+            h.error_rate += self.alpha * ((0.0 if ok else 1.0) - h.error_rate)
+            if ok:
+                if streamed:
+                    h.ttft.append(elapsed)
+                else:
+                    h.latency = elapsed if h.latency is None else h.latency + self.alpha * (elapsed - h.latency)
+                    h.recent.append(elapsed)
+                h.consecutive_failures = 0
+                h.state = CLOSED
+            else:
+                h.consecutive_failures += 1
+                if h.state == HALF_OPEN or h.consecutive_failures >= self.breaker_threshold:
+                    if h.state != OPEN:
+                        logger.warning("circuit open for %s after %d failures", provider, h.consecutive_failures)
+                    h.state = OPEN
+                    h.opened_at = time.monotonic()
+
+    def routes(self, provider: str, api_key: str):
+        """[(provider, key)] ordered fastest-healthy first."""
+        keys = {}
+        if self.server_fallback and provider != LOCAL:
+            keys.update(self.fallback_keys)
+        if provider in PROVIDER_ENDPOINTS:
+            keys[provider] = api_key
+        now = time.monotonic()
+        with self._lock:
+            healthy = [p for p in keys if self._available(p, now)]
+            # Unmeasured providers sort after measured ones, the candidate's own choice first among equals
+            healthy.sort(key=lambda p: (self.health[p].latency is None,
+                                        (self.health[p].latency or 0.0) * (1 + 4 * self.health[p].error_rate),
+                                        p != provider))
+        return [(p, keys[p]) for p in healthy]
+
+    def _claim(self, provider: str) -> bool:
+        """Reserve the single trial request of a half-open breaker; closed breakers always pass."""
+        with self._lock:
+            h = self.health[provider]
+            if h.state == CLOSED:
+                return True
+            if h.state == HALF_OPEN and not h.trial_in_flight:
+                h.trial_in_flight = True
+                return True
+            return False
+
+    def _release_trial(self, provider: str) -> None:
+        """Give back a half-open trial that never reached the provider (or was rate-limited)."""
+        with self._lock:
+            self.health[provider].trial_in_flight = False
+
+    def _acquire(self, provider: str, key: str, tokens: int, priority: int) -> None:
+        # The in-process model has its own batch queue and no per-key limits
+        if needs_api_key(provider):
+            self.scheduler.acquire(provider, key, tokens, priority)
+
+    def _failed(self, provider: str, key: str, elapsed: float, error: Exception) -> None:
+        if isinstance(error, ProviderError) and error.status == 429:
+            self.scheduler.throttled(provider, key, error.retry_after)
+            self._release_trial(provider)
+        else:
+            self.record(provider, elapsed, ok=False)
+
+    def _hedge_after(self, provider: str) -> float:
+        if self.hedge_delay > 0:
+            return self.hedge_delay
+        return self.health[provider].p95() or self.default_hedge_delay
+
+    # ------------------ CALLS ------------------
+    def _attempt(self, provider, key, user_message, system_prompt, results, max_tokens=150, tokens=0,
+                 priority=INTERACTIVE, admitted=None):
+        try:
+            self._acquire(provider, key, tokens, priority)
+            if admitted is not None and not admitted():
+                raise Abandoned(f"{provider} call dropped by its caller")
+        except (RateLimited, Abandoned) as e:
+            self._release_trial(provider)
+            results.put((provider, None, e))
+            return
+        start = time.monotonic()
+        try:
+            text = request_completion(provider, key, user_message, system_prompt, max_tokens)
+        except Exception as e:
+            self._failed(provider, key, time.monotonic() - start, e)
+            results.put((provider, None, e))
+            return
+        self.record(provider, time.monotonic() - start, ok=True)
+        results.put((provider, text, None))
+
+    def complete(self, api_key: str, user_message: str, system_prompt: str = "", provider: str = "groq",
+                 max_tokens: int = 150, hedge: bool = True, priority: int = INTERACTIVE, admitted=None) -> str:
+        """One reply: routed, hedged, rate-limited, and never a provider error string.
+
+        hedge=False for background work where a duplicate request costs more than the wait;
+        priority is the rate limiter's class (scheduler.INTERACTIVE, NEW or BACKGROUND);
+        admitted() is called as a request leaves the limiter, and returning False drops it.
+        """
+        answered_by.set(None)
+        provider = provider.lower()
+        user_message = sanitize_input(user_message, max_len=PROMPT_MAX_CHARS)
+        system_prompt = sanitize_input(system_prompt, max_len=PROMPT_MAX_CHARS) or "You are a helpful assistant."
+        routes = self.routes(provider, api_key)
+        if not routes:
+            if provider not in PROVIDER_ENDPOINTS:
+                return INVALID_PROVIDER
+            logger.error("no healthy route for %s (circuit open)", provider)
+            return FALLBACK_REPLY
+
+        tokens = estimate_tokens(system_prompt + user_message) + max_tokens
+        results = queue.Queue()
+        # With a single route, the hedge goes to the same provider again only if configured (never
+        # for the in-process model: a duplicate there only takes a batch slot from another turn)
+        if len(routes) > 1:
+            pending = list(routes)
+        else:
+            duplicate = self.hedge_same_route and not PROVIDER_ENDPOINTS[routes[0][0]].get('in_process')
+            pending = routes * (2 if duplicate else 1)
+        in_flight = 0
+        errors = []
+
+        def launch():
+            nonlocal in_flight
+            while pending:
+                p, key = pending.pop(0)
+                # A hedge can't overtake a queue: don't add one to a key that's waiting its turn
+                if in_flight and self.scheduler.queued(p, key):
+                    continue
+                if self._claim(p):
+                    # Copy the context so the attempt's connect/TTFB spans land on the caller's turn trace
+                    threading.Thread(target=contextvars.copy_context().run, daemon=True,
+                                     args=(self._attempt, p, key, user_message, system_prompt, results,
+                                           max_tokens, tokens, priority, admitted)).start()
+                    in_flight += 1
+                    return p
+            return None
+
+        first = launch()
+        if first is None:
+            return FALLBACK_REPLY
+        hedge_at = time.monotonic() + self._hedge_after(first)
+        while in_flight:
+            timeout = None
+            if self.hedging and hedge and pending:
+                timeout = max(0.0, hedge_at - time.monotonic())
+            try:
+                p, text, err = results.get(timeout=timeout)
+            except queue.Empty:
+                # Primary is slower than its p95: hedge to the next route (or the same one again)
+                hedged = launch()
+                if hedged:
+                    logger.info("hedging %s -> %s", first, hedged)
+                continue
+            in_flight -= 1
+            if err is None:
+                answered_by.set(p)
+                return text
+            if isinstance(err, Abandoned):
+                return FALLBACK_REPLY
+            errors.append(err)
+            if isinstance(err, RateLimited):
+                pending[:] = [r for r in pending if r[0] != p]   # its duplicate would wait just as long
+            if pending:
+                launch()   # failed fast: fall over immediately
+        logger.error("all LLM routes failed: %s", "; ".join(str(e) for e in errors))
+        return FALLBACK_REPLY
+
+    def stream(self, api_key: str, user_message: str, system_prompt: str = "", provider: str = "groq",
+               priority: int = INTERACTIVE):
+        """Streamed counterpart of complete(). No hedging (two streams can't be merged), but a route that
+        fails or ends before its first chunk falls over to the next one."""
+        answered_by.set(None)
+        provider = provider.lower()
+        user_message = sanitize_input(user_message, max_len=PROMPT_MAX_CHARS)
+        system_prompt = sanitize_input(system_prompt, max_len=PROMPT_MAX_CHARS) or "You are a helpful assistant."
+        routes = self.routes(provider, api_key)
+        if not routes and provider not in PROVIDER_ENDPOINTS:
+            yield INVALID_PROVIDER
+            return
+        tokens = estimate_tokens(system_prompt + user_message) + 150
+        for p, key in routes:
+            if not self._claim(p):
+                continue
+            try:
+                self._acquire(p, key, tokens, priority)
+            except RateLimited as e:
+                self._release_trial(p)
+                logger.warning("stream via %s not sent: %s", p, e)
+                continue
+            start = time.monotonic()
+            chunks = open_stream(p, key, user_message, system_prompt)
+            try:
+                first = next(chunks, None)
+            except Exception as e:
+                self._failed(p, key, time.monotonic() - start, e)
+                logger.warning("stream via %s failed: %s", p, e)
+                continue
+            ttft = time.monotonic() - start
+            if first is None:
+                # A 200 with nothing in it would reach the candidate as an empty reply
+                self._failed(p, key, ttft, ProviderError(p, "empty stream"))
+                logger.warning("stream via %s was empty", p)
+                continue
+            answered_by.set(p)
+            yield first
+            try:
+                yield from chunks
+            except Exception as e:
+                # Part of the reply is already out, so there is no falling over now
+                self.record(p, time.monotonic() - start, ok=False)
+                answered_by.set(None)   # half a reply: nothing to reuse
+                logger.warning("stream via %s broke mid-reply: %s", p, e)
+                return
+            self.record(p, ttft, ok=True, streamed=True)
+            return
+        yield FALLBACK_REPLY
+
+
+router = LLMRouter()
@@ -0,0 +1,348 @@
+# app/llm/scheduler.py
+"""Fair-share admission in front of provider calls: token buckets per API key and provider.
+
+Candidates bring their own API keys, and providers rate-limit per key
+(requests and tokens per minute). Without a gate, one tenant starting a
+burst of interviews drains its key, the provider answers 429, retries pile
+on, and every turn of that tenant stalls; with a shared server key it's
+everyone's turns. Every HTTP provider call first takes a ticket here:
+
+- Buckets: each (provider, key) has an RPM and a TPM bucket, and each
+  provider has RPM/TPM buckets over all keys (LLM_KEY_RPM, LLM_KEY_TPM,
+  LLM_PROVIDER_RPM, LLM_PROVIDER_TPM, overridable per provider with
+  LLM_RATE_LIMITS). A bucket holds LLM_RATE_BURST_SECONDS worth of its rate.
+  0 = no limit, the default: set the limits of the keys you expect. A ticket
+  costs 1 request and its estimated tokens (prompt + max_tokens).
+- Order: start-time fair queuing across tenants (API keys) on each
+  provider's virtual clock, so a tenant with 40 queued turns doesn't delay a
+  tenant with one by 40 turns. LLM_TENANT_WEIGHTS gives some tenants a larger
+  share (by `tenant_id`, a key fingerprint). Within its share a tenant's own
+  calls go by priority: INTERACTIVE turns of interviews in progress, then
+  NEW interviews' first turns. BACKGROUND work (speculation, scoring) goes
+  only when no tenant has anything else for that provider.
+- A tenant whose key is out of budget doesn't hold up other keys; a provider
+  out of budget holds everything for it, so the next call in fair order is
+  the one that goes when budget returns.
+- Waiting is bounded (LLM_QUEUE_MAX_WAIT, longer for BACKGROUND): a ticket
+  that can't go in time raises RateLimited and the router falls over to
+  another route or says its neutral line. A 429 from the provider holds the
+  key for Retry-After seconds instead of opening the provider's breaker.
+- New interviews are refused at start (`admit_new`) while their key or
+  provider already has a backlog, so in-progress interviews keep their pace.
+
+Providers count over a sliding minute, and a bucket can send its burst on top
+of a minute's rate, so set limits about 15% under the provider's. Buckets
+are per process, like the router's health; with several workers divide the
+limits by the worker count.
+"""
+import bisect
+import hashlib
+import itertools
+import json
+import logging
+import threading
+import time
+
+from ..metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE, NEW, BACKGROUND = 0, 1, 2
+PRIORITY_NAMES = ('interactive', 'new', 'background')
+
+QUEUE_SECONDS = Histogram('llm_queue_wait_seconds', 'Provider call queued to admitted by the rate limiter',
+                          ('provider', 'priority'))
+QUEUE_REJECTIONS = Counter('llm_queue_rejections_total', 'Provider calls or new interviews refused by the rate limiter',
+                           ('provider', 'reason'))
+UPSTREAM_RATE_LIMITED = Counter('llm_provider_rate_limited_total', 'Provider answers with HTTP 429', ('provider',))
+
+
+class RateLimited(Exception):
+    """A provider call couldn't get its turn within the maximum wait."""
+
+
+def tenant_id(api_key: str) -> str:
+    """Stable, non-secret fingerprint of an API key (for LLM_TENANT_WEIGHTS and logs)."""
+    return hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()[:12]
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'capacity', 'level', 'updated')
+
+    def __init__(self, per_minute: float, burst_seconds: float, now: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = now
+
+    def wait(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (0 = now). More than a full bucket waits for a full one."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def drain(self) -> None:
+        self.level = min(self.level, 0.0)
+
+
+def _buckets(rpm, tpm, burst_seconds, now):
+    return (TokenBucket(rpm, burst_seconds, now) if rpm > 0 else None,
+            TokenBucket(tpm, burst_seconds, now) if tpm > 0 else None)
+
+
+def _wait(buckets, tokens, now) -> float:
+    rpm, tpm = buckets
+    return max(rpm.wait(1, now) if rpm else 0.0, tpm.wait(tokens, now) if tpm else 0.0)
+
+
+def _take(buckets, tokens) -> None:
+    rpm, tpm = buckets
+    if rpm:
+        rpm.take(1)
+    if tpm:
+        tpm.take(tokens)
+
+
+class _Lane:
+    """One provider: its own buckets and the virtual clock of its fair queue."""
+    __slots__ = ('buckets', 'vtime', 'queued')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.vtime = 0.0
+        self.queued = [0, 0, 0]   # per priority
+
+
+class _Tenant:
+    """One API key on one provider: its buckets, fair-queue position and queued tickets."""
+    __slots__ = ('lane', 'buckets', 'weight', 'finish', 'hold_until', 'tickets', 'used')
+
+    def __init__(self, lane, buckets, weight):
+        self.lane = lane
+        self.buckets = buckets
+        self.weight = weight
+        self.finish = 0.0        # virtual time its last granted ticket finishes
+        self.hold_until = 0.0    # after a 429: nothing goes out before this
+        self.tickets = []        # (priority, seq, ticket), sorted
+        self.used = 0.0
+
+    def rank(self):
+        priority, seq, _ = self.tickets[0]
+        return priority == BACKGROUND, max(self.lane.vtime, self.finish), seq
+
+
+class _Ticket:
+    __slots__ = ('tokens', 'priority', 'event', 'granted')
+
+    def __init__(self, tokens, priority):
+        self.tokens = tokens
+        self.priority = priority
+        self.event = threading.Event()
+        self.granted = False
+
+
+class LLMScheduler:
+    def __init__(self):
+        self.enabled = True
+        self.key_rpm = 0.0
+        self.key_tpm = 0.0
+        self.provider_rpm = 0.0
+        self.provider_tpm = 0.0
+        self.limits = {}               # provider -> {'key_rpm', 'key_tpm', 'rpm', 'tpm'} overrides
+        self.burst_seconds = 10.0
+        self.max_wait = 8.0
+        self.background_max_wait = 60.0
+        self.penalty = 2.0             # hold after a 429 without Retry-After
+        self.admit_max_queued = 8      # per key
+        self.admit_max_queued_provider = 64
+        self.weights = {}              # tenant_id -> weight
+        self._lanes = {}
+        self._tenants = {}             # (provider, key) -> _Tenant
+        self._backlogged = set()       # tenants with queued tickets
+        self._seq = itertools.count()
+        self._swept = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {'granted': 0, 'waited': 0, 'timeouts': 0, 'refused_new': 0, 'upstream_429': 0}
+
+    def configure(self, config) -> None:
+        self.enabled = bool(config.get('LLM_SCHEDULER_ENABLED', self.enabled))
+        self.key_rpm = float(config.get('LLM_KEY_RPM', self.key_rpm))
+        self.key_tpm = float(config.get('LLM_KEY_TPM', self.key_tpm))
+        self.provider_rpm = float(config.get('LLM_PROVIDER_RPM', self.provider_rpm))
+        self.provider_tpm = float(config.get('LLM_PROVIDER_TPM', self.provider_tpm))
+        limits = config.get('LLM_RATE_LIMITS') or {}
+        self.limits = json.loads(limits) if isinstance(limits, str) else dict(limits)
+        self.burst_seconds = float(config.get('LLM_RATE_BURST_SECONDS', self.burst_seconds))
+        self.max_wait = float(config.get('LLM_QUEUE_MAX_WAIT', self.max_wait))
+        self.background_max_wait = float(config.get('LLM_QUEUE_MAX_WAIT_BACKGROUND', self.background_max_wait))
+        self.penalty = float(config.get('LLM_RATE_LIMIT_PENALTY', self.penalty))
+        self.admit_max_queued = int(config.get('LLM_ADMIT_MAX_QUEUED', self.admit_max_queued))
+        self.admit_max_queued_provider = int(config.get('LLM_ADMIT_MAX_QUEUED_PROVIDER',
+                                                        self.admit_max_queued_provider))
+        weights = config.get('LLM_TENANT_WEIGHTS') or {}
+        self.weights = {k: float(v) for k, v in (json.loads(weights) if isinstance(weights, str) else weights).items()}
+        with self._lock:
+            self._lanes.clear()
+            self._tenants.clear()
+            self._backlogged.clear()
+
+    def _limit(self, provider: str, name: str, default: float) -> float:
+        return float(self.limits.get(provider, {}).get(name, default))
+
+    def _lane(self, provider: str, now: float) -> _Lane:
+        lane = self._lanes.get(provider)
+        if lane is None:
+            lane = self._lanes[provider] = _Lane(_buckets(self._limit(provider, 'rpm', self.provider_rpm),
+                                                          self._limit(provider, 'tpm', self.provider_tpm),
+                                                          self.burst_seconds, now))
+        return lane
+
+    def _tenant(self, provider: str, key: str, now: float) -> _Tenant:
+        tenant = self._tenants.get((provider, key))
+        if tenant is None:
+            tenant = self._tenants[(provider, key)] = _Tenant(
+                self._lane(provider, now),
+                _buckets(self._limit(provider, 'key_rpm', self.key_rpm),
+                         self._limit(provider, 'key_tpm', self.key_tpm), self.burst_seconds, now),
+                self.weights.get(tenant_id(key), 1.0))
+        tenant.used = now
+        return tenant
+
+    # ------------------ CALLERS ------------------
+    def acquire(self, provider: str, key: str, tokens: int, priority: int = INTERACTIVE) -> float:
+        """Block until a call to `provider` with `key` may go; returns the seconds waited.
+
+        Raises RateLimited if it can't go within the priority's maximum wait.
+        """
+        if not self.enabled:
+            return 0.0
+        start = time.monotonic()
+        deadline = start + (self.background_max_wait if priority == BACKGROUND else self.max_wait)
+        with self._lock:
+            tenant = self._tenant(provider, key, start)
+            ticket = _Ticket(tokens, priority)
+            entry = (priority, next(self._seq), ticket)
+            bisect.insort(tenant.tickets, entry)
+            tenant.lane.queued[priority] += 1
+            self._backlogged.add(tenant)
+            retry = self._dispatch(start)
+        while not ticket.granted:
+            now = time.monotonic()
+            if now >= deadline:
+                with self._lock:
+                    if not ticket.granted:
+                        self._dequeue(tenant, entry)
+                        self.stats['timeouts'] += 1
+                        QUEUE_REJECTIONS.inc(provider=provider, reason='timeout')
+                        raise RateLimited(f"{provider} rate limit: no turn within {deadline - start:.0f}s "
+                                          f"(tenant {tenant_id(key)})")
+                break
+            # Woken early when another caller's dispatch grants us
+            ticket.event.wait(min(retry, deadline - now))
+            with self._lock:
+                retry = self._dispatch(time.monotonic())
+        waited = time.monotonic() - start
+        if waited > 0.001:
+            self.stats['waited'] += 1
+        QUEUE_SECONDS.observe(waited, provider=provider, priority=PRIORITY_NAMES[priority])
+        return waited
+
+    def throttled(self, provider: str, key: str, retry_after: float = None) -> None:
+        """The provider answered 429 for `key`: hold its tickets for Retry-After and empty its buckets."""
+        UPSTREAM_RATE_LIMITED.inc(provider=provider)
+        self.stats['upstream_429'] += 1
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            tenant = self._tenant(provider, key, now)
+            tenant.hold_until = max(tenant.hold_until, now + (retry_after or self.penalty))
+            for bucket in tenant.buckets:
+                if bucket:
+                    bucket.drain()
+        logger.warning("%s rate-limited tenant %s; holding its calls", provider, tenant_id(key))
+
+    def admit_new(self, provider: str, key: str) -> bool:
+        """Whether a new interview may start now: not while its key or provider has a backlog."""
+        if not self.enabled:
+            return True
+        with self._lock:
+            tenant = self._tenants.get((provider, key))
+            lane = self._lanes.get(provider)
+            backlog = (tenant is not None and len(tenant.tickets) >= self.admit_max_queued) or \
+                      (lane is not None and sum(lane.queued) >= self.admit_max_queued_provider)
+        if backlog:
+            self.stats['refused_new'] += 1
+            QUEUE_REJECTIONS.inc(provider=provider, reason='admission')
+        return not backlog
+
+    def queued(self, provider: str, key: str) -> int:
+        tenant = self._tenants.get((provider, key))
+        return len(tenant.tickets) if tenant is not None else 0
+
+    def depth(self) -> dict:
+        """{(provider, priority name): queued tickets}, for the queue-depth gauge."""
+        with self._lock:
+            return {(p, PRIORITY_NAMES[i]): n for p, lane in self._lanes.items() for i, n in enumerate(lane.queued)}
+
+    # ------------------ DISPATCH (under the lock) ------------------
+    def _dequeue(self, tenant: _Tenant, entry) -> None:
+        tenant.tickets.remove(entry)
+        tenant.lane.queued[entry[0]] -= 1
+        if not tenant.tickets:
+            self._backlogged.discard(tenant)
+
+    def _dispatch(self, now: float) -> float:
+        """Grant every ticket that may go, in fair order; returns seconds until one more might."""
+        retry = 1.0
+        heads = []
+        for tenant in self._backlogged:
+            if tenant.hold_until > now:
+                retry = min(retry, tenant.hold_until - now)
+            else:
+                heads.append(tenant)
+        while heads:
+            tenant = min(heads, key=_Tenant.rank)
+            lane = tenant.lane
+            entry = tenant.tickets[0]
+            ticket = entry[2]
+            wait = _wait(lane.buckets, ticket.tokens, now)
+            if wait > 0:
+                # The provider is out of budget: nobody ranked after this tenant may overtake it
+                heads = [t for t in heads if t.lane is not lane]
+                retry = min(retry, wait)
+                continue
+            wait = _wait(tenant.buckets, ticket.tokens, now)
+            if wait > 0:
+                # Only this key is out of budget; the others go ahead
+                heads.remove(tenant)
+                retry = min(retry, wait)
+                continue
+            _take(lane.buckets, ticket.tokens)
+            _take(tenant.buckets, ticket.tokens)
+            # Start-time fair queuing: the provider's clock moves to the start tag of what it serves,
+            # and the tenant's next ticket starts where this one finishes
+            lane.vtime = max(lane.vtime, tenant.finish)
+            tenant.finish = lane.vtime + ticket.tokens / tenant.weight
+            self._dequeue(tenant, entry)
+            if not tenant.tickets:
+                heads.remove(tenant)
+            ticket.granted = True
+            ticket.event.set()
+            self.stats['granted'] += 1
+        if now - self._swept > 60:
+            self._sweep(now)
+        return max(retry, 0.001)
+
+    def _sweep(self, now: float) -> None:
+        # Forget keys idle for 10 minutes (their buckets would be full again anyway)
+        self._swept = now
+        for k in [k for k, t in self._tenants.items() if not t.tickets and now - t.used > 600]:
+            del self._tenants[k]
+
+
+llm_scheduler = LLMScheduler()
@@ -1,5 +1,32 @@
 import re
 
-def sanitize_input(text: str) -> str:
+def sanitize_input(text: str, max_len: int = 500) -> str:
     """Remove problematic characters to avoid prompt corruption."""
-    return re.sub(r'[<>"{}]', '', text.strip())[:500]
\ No newline at end of file
+    cleaned = re.sub(r'[<>"{}]', '', text.strip())
+    return cleaned[:max_len] if max_len else cleaned
+
+# Sentence end = . ! or ? (optionally followed by a closing quote/bracket) then whitespace
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
+
+class SentenceBuffer:
+    """Accumulates streamed text and hands back complete sentences."""
+
+    def __init__(self):
+        self._buf = ""
+
+    def feed(self, chunk: str) -> list:
+        self._buf += chunk
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buf):
+            sentence = self._buf[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self._buf = self._buf[start:]
+        return sentences
+
+    def flush(self) -> str:
+        rest, self._buf = self._buf.strip(), ""
+        return rest
@@ -0,0 +1,225 @@
+# app/metrics.py
+"""In-process metrics (counters, gauges, histograms) and per-turn tracing.
+
+Rendered in the Prometheus text format at /metrics. Values are per worker
+process; scrape every worker (or sum in the query) when running several.
+
+    with trace.span('prompt_build'):
+        built = build_prompt(...)
+
+A `TurnTrace` records named spans for one turn, observes each into
+`interview_turn_stage_seconds{stage=...}` and logs the whole turn as one
+structured line, so a slow turn can be broken down after the fact. While a
+trace is active (`with trace.active():`), code deeper down adds its own spans
+with `add_span()`, e.g. the HTTP client's connection set-up and time to first byte.
+"""
+import bisect
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+# Turn/provider latencies: 5 ms .. 30 s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_str(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _fmt(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels) -> tuple:
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_label_str(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(Metric):
+    """Set explicitly, or computed at scrape time from `fn` (returning a number or {labels tuple: number})."""
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames=(), fn=None):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+        self.fn = fn
+
+    def set(self, value, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self):
+        if self.fn is not None:
+            try:
+                value = self.fn()
+            except Exception:
+                logger.exception("gauge %s failed", self.name)
+                return []
+            items = sorted(value.items()) if isinstance(value, dict) else [((), value)]
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_label_str(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        names = self.labelnames + ("le",)
+        lines = self.header()
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_label_str(names, key + (_fmt(bound),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_str(names, key + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {_fmt(series[-2])}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+REGISTRY = []
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ------------------ INTERVIEW METRICS ------------------
+TURN_SECONDS = Histogram('interview_turn_seconds', 'Answer received to reply emitted', ('provider', 'streamed'))
+TURN_STAGE_SECONDS = Histogram('interview_turn_stage_seconds', 'Time spent in each stage of a turn', ('stage',))
+TURNS = Counter('interview_turns_total', 'Turns completed', ('provider', 'source'))
+PROVIDER_CONNECT_SECONDS = Histogram('llm_provider_connect_seconds', 'New TCP(+TLS) connection set-up',
+                                     ('provider',))
+PROVIDER_TTFB_SECONDS = Histogram('llm_provider_ttfb_seconds', 'Request sent to first byte / first token',
+                                  ('provider', 'model'))
+PROVIDER_SECONDS = Histogram('llm_provider_request_seconds', 'Whole provider request', ('provider', 'model', 'outcome'))
+BUSY_REJECTIONS = Counter('interview_busy_total', 'Turns refused by back-pressure', ('reason',))
+
+
+# The turn being traced in this context (copied into the router's hedge threads)
+current_trace = ContextVar('current_trace', default=None)
+
+
+def add_span(stage: str, seconds: float, first: bool = False) -> None:
+    """Add to the active turn's span, if any; first=True keeps only the first value (e.g. TTFB of a hedge)."""
+    trace = current_trace.get()
+    if trace is not None and not (first and stage in trace.spans):
+        trace.add(stage, seconds)
+
+
+class TurnTrace:
+    """Spans of one interview turn; finish() records them and logs the breakdown."""
+
+    def __init__(self, interview_id: str, provider: str):
+        self.interview_id = interview_id
+        self.provider = provider
+        self.started = time.perf_counter()
+        self.spans = {}
+        self.attrs = {}
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    @contextmanager
+    def active(self):
+        token = current_trace.set(self)
+        try:
+            yield self
+        finally:
+            current_trace.reset(token)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.spans[stage] = self.spans.get(stage, 0.0) + seconds
+
+    def finish(self, streamed: bool, source: str) -> float:
+        total = time.perf_counter() - self.started
+        for stage, seconds in self.spans.items():
+            TURN_STAGE_SECONDS.observe(seconds, stage=stage)
+        TURN_SECONDS.observe(total, provider=self.provider, streamed=str(streamed).lower())
+        TURNS.inc(provider=self.provider, source=source)
+        logger.info("turn %s", json.dumps({
+            'interview_id': self.interview_id, 'provider': self.provider, 'source': source,
+            'total_ms': round(total * 1000, 1),
+            'spans_ms': {k: round(v * 1000, 1) for k, v in self.spans.items()}, **self.attrs}))
+        return total
@@ -1,11 +1,81 @@
-from flask import Blueprint, render_template, jsonify
+# app/routes.py
+"""HTTP routes: the frontend, liveness/readiness/metrics, and the post-interview reports API."""
+import hmac
+
+from flask import Blueprint, Response, abort, current_app, jsonify, render_template, request
+
+from . import metrics
 
 bp = Blueprint('main', __name__)
 
+
 @bp.route('/')
 def index():
-    return render_template('index.html')
+    return render_template('index.html', audio_enabled=current_app.config.get('AUDIO_ENABLED', False),
+                           local_llm=bool(current_app.config.get('LOCAL_LLM_ENGINE')))
+
 
 @bp.route('/health')
 def health():
-    return jsonify({'status': 'healthy', 'message': 'Voice AI Interviewer is running'})
\ No newline at end of file
+    """Liveness: the process is up and serving requests."""
+    return jsonify({'status': 'healthy', 'message': 'Voice AI Interviewer is running'})
+
+
+@bp.route('/ready')
+def ready():
+    """Readiness: the session store answers and the turn executor has room. 503 otherwise."""
+    from . import events
+    checks = {}
+    try:
+        events.sessions.get('__ready__')
+        checks['session_store'] = 'ok'
+    except Exception as e:
+        checks['session_store'] = f'error: {e}'
+    executor = events.executor
+    capacity = executor.max_workers + executor.max_queue
+    checks['executor'] = 'ok' if executor.admitted < capacity else 'saturated'
+    ok = all(v == 'ok' for v in checks.values())
+    return jsonify({
+        'status': 'ready' if ok else 'unavailable',
+        'checks': checks,
+        'turns_inflight': executor.admitted,
+        'turn_capacity': capacity,
+        'providers': {p: h.state for p, h in events.router.health.items()},
+    }), 200 if ok else 503
+
+
+@bp.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _require_reports_token():
+    """Reports hold candidate answers: the API is only served with ANALYTICS_API_TOKEN set, as a Bearer token."""
+    token = current_app.config.get('ANALYTICS_API_TOKEN')
+    if not token:
+        abort(404)
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    if not hmac.compare_digest(supplied.encode(), token.encode()):
+        abort(401)
+
+
+@bp.route('/api/reports')
+def list_reports():
+    _require_reports_token()
+    from .events import analytics
+    if analytics.store is None:
+        abort(404)
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    offset = request.args.get('offset', 0, type=int)
+    return jsonify({'reports': analytics.store.list(limit, offset, request.args.get('job_role')),
+                    'pending': analytics.pending})
+
+
+@bp.route('/api/reports/<interview_id>')
+def get_report(interview_id):
+    _require_reports_token()
+    from .events import analytics
+    report = analytics.store.get(interview_id) if analytics.store is not None else None
+    if report is None:
+        abort(404)
+    return jsonify(report)
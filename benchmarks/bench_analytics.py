@@ -0,0 +1,71 @@
+# benchmarks/bench_analytics.py
+"""Scoring requests and tokens per candidate: one answer per request vs batched.
+
+    python -m benchmarks.bench_analytics --candidates 200
+
+Completed 5-answer transcripts are pushed through AnalyticsPipeline.process
+against the fake LLM, once with ANALYTICS_BATCH_ANSWERS=1 (a request per
+answer) and once batched. The fake's canned reply doesn't parse as scores,
+so this measures request count and prompt overhead, not score quality.
+"""
+import argparse
+import json
+import time
+
+from app.analytics.pipeline import SCORING_SYSTEM, AnalyticsPipeline
+from app.llm import client
+from app.llm.providers import PROVIDER_ENDPOINTS
+from app.llm.scheduler import llm_scheduler
+from .common import NO_RATE_LIMITS
+from .e2e import ANSWERS
+from .fake_llm import FakeLLMServer
+
+
+def transcripts(n):
+    return [{'interview_id': f'c{c}', 'job_role': 'Backend Engineer', 'job_desc': 'Python services',
+             'provider': 'groq', 'api_key': 'k', 'completed_at': time.time(), 'sentiment_trend': [],
+             'history': [{'answer': ANSWERS[(c + i) % len(ANSWERS)], 'sentiment': 0, 'vague': False,
+                          'confident': True} for i in range(5)]}
+            for c in range(n)]
+
+
+def run(label, llm, batch_answers, candidates, batch_candidates):
+    pipeline = AnalyticsPipeline(socketio=None)
+    pipeline.batch_answers = batch_answers
+    pipeline.score_with_llm = True   # what this measures; off by default
+    before = llm.requests
+    pending = transcripts(candidates)
+    start = time.perf_counter()
+    for i in range(0, len(pending), batch_candidates):
+        pipeline.process(pending[i:i + batch_candidates])
+    elapsed = time.perf_counter() - start
+    requests = llm.requests - before
+    # Every request repeats the system prompt; that's the overhead batching amortises
+    summary = {'label': label, 'candidates': candidates, 'requests': requests,
+               'requests_per_candidate': round(requests / candidates, 2),
+               'system_prompt_chars_per_candidate': round(requests * len(SCORING_SYSTEM) / candidates, 1),
+               'seconds': round(elapsed, 2)}
+    print(json.dumps(summary))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--batch-answers', type=int, default=40)
+    args = parser.parse_args()
+
+    llm = FakeLLMServer(latency=args.latency).start()
+    PROVIDER_ENDPOINTS['groq']['url'] = llm.url
+    client.configure({'LLM_MAX_RETRIES': 0})
+    llm_scheduler.configure(NO_RATE_LIMITS)
+
+    run('per-answer', llm, 1, args.candidates, 1)
+    # Workers gather what's queued within ANALYTICS_BATCH_WAIT; simulate 8 interviews finishing together
+    run('batched', llm, args.batch_answers, args.candidates, 8)
+    llm.shutdown()
+
+
+if __name__ == '__main__':
+    main()
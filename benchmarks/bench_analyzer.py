@@ -0,0 +1,56 @@
+# benchmarks/bench_analyzer.py
+"""Answer analysis cost: legacy substring scans vs the compiled single-pass analyzer.
+
+    python -m benchmarks.bench_analyzer --transcripts 2000 --words 400
+"""
+import argparse
+import random
+import time
+
+from app.conversation.analyzer import DEFAULT_INDICATORS, TextAnalyzer
+
+FILLER = ("we shipped the service to production after testing the hardware integration and "
+          "welcoming feedback from the team about latency throughput database caching deployments").split()
+
+
+def legacy_analyze(text):
+    """The per-answer work handle_user_answer used to do (five lowercases, four scans)."""
+    pos = sum(1 for w in DEFAULT_INDICATORS["positive"] if w in text.lower())
+    neg = sum(1 for w in DEFAULT_INDICATORS["negative"] if w in text.lower())
+    vague = any(v in text.lower() for v in DEFAULT_INDICATORS["vague"])
+    confident = any(c in text.lower() for c in DEFAULT_INDICATORS["confidence"])
+    return (1 if pos > neg else -1 if neg > pos else 0), vague, confident
+
+
+def make_corpus(n, words, seed=7):
+    rng = random.Random(seed)
+    indicators = [p for phrases in DEFAULT_INDICATORS.values() for p in phrases]
+    return [" ".join(rng.choice(indicators) if rng.random() < 0.03 else rng.choice(FILLER)
+                     for _ in range(words)) for _ in range(n)]
+
+
+def bench(label, fn, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<10} {best / len(corpus) * 1e6:8.1f} µs/transcript")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transcripts", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=400, help="words per transcript")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.transcripts, args.words)
+    analyzer = TextAnalyzer()
+    bench("legacy", legacy_analyze, corpus, args.repeat)
+    bench("compiled", analyzer.analyze, corpus, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
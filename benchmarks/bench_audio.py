@@ -0,0 +1,119 @@
+# benchmarks/bench_audio.py
+"""Server audio mode on CPU: frame-path overhead, real-time factor, end-of-speech to first audio.
+
+    python -m benchmarks.bench_audio
+    STT_MODEL_PATH=... TTS_MODEL_PATH=... python -m benchmarks.bench_audio --wav answer.wav
+
+The frame-path comparison always runs. The engine measurements need the
+optional engines (vosk, piper-tts) and their models; they are skipped
+otherwise. --wav must be 16-bit mono PCM.
+"""
+import argparse
+import json
+import os
+import time
+import wave
+
+from app.audio.buffers import RingBuffer
+from app.audio.engines import PcmDecoder, create_speech_to_text, create_text_to_speech
+from app.audio.pipeline import AudioStream
+
+REPLY = ("That sounds like a solid piece of work. "
+         "Can you walk me through a specific decision you made and what you learned from it?")
+
+
+class NullRecognizer:
+    def accept(self, pcm):
+        return None
+
+    def finish(self):
+        return ""
+
+
+def frame_path(seconds, frame_ms, chunk_ms, sample_rate=16000):
+    """MB/s pushing `seconds` of 20 ms frames through bytes concatenation vs the ring buffer."""
+    frame = os.urandom(sample_rate * 2 * frame_ms // 1000)
+    frames = seconds * 1000 // frame_ms
+    chunk = sample_rate * 2 * chunk_ms // 1000
+    total = len(frame) * frames / 1e6
+
+    start = time.perf_counter()
+    buf = b""
+    for _ in range(frames):
+        buf += frame
+        while len(buf) >= chunk:
+            piece, buf = buf[:chunk], buf[chunk:]
+    concat = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stream = AudioStream(NullRecognizer(), PcmDecoder(), sample_rate, chunk_ms, buffer_seconds=10)
+    for _ in range(frames):
+        stream.feed(frame)
+    ring = time.perf_counter() - start
+
+    return {'bench': 'frame_path', 'audio_seconds': seconds, 'frame_ms': frame_ms, 'chunk_ms': chunk_ms,
+            'concat_mb_s': round(total / concat, 1), 'ring_mb_s': round(total / ring, 1),
+            'ring_realtime_streams_per_core': int(total / ring / (sample_rate * 2 / 1e6))}
+
+
+def read_wav(path):
+    with wave.open(path, 'rb') as w:
+        if w.getsampwidth() != 2 or w.getnchannels() != 1:
+            raise SystemExit(f"{path}: need 16-bit mono PCM")
+        return w.readframes(w.getnframes()), w.getframerate()
+
+
+def engines(config, wav_path, frame_ms):
+    results = []
+    tts = create_text_to_speech(config)
+    start = time.perf_counter()
+    samples = sum(len(pcm) // 2 for pcm in tts.synthesize(REPLY))
+    elapsed = time.perf_counter() - start
+    audio_s = samples / tts.sample_rate
+    results.append({'bench': 'tts', 'audio_seconds': round(audio_s, 2), 'rtf': round(elapsed / audio_s, 3)})
+
+    if wav_path:
+        stt = create_speech_to_text(config)
+        pcm, rate = read_wav(wav_path)
+        step = rate * 2 * frame_ms // 1000
+        stream = AudioStream(stt.open(rate), PcmDecoder(), rate)
+        view = memoryview(pcm)
+        start = time.perf_counter()
+        for off in range(0, len(pcm), step):
+            stream.feed(view[off:off + step])
+        fed = time.perf_counter() - start
+        # End of speech -> final transcript -> first synthesised chunk (LLM excluded)
+        end = time.perf_counter()
+        text = stream.finish()
+        transcribed = time.perf_counter()
+        next(iter(tts.synthesize(REPLY)))
+        first_audio = time.perf_counter()
+        audio_s = len(pcm) / 2 / rate
+        results.append({'bench': 'stt', 'audio_seconds': round(audio_s, 2),
+                        'rtf': round((fed + transcribed - end) / audio_s, 3), 'transcript': text[:60]})
+        results.append({'bench': 'end_of_speech_to_first_audio',
+                        'finalize_ms': round((transcribed - end) * 1000, 1),
+                        'first_tts_chunk_ms': round((first_audio - transcribed) * 1000, 1),
+                        'total_ms': round((first_audio - end) * 1000, 1)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=600, help="audio pushed through the frame path")
+    parser.add_argument("--frame-ms", type=int, default=20)
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--wav", help="recorded answer for the STT measurements")
+    args = parser.parse_args()
+
+    print(json.dumps(frame_path(args.seconds, args.frame_ms, args.chunk_ms)))
+    config = {k: os.getenv(k) for k in ('STT_ENGINE', 'STT_MODEL_PATH', 'TTS_ENGINE', 'TTS_MODEL_PATH') if os.getenv(k)}
+    try:
+        for result in engines(config, args.wav, args.frame_ms):
+            print(json.dumps(result))
+    except RuntimeError as e:
+        print(json.dumps({'bench': 'engines', 'skipped': str(e)}))
+
+
+if __name__ == "__main__":
+    main()
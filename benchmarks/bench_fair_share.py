@@ -0,0 +1,107 @@
+# benchmarks/bench_fair_share.py
+"""One tenant's burst of interviews vs everyone else's, with and without the rate limiter.
+
+    python -m benchmarks.bench_fair_share --seconds 40
+
+"groq" is pointed at a fake provider that enforces per-key and provider-wide
+requests-per-minute limits (429 + Retry-After, sliding minute). A noisy
+tenant runs many interviews on one API key; a few quiet tenants run two
+each on their own keys. Every interview is 5 turns through the router, the
+first at NEW priority, with a short think time between answers; when one
+ends the session starts another.
+
+Reported per tenant group and mode: turn latency, fallback ("lost my train
+of thought") replies, interviews refused at start (`admit_new`), and how
+many 429s the provider sent. With the limiter on, the noisy tenant waits in
+its own queue (and starts fewer interviews), quiet tenants' turns stay at
+provider latency, and no turn sees a 429.
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+
+from app.llm import client
+from app.llm.providers import PROVIDER_ENDPOINTS
+from app.llm.router import FALLBACK_REPLY, LLMRouter
+from app.llm.scheduler import INTERACTIVE, NEW, LLMScheduler
+from .common import latency_summary
+from .e2e import ANSWERS
+from .fake_llm import FakeLLMServer
+
+TURNS_PER_INTERVIEW = 5
+
+
+def run(label, args, limiter):
+    server = FakeLLMServer(latency=args.latency, key_rpm=args.key_rpm, rpm=args.rpm).start()
+    PROVIDER_ENDPOINTS["groq"]["url"] = server.url
+    scheduler = LLMScheduler()
+    # 15% under the provider's sliding-minute limits (a bucket's burst comes on top of its rate)
+    scheduler.configure({'LLM_SCHEDULER_ENABLED': limiter, 'LLM_KEY_RPM': args.key_rpm * 0.85,
+                         'LLM_PROVIDER_RPM': args.rpm * 0.85, 'LLM_QUEUE_MAX_WAIT': args.max_wait})
+    router = LLMRouter()
+    router.configure({'LLM_HEDGE_DELAY': 5.0})
+    router.scheduler = scheduler
+    results = {'noisy': [], 'quiet': []}
+    fallbacks = {'noisy': 0, 'quiet': 0}
+    refused = {'noisy': 0, 'quiet': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+
+    def candidate(group, key, seed):
+        rng = random.Random(seed)
+        time.sleep(rng.uniform(0, args.think))   # don't all start in the same millisecond
+        while time.monotonic() < deadline:
+            if not scheduler.admit_new('groq', key):
+                with lock:
+                    refused[group] += 1
+                time.sleep(1.0)
+                continue
+            for turn in range(TURNS_PER_INTERVIEW):
+                if time.monotonic() >= deadline:
+                    return
+                start = time.perf_counter()
+                reply = router.complete(key, f"Candidate: {rng.choice(ANSWERS)}", "You are an interviewer.", 'groq',
+                                        hedge=False, priority=NEW if turn == 0 else INTERACTIVE)
+                with lock:
+                    results[group].append(time.perf_counter() - start)
+                    fallbacks[group] += reply == FALLBACK_REPLY
+                time.sleep(rng.uniform(0.5, 1.5) * args.think)
+
+    threads = [threading.Thread(target=candidate, args=('noisy', 'key-noisy', i), daemon=True)
+               for i in range(args.noisy)]
+    threads += [threading.Thread(target=candidate, args=('quiet', f'key-quiet-{t}', 1000 + t * 10 + i), daemon=True)
+                for t in range(args.quiet_tenants) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for group in ('noisy', 'quiet'):
+        print(json.dumps({'label': label, 'tenant': group, 'turn': latency_summary(results[group]),
+                          'fallback_replies': fallbacks[group], 'refused_starts': refused[group]}))
+    print(json.dumps({'label': label, 'provider_requests': server.requests, 'provider_429s': server.rate_limited,
+                      'scheduler': scheduler.stats}))
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=40)
+    parser.add_argument('--noisy', type=int, default=24, help="interviews running at once on the noisy key")
+    parser.add_argument('--quiet-tenants', type=int, default=3)
+    parser.add_argument('--think', type=float, default=2.0, help="mean seconds between a reply and the next answer")
+    parser.add_argument('--latency', type=float, default=0.3, help="provider latency (s)")
+    parser.add_argument('--key-rpm', type=int, default=240, help="provider limit per API key")
+    parser.add_argument('--rpm', type=int, default=300, help="provider limit over all keys")
+    parser.add_argument('--max-wait', type=float, default=8.0, help="LLM_QUEUE_MAX_WAIT")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)   # one 'all LLM routes failed' line per fallback reply
+    client.configure({'LLM_POOL_SIZE': 64})   # default retries: a 429 is retried after Retry-After, as in the app
+    run('no_limiter', args, limiter=False)
+    run('fair_share', args, limiter=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_http_client.py
+"""Turns/sec of bare `requests.post` vs the pooled provider client.
+
+    python -m benchmarks.bench_http_client --turns 2000 --concurrency 50
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from app.llm import client
+from .fake_llm import FakeLLMServer
+
+PAYLOAD = {"model": "fake", "messages": [{"role": "user", "content": "Tell me about yourself."}]}
+
+
+def bare_post(url):
+    return requests.post(url, json=PAYLOAD, timeout=20).status_code
+
+
+def pooled_post(url):
+    return client.post("groq", url, json=PAYLOAD).status_code
+
+
+def run(label, fn, server, turns, concurrency):
+    start_connections = server.connections
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        statuses = list(pool.map(fn, [server.url] * turns))
+    elapsed = time.perf_counter() - start
+    ok = statuses.count(200)
+    print(f"{label:<8} {turns / elapsed:8.1f} turns/s  "
+          f"{server.connections - start_connections:5d} connections  {ok}/{turns} ok")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--connect-latency", type=float, default=0.03,
+                        help="simulated TCP+TLS handshake cost per new connection")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(latency=args.latency, connect_latency=args.connect_latency).start()
+    client.configure({"LLM_POOL_SIZE": args.concurrency})
+    run("bare", bare_post, server, args.turns, args.concurrency)
+    run("pooled", pooled_post, server, args.turns, args.concurrency)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_local_llm.py
+"""Local provider throughput vs batch size (continuous batching on the CPU).
+
+    python -m benchmarks.bench_local_llm --requests 64 --concurrency 32
+    python -m benchmarks.bench_local_llm --engine llama_cpp --model /models/llama-3.2-1b-instruct-q4_k_m.gguf
+
+`--concurrency` sessions submit interview turns to one LocalLLM at a time,
+once per LOCAL_LLM_MAX_BATCH value. Reported per batch size: generated
+tokens/sec, prompt+generated tokens/sec, the mean sequences per forward
+pass, and per-request time to first token and total time. The default
+`synthetic` engine needs no model file; its numbers show the batching
+effect, not a real model's speed.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.llm.local import LocalLLM
+from app.llm.local_engines import create_engine
+from .common import latency_summary
+from .e2e import ANSWERS
+
+SYSTEM = ("You are a warm, professional interviewer for a Backend Engineer role. Ask one follow-up "
+          "question at a time, grounded in the candidate's last answer. Keep replies under 40 words.")
+POSTING = "Build and operate payment APIs in Python; own reliability, on-call and data migrations. " * 3
+
+
+def run(engine, max_batch, requests, concurrency, max_tokens):
+    llm = LocalLLM()
+    llm.configure({'LOCAL_LLM_MAX_BATCH': max_batch, 'LOCAL_LLM_MAX_WAIT_MS': 5})
+    llm.start(engine)
+    first_token, totals = [], []
+    lock = threading.Lock()
+
+    def turn(k):
+        messages = [{'role': 'system', 'content': SYSTEM},
+                    {'role': 'user', 'content': f"{POSTING}\nCandidate: {ANSWERS[k % len(ANSWERS)]}"}]
+        start = time.perf_counter()
+        seq = llm.submit(messages, max_tokens=max_tokens, temperature=0)
+        first = None
+        for _ in llm.pieces(seq):
+            if first is None:
+                first = time.perf_counter() - start
+        with lock:
+            first_token.append(first or 0.0)
+            totals.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(turn, range(requests)))
+    elapsed = time.perf_counter() - start
+    stats = llm.stats
+    summary = {
+        'max_batch': max_batch,
+        'requests': requests,
+        'seconds': round(elapsed, 2),
+        'completion_tokens_per_sec': round(stats['completion_tokens'] / elapsed, 1),
+        'total_tokens_per_sec': round((stats['completion_tokens'] + stats['prompt_tokens']) / elapsed, 1),
+        'mean_sequences_per_step': round(stats['completion_tokens'] / max(stats['steps'], 1), 2),
+        'first_token': latency_summary(first_token),
+        'request': latency_summary(totals),
+    }
+    print(json.dumps(summary))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--engine', default='synthetic')
+    parser.add_argument('--model', help='LOCAL_LLM_MODEL_PATH for --engine llama_cpp')
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--max-tokens', type=int, default=60)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+    # One engine (one copy of the weights) for every run; each run gets its own scheduler
+    engine = create_engine({'LOCAL_LLM_ENGINE': args.engine, 'LOCAL_LLM_MODEL_PATH': args.model,
+                            'LOCAL_LLM_MAX_BATCH': max(args.batch_sizes)})
+    for max_batch in args.batch_sizes:
+        run(engine, max_batch, args.requests, args.concurrency, args.max_tokens)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# benchmarks/bench_question_bank.py
+"""Question bank lookup latency at 100k questions.
+
+    python -m benchmarks.bench_question_bank --questions 100000 --roles 200
+
+A synthetic bank (role x skill x template questions, plus generic ones) is
+built and saved/loaded like the offline CLI does, then looked up with
+e2e-style answers:
+- a posting seen before (what a turn pays: its job description scores are cached),
+- the first lookup for a new posting,
+- for comparison, the sparse answer against all 100k questions, and a dense
+  (every feature) product over the whole matrix.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from app.conversation.question_bank import QuestionBank
+from .common import percentile
+from .e2e import ANSWERS
+
+SKILLS = ("python", "go", "java", "kubernetes", "terraform", "postgres", "redis", "kafka", "react", "typescript",
+          "spark", "airflow", "pytorch", "a/b testing", "sql", "graphql", "grpc", "aws", "gcp", "security",
+          "observability", "caching", "payments", "search", "mobile", "accessibility", "ci/cd", "data modeling")
+TEMPLATES = ("Tell me about a time you used {s} to solve a hard problem at {n} scale.",
+             "How would you design a {s} setup for a team of {n} engineers?",
+             "What went wrong the first time you ran {s} in production, and what did you change?",
+             "How do you decide when {s} is the right tool, compared with the alternatives?",
+             "Walk me through debugging a {s} issue that only happened under load number {n}.")
+
+
+def summary_us(samples):
+    return {'count': len(samples), **{f'p{p}_us': round(percentile(samples, p) * 1e6, 1) for p in (50, 95, 99)}}
+
+
+def synthetic_entries(n, roles, rng):
+    role_names = [f"Role {i} {rng.choice(SKILLS)} engineer" for i in range(roles)]
+    entries = []
+    for i in range(n):
+        skills = rng.sample(SKILLS, 3)
+        role = '*' if i % 500 == 0 else role_names[len(entries) % roles]   # ~0.2% generic
+        entries.append({'role': role, 'skills': skills,
+                        'question': rng.choice(TEMPLATES).format(s=skills[0], n=i)})
+    return role_names, entries
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--questions', type=int, default=100000)
+    parser.add_argument('--roles', type=int, default=200)
+    parser.add_argument('--dim', type=int, default=1024)
+    parser.add_argument('--lookups', type=int, default=5000)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    role_names, entries = synthetic_entries(args.questions, args.roles, rng)
+    start = time.perf_counter()
+    bank = QuestionBank().build(entries, dim=args.dim)
+    build_seconds = time.perf_counter() - start
+    path = os.path.join(tempfile.mkdtemp(prefix='qbank-'), 'bank.npz')
+    bank.save(path)
+    start = time.perf_counter()
+    bank = QuestionBank().load(path)
+    load_seconds = time.perf_counter() - start
+
+    postings = [(role, f"{role}: {', '.join(rng.sample(SKILLS, 4))} in production") for role in role_names]
+    for role, desc in postings:
+        bank.lookup(role, desc)   # warm the per-posting cache, as the first candidate of each posting does
+
+    def per_posting():
+        role, desc = rng.choice(postings)
+        bank.lookup(role, desc, rng.choice(ANSWERS))
+
+    def new_posting():
+        role = rng.choice(role_names)
+        bank.lookup(role, f"{role} {rng.random()}", rng.choice(ANSWERS))
+
+    everything = [slice(0, len(bank))]
+    dense = np.zeros(bank.dim, dtype=np.float32)
+    idx, weights = bank.embed(ANSWERS[0])
+    dense[idx] = weights
+
+    def sparse_scan():
+        scores = bank._scores(bank.embed(rng.choice(ANSWERS)), everything)
+        np.argpartition(scores, -3)[-3:]
+
+    def dense_scan():
+        scores = dense @ bank.columns
+        np.argpartition(scores, -3)[-3:]
+
+    embed = timed(lambda: bank.embed(rng.choice(ANSWERS)), args.lookups)
+    print(json.dumps({
+        'questions': len(bank), 'roles': len(bank.roles), 'dim': bank.dim,
+        'matrix_mb': round(bank.columns.nbytes / 2 ** 20, 1), 'file_mb': round(os.path.getsize(path) / 2 ** 20, 1),
+        'build_seconds': round(build_seconds, 2), 'load_seconds': round(load_seconds, 3),
+        'rows_per_posting': int(np.mean([len(bank._posting(role, desc)[1]) for role, desc in postings])),
+        'embed_answer': summary_us(embed),
+    }))
+    for label, fn, repeat in (('lookup_known_posting', per_posting, args.lookups),
+                              ('lookup_new_posting', new_posting, args.lookups),
+                              ('sparse_scan_all_questions', sparse_scan, args.lookups // 10),
+                              ('dense_scan_all_questions', dense_scan, args.lookups // 100)):
+        print(json.dumps({'label': label, **summary_us(timed(fn, repeat))}))
+    os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_response_cache.py
+"""Provider calls and opening-turn latency for a hiring drive, with and without the response cache.
+
+    python -m benchmarks.bench_response_cache --candidates 300 --semantic
+
+Every candidate interviews for the same posting; their first answers come
+from a handful of common openings, some with a filler word dropped or added
+(what near-duplicate mode is for).
+"""
+import argparse
+import json
+import random
+import time
+
+from app import events
+from app.conversation.analyzer import analyze_text
+from app.conversation.session import Session, Turn, posting
+from app.llm import client
+from app.llm.cache import ResponseCache
+from app.llm.providers import PROVIDER_ENDPOINTS
+from app.llm.scheduler import llm_scheduler
+from .common import NO_RATE_LIMITS, latency_summary
+from .fake_llm import FakeLLMServer
+
+OPENINGS = [
+    "I am a backend engineer with five years of experience building payment systems in Python",
+    "I studied computer science and since then I have worked on data pipelines and APIs",
+    "I started as a support engineer and moved into development where I focus on reliability",
+    "Most of my career has been in startups building web products end to end with small teams",
+]
+FILLERS = ["really", "mostly", "actually", "also"]
+
+
+def first_answer(rng):
+    words = rng.choice(OPENINGS).split()
+    if rng.random() < 0.5:
+        words.insert(rng.randrange(1, len(words)), rng.choice(FILLERS))
+    return " ".join(words)
+
+
+def opening_turn(answer):
+    session = Session('k', 'groq', posting('Backend Engineer', 'Build and operate payment APIs.'),
+                      history=[Turn(answer)])
+    analysis = analyze_text(answer)
+    built = events.build_prompt(session, answer, analysis)
+    start = time.perf_counter()
+    response = events.cached_reply(session, built, answer, analysis)
+    if response is None:
+        response = events.router.complete('k', built.user, built.system, 'groq')
+        events.store_reply(session, built, answer, analysis, response)
+    return time.perf_counter() - start
+
+
+def run(label, cache, server, candidates, seed):
+    events.response_cache = cache
+    rng = random.Random(seed)
+    before = server.requests
+    latencies = [opening_turn(first_answer(rng)) for _ in range(candidates)]
+    summary = {'label': label, **latency_summary(latencies), 'provider_calls': server.requests - before,
+               'hit_rate': round(cache.hit_rate, 3), **cache.stats}
+    print(json.dumps(summary))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.3, help="provider latency (s)")
+    parser.add_argument("--semantic", action="store_true", help="also run with near-duplicate matching")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(latency=args.latency).start()
+    PROVIDER_ENDPOINTS["groq"]["url"] = server.url
+    client.configure({})
+    llm_scheduler.configure(NO_RATE_LIMITS)
+
+    run("no-cache", ResponseCache(enabled=False), server, args.candidates, args.seed)
+    run("exact", ResponseCache(), server, args.candidates, args.seed)
+    if args.semantic:
+        run("semantic", ResponseCache(semantic=True, threshold=0.85), server, args.candidates, args.seed)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
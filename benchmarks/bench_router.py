@@ -0,0 +1,81 @@
+# benchmarks/bench_router.py
+"""Turn latency calling one browned-out provider directly vs through the router.
+
+    python -m benchmarks.bench_router --turns 400 --concurrency 20
+
+"groq" is pointed at a fake provider with a slow tail and some 503s,
+"together" at a healthy one the server holds a fallback key for.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.llm import client
+from app.llm.providers import PROVIDER_ENDPOINTS, ProviderError, request_completion
+from app.llm.router import FALLBACK_REPLY, LLMRouter
+from app.llm.scheduler import llm_scheduler
+from .common import NO_RATE_LIMITS, latency_summary
+from .fake_llm import FakeLLMServer
+
+
+def direct():
+    """One call to groq with no routing: a failure comes back as its error text."""
+    try:
+        return request_completion("groq", "k", "Tell me about yourself.", "sys")
+    except ProviderError as e:
+        return str(e)
+
+
+def run(label, fn, turns, concurrency):
+    def one(_):
+        start = time.perf_counter()
+        text = fn()
+        return time.perf_counter() - start, text
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(turns)))
+    latencies = [t for t, _ in results]
+    errors = sum(1 for _, text in results if "Error" in text)
+    fallbacks = sum(1 for _, text in results if text == FALLBACK_REPLY)
+    summary = {'label': label, **latency_summary(latencies), 'error_replies': errors, 'fallback_replies': fallbacks}
+    print(json.dumps(summary))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="normal provider latency (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.1, help="fraction of browned-out requests that stall")
+    parser.add_argument("--slow-latency", type=float, default=1.5)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--hedge-delay", type=float, default=0.0, help="0 = rolling p95")
+    args = parser.parse_args()
+
+    browned = FakeLLMServer(latency=args.latency, error_rate=args.error_rate,
+                            slow_rate=args.slow_rate, slow_latency=args.slow_latency).start()
+    healthy = FakeLLMServer(latency=args.latency * 1.5).start()
+    PROVIDER_ENDPOINTS["groq"]["url"] = browned.url
+    PROVIDER_ENDPOINTS["together"]["url"] = healthy.url
+    # No urllib3 retries: measure the routing, not the retry loop
+    client.configure({"LLM_POOL_SIZE": args.concurrency * 2, "LLM_MAX_RETRIES": 0})
+    llm_scheduler.configure(NO_RATE_LIMITS)
+
+    run("direct", direct, args.turns, args.concurrency)
+
+    router = LLMRouter()
+    router.configure({"LLM_HEDGE_DELAY": args.hedge_delay, "LLM_SERVER_FALLBACK": True,
+                      "LLM_FALLBACK_KEYS": {"together": "k"}})
+    run("routed", lambda: router.complete("k", "Tell me about yourself.", "sys", "groq"), args.turns, args.concurrency)
+    for name in ("groq", "together"):
+        h = router.health[name]
+        print(f"  {name:<9} state={h.state} ewma={h.latency or 0:.3f}s err={h.error_rate:.2f}")
+
+    browned.shutdown()
+    healthy.shutdown()
+
+
+if __name__ == "__main__":
+    main()
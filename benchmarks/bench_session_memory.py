@@ -0,0 +1,73 @@
+# benchmarks/bench_session_memory.py
+"""Bytes per interview session: the old dict-of-dicts shape vs the slotted Session.
+
+    python -m benchmarks.bench_session_memory --sessions 10000
+
+Sessions are built for a handful of postings, as a node would hold them
+(fresh strings per session, as they arrive off the socket), then measured
+with tracemalloc: just started (idle but connected) and after N answers.
+Also reports the serialised size of each shape (JSON dict vs session.dumps()).
+"""
+import argparse
+import json
+import random
+import tracemalloc
+
+from app.conversation import session as session_model
+from app.conversation.session import Session, Turn, dumps, posting
+from .e2e import ANSWERS
+
+POSTINGS = [(f"Backend Engineer {i}", "Build and operate payment APIs in Python. " * 12) for i in range(8)]
+WELCOME = "Hello! Welcome to your interview. To get us started, could you tell me a bit about yourself?"
+
+
+def fresh(text):
+    """A new str object with the same value (what decoding each socket message yields)."""
+    return (text + ".")[:-1]
+
+
+def old_session(role, desc, answers):
+    history = [{'answer': fresh(a), 'sentiment': 1, 'vague': False, 'confident': True} for a in answers]
+    return {'api_key': fresh('gsk_' + 'x' * 52), 'provider': fresh('groq'), 'job_role': fresh(role),
+            'job_desc': fresh(desc), 'questions_asked': len(answers), 'max_questions': 5, 'history': history,
+            'candidate_sentiment_trend': [h['sentiment'] for h in history], 'last_ai_text': fresh(WELCOME),
+            'context': {'summary': '', 'summarized': 0}}
+
+
+def new_session(role, desc, answers):
+    return Session(fresh('gsk_' + 'x' * 52), fresh('groq'), posting(fresh(role), fresh(desc)), fresh(WELCOME),
+                   questions_asked=len(answers), history=[Turn.of(fresh(a), 1, False, True) for a in answers])
+
+
+def measure(build, n, answers):
+    rng = random.Random(7)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build(*rng.choice(POSTINGS), answers) for _ in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / n, sessions[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=10000)
+    parser.add_argument('--answers', type=int, default=5)
+    args = parser.parse_args()
+
+    answers = [ANSWERS[i % len(ANSWERS)] for i in range(args.answers)]
+    for label, count in (('idle', 0), (f'{args.answers}_answers', args.answers)):
+        old_bytes, old = measure(old_session, args.sessions, answers[:count])
+        new_bytes, new = measure(new_session, args.sessions, answers[:count])
+        print(json.dumps({
+            'state': label, 'sessions': args.sessions,
+            'dict_bytes_per_session': round(old_bytes), 'slotted_bytes_per_session': round(new_bytes),
+            'saved': f"{1 - new_bytes / old_bytes:.0%}",
+            'json_dict_bytes': len(json.dumps(old, separators=(',', ':'))),
+            'serialised_bytes': len(dumps(new)),
+            'serialiser': 'msgpack' if session_model.msgpack is not None else 'json',
+        }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_transcript_log.py
+"""Transcript log write throughput and replay speed, per-record fsync vs group commit.
+
+    python -m benchmarks.bench_transcript_log --sessions 5000 --turns 5 --threads 64
+
+Every session appends a start record, --turns turn records and an end
+record from a pool of writer threads (the turn executor's shape). Reported
+per fsync interval: records/sec until everything is durable, how long
+append() blocks the caller (what the emit path pays), fsyncs issued, and
+then the time to replay all segments through the mmap reader.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.conversation import memory
+from app.conversation.session import Session, Turn, posting
+from app.conversation.transcript_log import TranscriptLog
+from .common import latency_summary
+from .e2e import ANSWERS
+
+REPLY = "Thanks. Can you walk me through a specific decision you made and what you learned from it?"
+
+
+def run(fsync_ms, sessions, turns, threads, segment_bytes):
+    directory = tempfile.mkdtemp(prefix='transcripts-')
+    log = TranscriptLog(directory, fsync_ms=fsync_ms, segment_bytes=segment_bytes)
+    log.open()
+    if fsync_ms > 0:
+        threading.Thread(target=log._flusher, daemon=True).start()
+
+    def interview(k):
+        waits = []
+        iid = f'bench-{k}'
+        session = Session(None, 'groq', posting('Backend Engineer', 'Python services'), 'Welcome!', turns)
+        start = time.perf_counter()
+        log.start(iid, session)
+        waits.append(time.perf_counter() - start)
+        for n in range(turns):
+            session.history.append(Turn.of(ANSWERS[(k + n) % len(ANSWERS)], 1, False, True))
+            session.questions_asked += 1
+            start = time.perf_counter()
+            log.turn(iid, session, REPLY)
+            waits.append(time.perf_counter() - start)
+        log.end(iid)
+        return waits
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        waits = [w for ws in pool.map(interview, range(sessions)) for w in ws]
+    log.close()   # final flush: everything appended is now on disk
+    elapsed = time.perf_counter() - start
+
+    replay_start = time.perf_counter()
+    replayed = log.replay()
+    replay = time.perf_counter() - replay_start
+    records = log.stats['records']
+    summary = {
+        'fsync_ms': fsync_ms,
+        'records': records,
+        'durable_records_per_sec': round(records / elapsed),
+        'fsyncs': log.stats['flushes'],
+        'records_per_fsync': round(records / max(log.stats['flushes'], 1), 1),
+        'segments': len(log.segments()),
+        'mb': round(log.stats['bytes'] / 2 ** 20, 1),
+        'append_wait': latency_summary(waits),
+        'replay_seconds': round(replay, 3),
+        'replay_records_per_sec': round(records / replay) if replay else 0,
+        'interviews_replayed': len(replayed),
+    }
+    print(json.dumps(summary))
+    shutil.rmtree(directory, ignore_errors=True)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=5000)
+    parser.add_argument('--turns', type=int, default=5)
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--segment-mb', type=float, default=4)
+    parser.add_argument('--fsync-ms', type=int, nargs='+', default=[0, 10, 50])
+    args = parser.parse_args()
+    memory.configure({})
+    for fsync_ms in args.fsync_ms:
+        run(fsync_ms, args.sessions, args.turns, args.threads, int(args.segment_mb * 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
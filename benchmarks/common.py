@@ -0,0 +1,58 @@
+# benchmarks/common.py
+"""Helpers shared by the benchmark scripts."""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Benchmarks measure the app, not a provider's quota: no rate limits unless a benchmark sets its own
+NO_RATE_LIMITS = {'LLM_KEY_RPM': '0', 'LLM_KEY_TPM': '0', 'LLM_PROVIDER_RPM': '0', 'LLM_PROVIDER_TPM': '0'}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def latency_summary(values):
+    """p50/p95/p99/max in milliseconds for a list of seconds."""
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50) * 1000, 1),
+        'p95_ms': round(percentile(values, 95) * 1000, 1),
+        'p99_ms': round(percentile(values, 99) * 1000, 1),
+        'max_ms': round(max(values) * 1000, 1) if values else 0.0,
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not come up')
+
+
+def start_app_server(port, env=None, args=('run.py',)):
+    """Run `python run.py` (or `python *args`) on the given port; returns the Popen handle."""
+    full_env = dict(os.environ, PORT=str(port), **(env or {}))
+    proc = subprocess.Popen([sys.executable, *args], cwd=ROOT, env=full_env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    wait_for_port(port)
+    return proc
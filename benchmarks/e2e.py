@@ -0,0 +1,259 @@
+# benchmarks/e2e.py
+"""End-to-end interview benchmark: N candidates through full interviews over Socket.IO.
+
+    python -m benchmarks.e2e --candidates 50 --output baseline.json
+    python -m benchmarks.e2e --candidates 50 --baseline baseline.json    # exits 1 on regression
+
+Boots the app from create_app (benchmarks.e2e_server, same bootstrap as
+run.py) against a deterministic local fake LLM, connects every candidate,
+then has each one answer until `interview_complete` (5 questions, with
+--think-time between a reply and the next answer; answers refused as busy
+are repeated and counted, not timed). Reports
+turns/sec, turn latency (user_spoke -> final ai_speak) and time to the first
+streamed sentence as p50/p95/p99, server memory per open session and server
+CPU per turn. The reply cache is off unless --cache, so every turn pays for
+a real (fake) LLM round trip.
+
+Memory per session is the server RSS growth from opening the sessions
+(connections included) divided by their number: approximate, use a few
+hundred candidates for a stable figure.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+import socketio
+
+from .common import NO_RATE_LIMITS, ROOT, free_port, latency_summary, start_app_server
+from .fake_llm import FakeLLMServer
+
+ANSWERS = [
+    "I am a backend engineer with six years of Python experience, mostly on payment systems.",
+    "I led the migration of our billing service to an event driven design across three teams.",
+    "The hardest part was keeping both systems consistent during the cutover without downtime.",
+    "I built reconciliation jobs and moved traffic gradually, region by region, watching error rates.",
+    "Next I want to grow into a staff role, own larger designs and mentor more engineers.",
+]
+
+# Lower is better for these; turns_per_sec is the one higher-is-better metric compared
+COMPARED = [('turns_per_sec', 'higher'), ('turn_latency.p50_ms', 'lower'), ('turn_latency.p95_ms', 'lower'),
+            ('turn_latency.p99_ms', 'lower'), ('cpu_ms_per_turn', 'lower'), ('memory_per_session_kb', 'lower')]
+
+
+class Candidate:
+    def __init__(self, index, url, timeout):
+        self.index = index
+        self.url = url
+        self.timeout = timeout
+        self.latencies = []
+        self.first_sentence = []
+        self.busy = 0
+        self.errors = 0
+        self.completed = False
+        self._sent = None
+        self._partial_seen = False
+        self._reply = threading.Event()
+        self._rejected = False
+        self.client = socketio.Client(reconnection=False)
+        self.client.on('ai_speak', self._on_reply)
+        self.client.on('ai_speak_partial', self._on_partial)
+        self.client.on('interview_complete', self._on_complete)
+        self.client.on('busy', self._on_busy)
+        self.client.on('error', self._on_error)
+
+    def _on_partial(self, data):
+        if self._sent is not None and not self._partial_seen:
+            self._partial_seen = True
+            self.first_sentence.append(time.perf_counter() - self._sent)
+
+    def _on_reply(self, data):
+        self._reply.set()
+
+    def _on_complete(self, data):
+        self.completed = True
+
+    def _on_busy(self, data):
+        self.busy += 1
+        self._rejected = True
+        self._reply.set()
+
+    def _on_error(self, data):
+        self.errors += 1
+        self._rejected = True
+        self._reply.set()
+
+    def _ask(self, event, payload):
+        """Emit and wait for the final reply; returns seconds, or None if rejected/timed out."""
+        self._reply.clear()
+        self._rejected = False
+        self._partial_seen = False
+        self._sent = time.perf_counter()
+        self.client.emit(event, payload)
+        ok = self._reply.wait(self.timeout)
+        elapsed = time.perf_counter() - self._sent
+        self._sent = None
+        if not ok:
+            self.errors += 1
+            return None
+        return None if self._rejected else elapsed
+
+    def start(self):
+        self.client.connect(self.url, transports=['websocket'])
+        self._ask('start_voice_interview', {'api_key': 'fake', 'provider': 'groq',
+                                            'job_role': 'Backend Engineer',
+                                            'job_desc': 'Python services, APIs and data pipelines'})
+
+    def interview(self, think_time, max_attempts=20):
+        # Rotate the answers so concurrent candidates don't send identical prompts
+        turn = 0
+        for _ in range(max_attempts):
+            time.sleep(think_time)
+            if self.completed:
+                break
+            answer = ANSWERS[(self.index + turn) % len(ANSWERS)]
+            elapsed = self._ask('user_spoke', {'text': answer})
+            if elapsed is not None:
+                self.latencies.append(elapsed)
+                turn += 1
+            elif self.errors:
+                break
+            # busy: the previous turn is still saving; say it again after the think time
+
+
+def run_phase(candidates, method, ramp, *args):
+    errors = []
+
+    def call(c):
+        try:
+            getattr(c, method)(*args)
+        except Exception as e:
+            c.errors += 1
+            errors.append(repr(e))
+
+    threads = [threading.Thread(target=call, args=(c,), daemon=True) for c in candidates]
+    for t in threads:
+        t.start()
+        time.sleep(ramp / max(len(threads), 1))
+    for t in threads:
+        t.join()
+    return errors
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def lookup(report, dotted):
+    value = report
+    for part in dotted.split('.'):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def compare(report, baseline, tolerance):
+    """Print each compared metric against the baseline; returns the names that regressed."""
+    if report['config'] != baseline.get('config'):
+        print(f"warning: baseline config differs: {baseline.get('config')}", file=sys.stderr)
+    regressions = []
+    for name, better in COMPARED:
+        new, old = lookup(report, name), lookup(baseline, name)
+        if not isinstance(new, (int, float)) or not old:
+            continue
+        change = (new - old) / old
+        worse = change < -tolerance if better == 'higher' else change > tolerance
+        print(f"{name:28} {old:>10} -> {new:>10}  {change:+.1%}{'  REGRESSION' if worse else ''}",
+              file=sys.stderr)
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=50)
+    parser.add_argument('--llm-latency', type=float, default=0.2, help='fake LLM seconds to first byte')
+    parser.add_argument('--token-delay', type=float, default=0.005, help='fake LLM seconds between tokens')
+    parser.add_argument('--async-mode', default='eventlet', choices=['eventlet', 'threading'])
+    parser.add_argument('--no-stream', action='store_true', help='LLM_STREAM=false')
+    parser.add_argument('--cache', action='store_true', help='leave the reply cache on')
+    parser.add_argument('--ramp', type=float, default=1.0, help='seconds over which candidates connect')
+    parser.add_argument('--think-time', type=float, default=0.1, help='candidate pause before each answer')
+    parser.add_argument('--timeout', type=float, default=60.0, help='per-turn timeout')
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    parser.add_argument('--baseline', help='JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed relative regression')
+    args = parser.parse_args()
+
+    llm = FakeLLMServer(latency=args.llm_latency, token_delay=args.token_delay).start()
+    port = free_port()
+    base = f'http://127.0.0.1:{port}'
+    env = {'GROQ_API_URL': llm.url, 'SOCKETIO_ASYNC_MODE': args.async_mode,
+           'LLM_STREAM': 'false' if args.no_stream else 'true',
+           'RESPONSE_CACHE_ENABLED': 'true' if args.cache else 'false',
+           'SESSION_STORE': 'memory', 'SPECULATION_ENABLED': 'false', 'AUDIO_ENABLED': 'false', **NO_RATE_LIMITS}
+    server = start_app_server(port, env, args=('-m', 'benchmarks.e2e_server'))
+    candidates = [Candidate(i, base, args.timeout) for i in range(args.candidates)]
+    try:
+        idle = requests.get(f'{base}/_bench/usage').json()
+        failures = run_phase(candidates, 'start', args.ramp)
+        opened = requests.get(f'{base}/_bench/usage').json()
+
+        start = time.perf_counter()
+        failures += run_phase(candidates, 'interview', args.ramp, args.think_time)
+        wall = time.perf_counter() - start
+        done = requests.get(f'{base}/_bench/usage').json()
+    finally:
+        for c in candidates:
+            c.client.disconnect()
+        server.terminate()
+        server.wait()
+        llm.shutdown()
+
+    latencies = [l for c in candidates for l in c.latencies]
+    first = [l for c in candidates for l in c.first_sentence]
+    sessions_open = max(opened['sessions'], 1)
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'candidates': args.candidates, 'llm_latency_s': args.llm_latency,
+                   'token_delay_s': args.token_delay, 'async_mode': args.async_mode,
+                   'streamed': not args.no_stream, 'cache': args.cache, 'think_time_s': args.think_time},
+        'wall_seconds': round(wall, 2),
+        'turns': len(latencies),
+        'turns_per_sec': round(len(latencies) / wall, 1) if wall else 0.0,
+        'completed_interviews': sum(c.completed for c in candidates),
+        'busy': sum(c.busy for c in candidates),
+        'errors': sum(c.errors for c in candidates),
+        'turn_latency': latency_summary(latencies),
+        'first_sentence_latency': latency_summary(first),
+        'cpu_ms_per_turn': round((done['cpu_seconds'] - opened['cpu_seconds']) * 1000 / max(len(latencies), 1), 2),
+        'memory_per_session_kb': round((opened['rss_bytes'] - idle['rss_bytes']) / sessions_open / 1024, 1),
+        'server_peak_rss_mb': round(done['peak_rss_bytes'] / 2 ** 20, 1),
+        'sessions_left_open': done['sessions'],
+    }
+    if failures:
+        report['failures'] = sorted(set(failures))[:5]
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
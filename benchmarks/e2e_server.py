@@ -0,0 +1,48 @@
+# benchmarks/e2e_server.py
+"""The app as run.py boots it, plus a /_bench/usage route reporting this process's CPU and memory.
+
+Started by benchmarks.e2e; not meant to be deployed.
+"""
+import os
+
+if os.getenv('SOCKETIO_ASYNC_MODE', 'eventlet') == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
+import gc
+import resource
+
+from flask import jsonify
+
+from app import create_app, events, socketio
+
+
+def rss_bytes() -> int:
+    """Current resident set size; falls back to the peak where /proc isn't available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+app = create_app()
+
+
+@app.route('/_bench/usage')
+def usage():
+    gc.collect()
+    ru = resource.getrusage(resource.RUSAGE_SELF)
+    return jsonify({
+        'cpu_seconds': ru.ru_utime + ru.ru_stime,
+        'rss_bytes': rss_bytes(),
+        'peak_rss_bytes': ru.ru_maxrss * (1 if os.uname().sysname == 'Darwin' else 1024),
+        'sessions': len(events.sessions),
+        'connections': len(events.connections),
+    })
+
+
+if __name__ == '__main__':
+    socketio.run(app, host='127.0.0.1', port=int(os.environ['PORT']), debug=False, log_output=False,
+                 allow_unsafe_werkzeug=True)   # SOCKETIO_ASYNC_MODE=threading runs on werkzeug
@@ -0,0 +1,130 @@
+# benchmarks/eval_vad.py
+"""Offline evaluation of the endpointer over WAV fixtures, sweeping the hangover.
+
+    python -m benchmarks.eval_vad --fixtures recordings/
+    python -m benchmarks.eval_vad --synthesize /tmp/vad_fixtures --count 40
+
+Each fixture is a 16-bit mono WAV plus a same-named .json label with the
+time (seconds) the candidate actually finished their answer:
+
+    {"turn_end": 7.42}
+
+For every hangover value this reports end-of-turn latency (detected end -
+true end), how often the turn was cut off early (detected before the true
+end, i.e. during a mid-answer pause) and how often no end was detected.
+--synthesize writes speech-like fixtures (syllable-modulated noise with
+mid-answer pauses, at several noise levels) for when no recordings are at hand.
+"""
+import argparse
+import glob
+import json
+import os
+import time
+import wave
+
+import numpy as np
+
+from app.audio.vad import END_OF_TURN, Endpointer
+from .common import percentile
+
+SAMPLE_RATE = 16000
+
+
+def synthesize(directory, count, seed=0):
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    for n in range(count):
+        noise_amp = rng.choice([20, 100, 300])          # quiet room .. noisy laptop fan
+        parts = [rng.normal(0, noise_amp, int(SAMPLE_RATE * rng.uniform(0.5, 1.5)))]
+        for phrase in range(rng.integers(2, 6)):
+            seconds = rng.uniform(0.8, 3.0)
+            t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+            envelope = np.abs(np.sin(2 * np.pi * rng.uniform(3, 5) * t)) ** 0.5   # syllables
+            parts.append(rng.normal(0, 1, t.size) * envelope * rng.uniform(1500, 5000))
+            if phrase:
+                # Mid-answer pause (thinking) before this phrase
+                parts.insert(-1, rng.normal(0, noise_amp, int(SAMPLE_RATE * rng.uniform(0.15, 0.9))))
+        turn_end = sum(p.size for p in parts) / SAMPLE_RATE
+        parts.append(rng.normal(0, noise_amp, SAMPLE_RATE * 3))
+        pcm = np.clip(np.concatenate(parts), -32768, 32767).astype('<i2')
+        path = os.path.join(directory, f"synthetic_{n:03d}")
+        with wave.open(path + ".wav", "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SAMPLE_RATE)
+            w.writeframes(pcm.tobytes())
+        with open(path + ".json", "w") as f:
+            json.dump({"turn_end": round(turn_end, 3)}, f)
+
+
+def load(directory):
+    fixtures = []
+    for wav_path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        with wave.open(wav_path, "rb") as w:
+            if w.getsampwidth() != 2 or w.getnchannels() != 1:
+                raise SystemExit(f"{wav_path}: need 16-bit mono PCM")
+            pcm, rate = w.readframes(w.getnframes()), w.getframerate()
+        with open(os.path.splitext(wav_path)[0] + ".json") as f:
+            fixtures.append((os.path.basename(wav_path), pcm, rate, json.load(f)["turn_end"]))
+    return fixtures
+
+
+def evaluate(fixtures, hangover_ms, chunk_ms, **vad_options):
+    latencies, cutoffs, misses, audio_s, busy_s = [], 0, 0, 0.0, 0.0
+    for _, pcm, rate, turn_end in fixtures:
+        endpointer = Endpointer(rate, hangover_ms=hangover_ms, **vad_options)
+        step = rate * 2 * chunk_ms // 1000
+        view = memoryview(pcm)
+        detected = None
+        start = time.perf_counter()
+        for off in range(0, len(pcm), step):
+            ends = [e.at for e in endpointer.process(view[off:off + step]) if e.kind == END_OF_TURN]
+            if ends:
+                detected = ends[0]
+                break
+        busy_s += time.perf_counter() - start
+        audio_s += len(pcm) / 2 / rate
+        if detected is None:
+            misses += 1
+        elif detected < turn_end:
+            cutoffs += 1
+        else:
+            latencies.append(detected - turn_end)
+    return {
+        'hangover_ms': hangover_ms,
+        'fixtures': len(fixtures),
+        'eot_p50_ms': round(percentile(latencies, 50) * 1000),
+        'eot_p95_ms': round(percentile(latencies, 95) * 1000),
+        'cutoff_rate': round(cutoffs / len(fixtures), 3),
+        'miss_rate': round(misses / len(fixtures), 3),
+        'x_realtime': round(audio_s / busy_s) if busy_s else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", help="directory of .wav + .json labels")
+    parser.add_argument("--synthesize", help="write synthetic fixtures here and evaluate them")
+    parser.add_argument("--count", type=int, default=40)
+    parser.add_argument("--hangover", default="300,500,700,900,1200", help="comma-separated ms values")
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--threshold-db", type=float, default=12.0)
+    parser.add_argument("--min-speech-ms", type=int, default=300)
+    args = parser.parse_args()
+
+    directory = args.fixtures
+    if args.synthesize:
+        synthesize(args.synthesize, args.count)
+        directory = args.synthesize
+    if not directory:
+        parser.error("pass --fixtures DIR or --synthesize DIR")
+    fixtures = load(directory)
+    if not fixtures:
+        raise SystemExit(f"no .wav fixtures in {directory}")
+    for hangover in (int(h) for h in args.hangover.split(",")):
+        print(json.dumps(evaluate(fixtures, hangover, args.chunk_ms, threshold_db=args.threshold_db,
+                                  min_speech_ms=args.min_speech_ms)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# benchmarks/fake_llm.py
+"""Deterministic local OpenAI-compatible chat-completions server for benchmarks.
+
+    python -m benchmarks.fake_llm --port 8001 --latency 0.2
+    python -m benchmarks.fake_llm --port 8001 --key-rpm 30 --key-tpm 6000   # answers 429 like a real free tier
+
+Point the app at it with e.g. GROQ_API_URL=http://127.0.0.1:8001/v1/chat/completions
+
+Rate limits are counted like providers do, over a sliding minute: per API key
+(Authorization header) and over all keys. A request over a limit gets 429
+with Retry-After (seconds until the window has room again).
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = ("That sounds like a solid piece of work. "
+         "Can you walk me through a specific decision you made and what you learned from it?")
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like real providers
+    server_version = "FakeLLM/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # One handler per connection: stand-in for TCP+TLS handshake round trips
+        time.sleep(self.server.config["connect_latency"])
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        cfg = self.server.config
+        self.server.count_request()
+        tokens = len(json.dumps(body.get("messages", []))) // 4 + int(body.get("max_tokens") or 0)
+        retry_after = self.server.rate_limit(self.headers.get("Authorization", ""), tokens)
+        if retry_after is not None:
+            return self._send_json(429, {"error": {"message": "fake rate limit reached", "type": "tokens"}},
+                                   {"Retry-After": str(retry_after)})
+
+        slow = cfg["slow_rate"] and random.random() < cfg["slow_rate"]
+        time.sleep(cfg["slow_latency"] if slow else cfg["latency"])
+        if cfg["error_rate"] and random.random() < cfg["error_rate"]:
+            return self._send_json(503, {"error": {"message": "fake upstream overloaded"}})
+
+        if body.get("stream"):
+            return self._send_stream(REPLY)
+        self._send_json(200, {
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}}],
+            "usage": {"prompt_tokens": len(json.dumps(body.get("messages", []))) // 4,
+                      "completion_tokens": len(REPLY.split())},
+        })
+
+    def _send_json(self, status, obj, headers=None):
+        out = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(out)
+
+    def _send_stream(self, text):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for word in text.split(" "):
+            event = {"choices": [{"index": 0, "delta": {"content": word + " "}}]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n")
+            time.sleep(self.server.config["token_delay"])
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data):
+        raw = data.encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(raw), raw))
+        self.wfile.flush()
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, port=0, latency=0.0, token_delay=0.0, error_rate=0.0, connect_latency=0.0,
+                 slow_rate=0.0, slow_latency=0.0, key_rpm=0, key_tpm=0, rpm=0):
+        super().__init__(("127.0.0.1", port), FakeLLMHandler)
+        self.config = {"latency": latency, "token_delay": token_delay, "error_rate": error_rate,
+                       "connect_latency": connect_latency, "slow_rate": slow_rate, "slow_latency": slow_latency,
+                       "key_rpm": key_rpm, "key_tpm": key_tpm, "rpm": rpm}
+        self.requests = 0
+        self.connections = 0
+        self.rate_limited = 0
+        self._window = defaultdict(deque)   # key ('' = all keys) -> (time, tokens) accepted in the last minute
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        pass   # clients hanging up mid-request (app server shut down) are expected here
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def rate_limit(self, key, tokens):
+        """None if the request is within every limit (and count it), else seconds to Retry-After."""
+        cfg = self.config
+        now = time.monotonic()
+        with self._lock:
+            waits = []
+            for name, rpm, tpm in ((key, cfg["key_rpm"], cfg["key_tpm"]), ("", cfg["rpm"], 0)):
+                window = self._window[name]
+                while window and now - window[0][0] >= 60:
+                    window.popleft()
+                if rpm and len(window) >= rpm:
+                    waits.append(60 - (now - window[len(window) - rpm][0]))
+                if tpm and sum(t for _, t in window) + tokens > tpm:
+                    waits.append(60 - (now - window[0][0]) if window else 60)
+            if waits:
+                self.rate_limited += 1
+                return max(1, math.ceil(max(waits)))
+            for name in (key, ""):
+                self._window[name].append((now, tokens))
+        return None
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/chat/completions"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before first byte")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="simulated handshake cost per connection")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests hitting the slow tail")
+    parser.add_argument("--slow-latency", type=float, default=0.0, help="seconds before first byte on the slow tail")
+    parser.add_argument("--key-rpm", type=int, default=0, help="requests per minute per API key (0 = no limit)")
+    parser.add_argument("--key-tpm", type=int, default=0, help="tokens per minute per API key (0 = no limit)")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute over all keys (0 = no limit)")
+    args = parser.parse_args()
+    server = FakeLLMServer(args.port, args.latency, args.token_delay, args.error_rate, args.connect_latency,
+                           args.slow_rate, args.slow_latency, args.key_rpm, args.key_tpm, args.rpm)
+    print(f"Fake LLM listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
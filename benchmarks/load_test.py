@@ -0,0 +1,122 @@
+# benchmarks/load_test.py
+"""Socket.IO load test: N simulated candidates against a fake LLM.
+
+    python -m benchmarks.load_test --sessions 500 --turns 3 --llm-latency 0.5
+
+Boots run.py in a subprocess (eventlet), points every provider at a local
+fake LLM, and reports p50/p95/p99 turn latency (user_spoke -> final ai_speak).
+"""
+import argparse
+import json
+import threading
+import time
+
+import socketio
+
+from .common import NO_RATE_LIMITS, free_port, latency_summary, start_app_server
+from .fake_llm import FakeLLMServer
+
+ANSWER = "I led a migration of our billing service to Python and definitely learned a lot about testing."
+
+
+class Candidate:
+    def __init__(self, url, turns, timeout):
+        self.url = url
+        self.turns = turns
+        self.timeout = timeout
+        self.latencies = []
+        self.busy = 0
+        self.errors = 0
+        self._reply = threading.Event()
+        self.client = socketio.Client(reconnection=False)
+        self.client.on('ai_speak', self._on_reply)
+        self.client.on('busy', self._on_busy)
+        self.client.on('error', self._on_error)
+
+    def _on_reply(self, data):
+        self._reply.set()
+
+    def _on_busy(self, data):
+        self.busy += 1
+        self._rejected = True
+        self._reply.set()
+
+    def _on_error(self, data):
+        self.errors += 1
+        self._rejected = True
+        self._reply.set()
+
+    def _ask(self, event, payload):
+        """Emit and wait for the reply; returns seconds, or None if rejected/timed out."""
+        self._reply.clear()
+        self._rejected = False
+        start = time.perf_counter()
+        self.client.emit(event, payload)
+        if not self._reply.wait(self.timeout):
+            self.errors += 1
+            return None
+        return None if self._rejected else time.perf_counter() - start
+
+    def run(self):
+        try:
+            self.client.connect(self.url, transports=['websocket'])
+            self._ask('start_voice_interview', {'api_key': 'fake', 'provider': 'groq',
+                                                'job_role': 'Backend Engineer',
+                                                'job_desc': 'Python services and APIs'})
+            for _ in range(self.turns):
+                elapsed = self._ask('user_spoke', {'text': ANSWER})
+                if elapsed is not None:
+                    self.latencies.append(elapsed)
+        except Exception:
+            self.errors += 1
+        finally:
+            self.client.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--turns', type=int, default=3, help='answers per candidate (max 4 before closing)')
+    parser.add_argument('--llm-latency', type=float, default=0.5)
+    parser.add_argument('--ramp', type=float, default=2.0, help='seconds over which sessions connect')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON only')
+    args = parser.parse_args()
+
+    llm = FakeLLMServer(latency=args.llm_latency).start()
+    port = free_port()
+    server = start_app_server(port, {'GROQ_API_URL': llm.url, 'LLM_STREAM': 'false', **NO_RATE_LIMITS})
+    try:
+        candidates = [Candidate(f'http://127.0.0.1:{port}', args.turns, args.timeout)
+                      for _ in range(args.sessions)]
+        threads = [threading.Thread(target=c.run, daemon=True) for c in candidates]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+            time.sleep(args.ramp / max(args.sessions, 1))
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+        llm.shutdown()
+
+    latencies = [l for c in candidates for l in c.latencies]
+    report = {
+        'sessions': args.sessions,
+        'turns': len(latencies),
+        'turns_per_sec': round(len(latencies) / wall, 1),
+        'busy': sum(c.busy for c in candidates),
+        'errors': sum(c.errors for c in candidates),
+        'llm_latency_s': args.llm_latency,
+        'turn_latency': latency_summary(latencies),
+    }
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
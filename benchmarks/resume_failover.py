@@ -0,0 +1,184 @@
+# benchmarks/resume_failover.py
+"""Multi-worker failover check: kill a worker mid-interview and resume on another.
+
+    python -m benchmarks.resume_failover [--redis-url redis://localhost:6379/0]
+
+Starts two run.py workers sharing Redis (session store + Socket.IO message
+queue). Without --redis-url an in-process fakeredis TCP server is used.
+The candidate drives the browser's resume protocol (answers re-sent with
+their sequence number) through a worker crash mid-turn, a reply lost with
+the connection, and a reconnect while the turn is still running. Exits
+non-zero if the resumed interview lost or duplicated any history, or a
+re-sent answer was refused as busy.
+"""
+import argparse
+import sys
+import threading
+import time
+
+import socketio
+
+from .common import NO_RATE_LIMITS, free_port, start_app_server
+from .fake_llm import FakeLLMServer
+
+ANSWERS = [
+    "I am a backend engineer with six years of Python experience.",
+    "I led the migration of our billing system to an event driven design.",
+    "The hardest part was keeping both systems consistent during cutover.",
+    "I built reconciliation jobs and rolled traffic over gradually by region.",
+    "Next I want to grow into a staff role and mentor more engineers.",
+]
+
+
+class Candidate:
+    """Socket.IO client that follows the browser's answer/resume protocol (templates/index.html).
+
+    Every answer carries a sequence number and stays pending until a reply arrives; after a
+    reconnect the pending answer is re-sent with the same number, and the server decides
+    whether to run, re-answer or ignore it.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.cond = threading.Condition()
+        self.client = None
+        self.interview_id = None
+        self.seq = 0
+        self.pending = None
+        self.busy = 0          # 'could you repeat that?' answers: a resend must never cause one
+
+    def connect(self, url):
+        self.client = socketio.Client(reconnection=False)
+        for name in ('interview_started', 'interview_resumed', 'ai_speak', 'busy', 'error', 'interview_complete'):
+            self.client.on(name, self._recorder(name))
+        self.client.connect(url, transports=['websocket'])
+
+    def start(self, **data):
+        self.client.emit('start_voice_interview', data)
+        self.interview_id = self.wait_for('interview_started')['interview_id']
+        self.seq = 0
+        self.wait_for('ai_speak')
+
+    def answer(self, text):
+        self.seq += 1
+        self.pending = {'text': text, 'seq': self.seq}
+        self.client.emit('user_spoke', self.pending)
+
+    def disconnect(self):
+        try:
+            self.client.disconnect()
+        except Exception:
+            pass   # the worker is already gone
+
+    def reconnect(self, url):
+        """What the page does on 'connect' and 'interview_resumed'."""
+        self.disconnect()
+        with self.cond:
+            self.events.clear()
+        self.connect(url)
+        self.client.emit('resume_interview', {'interview_id': self.interview_id})
+        resumed = self.wait_for('interview_resumed')
+        if self.pending:
+            self.client.emit('user_spoke', self.pending)
+        return resumed
+
+    def _recorder(self, name):
+        def record(data=None):
+            with self.cond:
+                if name in ('ai_speak', 'busy'):
+                    self.pending = None
+                self.busy += name == 'busy'
+                self.events.append((name, data))
+                self.cond.notify_all()
+        return record
+
+    def wait_for(self, name, timeout=30):
+        deadline = time.time() + timeout
+        with self.cond:
+            while True:
+                for i, (event, data) in enumerate(self.events):
+                    if event == name:
+                        del self.events[:i + 1]
+                        return data
+                    if event == 'error':
+                        raise RuntimeError(f"server error: {data}")
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(name)
+                self.cond.wait(remaining)
+
+
+def start_fake_redis():
+    from fakeredis import TcpFakeServer
+    port = free_port()
+    server = TcpFakeServer(('127.0.0.1', port), server_type='redis')
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'redis://127.0.0.1:{port}/0'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--redis-url')
+    parser.add_argument('--llm-latency', type=float, default=1.5)
+    args = parser.parse_args()
+
+    redis_url = args.redis_url or start_fake_redis()
+    llm = FakeLLMServer(latency=args.llm_latency).start()
+    env = {'SESSION_STORE': 'redis', 'SESSION_REDIS_URL': redis_url, 'SOCKETIO_MESSAGE_QUEUE': redis_url,
+           'GROQ_API_URL': llm.url, 'LLM_STREAM': 'false', **NO_RATE_LIMITS}
+    ports = [free_port(), free_port()]
+    workers = [start_app_server(port, env) for port in ports]
+    try:
+        candidate = Candidate()
+        candidate.connect(f'http://127.0.0.1:{ports[0]}')
+        candidate.start(api_key='fake', provider='groq', job_role='Backend Engineer',
+                        job_desc='Python services and APIs')
+        for answer in ANSWERS[:2]:
+            candidate.answer(answer)
+            candidate.wait_for('ai_speak')
+
+        # 1. Third answer is in flight at the provider when worker A dies: the resend runs it on B
+        candidate.answer(ANSWERS[2])
+        time.sleep(args.llm_latency / 3)
+        workers[0].kill()
+        workers[0].wait()
+        print(f"killed worker :{ports[0]} mid-turn; reconnecting to :{ports[1]}")
+        resumed = candidate.reconnect(f'http://127.0.0.1:{ports[1]}')
+        print(f"resumed with {resumed['answers_received']} answers on record")
+        candidate.wait_for('ai_speak')
+
+        # 2. Fourth answer is answered after the connection dropped: the resend gets the reply again
+        candidate.answer(ANSWERS[3])
+        candidate.disconnect()
+        time.sleep(args.llm_latency * 2)
+        candidate.reconnect(f'http://127.0.0.1:{ports[1]}')
+        candidate.wait_for('ai_speak')
+        print("reply lost with the connection: re-sent, not re-answered")
+
+        # 3. Fifth answer is still running when the candidate is back: the resend is ignored
+        candidate.answer(ANSWERS[4])
+        time.sleep(args.llm_latency / 3)
+        candidate.reconnect(f'http://127.0.0.1:{ports[1]}')
+        candidate.wait_for('ai_speak')
+        history = candidate.wait_for('interview_complete')['history']
+        print("reconnected mid-turn: the running turn's reply arrived")
+    finally:
+        for worker in workers:
+            worker.kill()
+            worker.wait()
+        llm.shutdown()
+
+    recorded = [turn['answer'] for turn in history]
+    if candidate.busy:
+        print(f"FAIL: {candidate.busy} resent answers were refused as busy")
+        sys.exit(1)
+    if recorded != ANSWERS:
+        print("FAIL: history mismatch after resume")
+        for expected, got in zip(ANSWERS, recorded + [None] * len(ANSWERS)):
+            print(f"  expected {expected!r}\n  got      {got!r}")
+        sys.exit(1)
+    print(f"OK: all {len(ANSWERS)} answers survived the worker crash")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,13 @@
-from app import create_app, socketio
 import os
 
+# Green the stdlib (sockets, ssl, threading) before anything else imports it,
+# so blocking provider calls yield to the hub instead of stalling every socket.
+if os.getenv('SOCKETIO_ASYNC_MODE', 'eventlet') == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
+from app import create_app, socketio
+
 app = create_app()
 
 if __name__ == '__main__':
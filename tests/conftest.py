@@ -0,0 +1,45 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# `pytest` from the repo root or anywhere else: import the app package from the checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def fake_llm():
+    from benchmarks.fake_llm import FakeLLMServer
+    server = FakeLLMServer(latency=0.3).start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture(scope='session')
+def app(fake_llm):
+    """The Flask app in threading mode, "groq" pointed at the fake provider, nothing written to disk."""
+    with pytest.MonkeyPatch.context() as mp:
+        for name, value in {'SOCKETIO_ASYNC_MODE': 'threading', 'TRANSCRIPT_LOG_DIR': '',
+                            'ANALYTICS_ENABLED': 'false', 'RESPONSE_CACHE_PATH': '', 'LLM_STREAM': 'false',
+                            'LLM_HEDGING': 'false', 'SPECULATION_ENABLED': 'false',
+                            'RESPONSE_CACHE_ENABLED': 'false', 'QUESTION_BANK_PATH': ''}.items():
+            mp.setenv(name, value)
+        from app.llm.providers import PROVIDER_ENDPOINTS
+        mp.setitem(PROVIDER_ENDPOINTS['groq'], 'url', fake_llm.url)
+        from app import create_app
+        yield create_app()
+
+
+@pytest.fixture
+def candidate(app):
+    """A connected Socket.IO test client with an interview started."""
+    from app import socketio
+    client = socketio.test_client(app)
+    client.emit('start_voice_interview', {'api_key': 'k', 'provider': 'groq', 'job_role': 'Backend Engineer',
+                                          'job_desc': 'Python services and APIs'})
+    started = [r for r in client.get_received() if r['name'] == 'interview_started']
+    client.interview_id = started[0]['args'][0]['interview_id']
+    yield client
+    if client.is_connected():
+        client.disconnect()
@@ -0,0 +1,59 @@
+# tests/test_analytics.py
+from app.analytics import pipeline as pipeline_module
+from app.analytics.pipeline import AnalyticsPipeline, build_report, parse_scores
+from app.llm.providers import PROMPT_MAX_CHARS
+
+IDS = {'1.1': ('i1', 0), '1.2': ('i1', 1), '2.1': ('i2', 0)}
+
+
+def transcript(interview_id, answers):
+    return {'interview_id': interview_id, 'job_role': 'Backend Engineer', 'job_desc': 'Python APIs',
+            'provider': 'groq', 'api_key': 'k', 'completed_at': 0.0, 'sentiment_trend': [],
+            'history': [{'answer': a, 'sentiment': 1, 'vague': False, 'confident': True} for a in answers]}
+
+
+def test_parse_scores_keeps_only_well_formed_lines():
+    reply = "\n".join([
+        "1.1 | 8 | Concrete numbers",
+        "- 1.2 | 6.5 | Some detail",   # list markers are tolerated
+        "2.1 | 11 | Out of range",
+        "9.9 | 7 | Unknown id",
+        "Overall a strong candidate.",
+    ])
+    assert parse_scores(reply, IDS) == {('i1', 0): {'score': 8.0, 'reason': "Concrete numbers"},
+                                        ('i1', 1): {'score': 6.5, 'reason': "Some detail"}}
+
+
+def test_chunks_respect_the_answer_count_and_prompt_size():
+    pipeline = AnalyticsPipeline(socketio=None)
+    pipeline.batch_answers = 3
+    items = [('i1', i, 'Backend Engineer', "short answer") for i in range(7)]
+    assert [len(c) for c in pipeline._chunks(items)] == [3, 3, 1]
+
+    long = [('i1', i, 'Backend Engineer', "x" * (PROMPT_MAX_CHARS // 2)) for i in range(3)]
+    assert [len(c) for c in pipeline._chunks(long)] == [1, 1, 1]
+
+
+def test_build_report_status_follows_the_scores():
+    t = transcript('i1', ["I built the billing API.", "Kind of, it was a team thing."])
+    assert build_report(t, [{'score': 8.0, 'reason': "ok"}, {'score': 4.0, 'reason': "vague"}])['status'] == 'scored'
+    partial = build_report(t, [{'score': 8.0, 'reason': "ok"}, None])
+    assert partial['status'] == 'partial' and partial['overall'] == 8.0
+    unscored = build_report(t, [None, None])
+    assert unscored['status'] == 'unscored' and unscored['overall'] is None
+    assert unscored['metrics']['answers'] == 2 and unscored['metrics']['confident_rate'] == 1.0
+
+
+def test_truncated_scoring_reply_gives_a_partial_report(monkeypatch):
+    calls = []
+
+    def complete(api_key, user_message, system_prompt, provider, **kwargs):
+        calls.append(user_message)
+        return "1.1 | 7 | Specific\n1.2 | "   # cut off mid-line
+    monkeypatch.setattr(pipeline_module.router, 'complete', complete)
+    pipeline = AnalyticsPipeline(socketio=None)
+    pipeline.score_with_llm = True
+    report, = pipeline.process([transcript('i1', ["I built the billing API.", "Scaling the database."])])
+    assert len(calls) == 1
+    assert report['status'] == 'partial'
+    assert [a['score'] for a in report['answers']] == [7.0, None]
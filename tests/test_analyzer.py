@@ -0,0 +1,52 @@
+# tests/test_analyzer.py
+import os
+import time
+
+import pytest
+
+from app.conversation import analyzer as analyzer_module
+from app.conversation.analyzer import TextAnalyzer
+
+analyzer = TextAnalyzer()
+
+
+def test_whole_words_only():
+    counts = analyzer.analyze("Welcome to the hardware team").counts
+    assert counts["negative"] == 0 and counts["vague"] == 0
+
+
+def test_phrases_match_across_whitespace_and_case():
+    result = analyzer.analyze("It was KIND\n  of tricky, but I'm Definitely proud of it.")
+    assert result.vague and result.confident
+    assert result.sentiment == 1
+
+
+def test_phrases_do_not_match_across_punctuation():
+    assert not analyzer.analyze("It was the right kind. Of course it worked.").vague
+
+
+def test_longest_phrase_wins_and_matches_do_not_overlap():
+    analyzer = TextAnalyzer({"confidence": ["without a doubt"], "vague": ["without"]})
+    assert analyzer.analyze("Without a doubt.").counts == {"confidence": 1, "vague": 0}
+    assert analyzer.analyze("Without it, no.").counts == {"confidence": 0, "vague": 1}
+
+
+def test_phrase_with_punctuation():
+    analyzer = TextAnalyzer({"negative": ["can't"]})
+    assert analyzer.analyze("I can't say.").counts["negative"] == 1
+    assert analyzer.analyze("I can tell.").counts["negative"] == 0
+
+
+@pytest.mark.parametrize('content', ['["hard"]', '{"negative": "hard"}', '{"negative": ["hard", 3]}',
+                                     '{"negative": null}', '{"negative": [', ''])
+def test_invalid_indicators_file_keeps_the_previous_analyzer(tmp_path, monkeypatch, content):
+    path = tmp_path / "indicators.json"
+    path.write_text('{"negative": ["legacy code"]}')
+    monkeypatch.setattr(analyzer_module, "RELOAD_CHECK_INTERVAL", 0.0)
+    for key, value in analyzer_module._state.items():   # restored afterwards
+        monkeypatch.setitem(analyzer_module._state, key, value)
+    analyzer_module.configure({"INDICATORS_FILE": str(path)})
+    assert analyzer_module.analyze_text("More legacy code").sentiment == -1
+    path.write_text(content)
+    os.utime(path, (time.time() + 5, time.time() + 5))   # a new mtime even on coarse filesystems
+    assert analyzer_module.analyze_text("More legacy code").sentiment == -1
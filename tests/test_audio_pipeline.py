@@ -0,0 +1,65 @@
+# tests/test_audio_pipeline.py
+import pytest
+
+from app.audio.buffers import RingBuffer
+from app.audio.engines import PcmDecoder
+from app.audio.pipeline import AudioStream, check_format
+from app.audio.vad import Endpointer
+
+
+class NullRecognizer:
+    def accept(self, pcm):
+        return None
+
+    def finish(self):
+        return ""
+
+
+@pytest.mark.parametrize('codec, sample_rate', [('pcm16', 16000), ('opus', 48000), ('pcm16', 8000)])
+def test_supported_formats_pass(codec, sample_rate):
+    check_format(codec, sample_rate)
+
+
+@pytest.mark.parametrize('codec, sample_rate', [('mp3', 16000), ('', 16000), ('pcm16', 0),
+                                                ('pcm16', -16000), ('opus', 7999), ('pcm16', 192000)])
+def test_unsupported_formats_are_rejected(codec, sample_rate):
+    with pytest.raises(ValueError):
+        check_format(codec, sample_rate)
+
+
+def test_stream_rejects_a_zero_sample_rate():
+    # 0 Hz would make chunk_bytes 0 and feed() would never leave its loop
+    with pytest.raises(ValueError):
+        AudioStream(NullRecognizer(), PcmDecoder(), sample_rate=0)
+
+
+def test_stream_feeds_whole_chunks():
+    stream = AudioStream(NullRecognizer(), PcmDecoder(), sample_rate=16000, chunk_ms=100)
+    stream.feed(b'\0' * (stream.chunk_bytes + 10))
+    assert len(stream.ring) == 10
+
+
+def test_odd_length_frame_keeps_samples_aligned():
+    stream = AudioStream(NullRecognizer(), PcmDecoder(), sample_rate=16000, chunk_ms=100,
+                         endpointer=Endpointer(16000))
+    stream.feed(b'\1' * 1001)
+    stream.finish()
+    for _ in range(10):   # used to raise "buffer size must be a multiple of element size"
+        stream.feed(b'\1' * 3200)
+    assert stream.ring._start % 2 == 0
+
+
+def test_pcm_decoder_carries_the_odd_byte():
+    decoder = PcmDecoder()
+    assert bytes(decoder.decode(b'abc')) == b'ab'
+    assert bytes(decoder.decode(b'de')) == b'cd'
+    assert bytes(decoder.decode(b'f')) == b'ef'
+    assert bytes(decoder.decode(b'g')) == b''
+
+
+def test_ring_buffer_moves_in_whole_samples():
+    ring = RingBuffer(16)
+    ring.write(b'\0' * 10)
+    ring.consume(3)
+    assert len(ring) == 6 and ring._start == 4
+    assert sum(len(v) for v in ring.peek(5)) == 4
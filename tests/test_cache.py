@@ -0,0 +1,68 @@
+# tests/test_cache.py
+from app import events
+from app.conversation.analyzer import analyze_text
+from app.conversation.session import Session, Turn, posting
+from app.llm import cache as cache_module
+from app.llm.cache import ResponseCache
+from app.llm.router import answered_by
+
+
+def test_openings_index_is_lru_capped_by_posting():
+    cache = ResponseCache(max_postings=2)
+    for posting in ('p1', 'p2'):
+        cache.put_opening(posting, "I build APIs", f"{posting}-key", f"reply for {posting}")
+    assert cache.get_opening('p1', "I build APIs") == "reply for p1"   # p1 is now the most recent
+    cache.put_opening('p3', "I build APIs", 'p3-key', "reply for p3")
+    assert list(cache._openings) == ['p1', 'p3']
+    assert cache.get_opening('p2', "I build APIs") is None
+
+
+def test_openings_cap_applies_on_load(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = ResponseCache(path=path, persist_every=1)
+    for n in range(5):
+        cache.put_opening(f'p{n}', "I build APIs", f'k{n}', f"reply {n}")
+    restored = ResponseCache(path=path, max_postings=3)
+    restored.load()
+    assert list(restored._openings) == ['p2', 'p3', 'p4']
+
+
+def test_persist_is_registered_once_across_configures(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(cache_module.atexit, 'register', registered.append)
+    cache = ResponseCache()
+    for _ in range(3):
+        cache.configure({'RESPONSE_CACHE_PATH': str(tmp_path / "cache.json")})
+    assert registered == [cache.persist]
+
+
+def store_and_lookup(monkeypatch, answers, answered, lookup_provider):
+    cache = ResponseCache()
+    monkeypatch.setattr(events, 'response_cache', cache)
+    session = Session('k', 'groq', posting("Backend Engineer", "Python APIs"), history=[Turn(a) for a in answers])
+    analysis = analyze_text(answers[-1])
+    built = events.build_prompt(session, answers[-1], analysis)
+    token = answered_by.set(answered)
+    try:
+        events.store_reply(session, built, answers[-1], analysis, "Tell me about the hardest part.")
+    finally:
+        answered_by.reset(token)
+    session.provider = lookup_provider
+    return cache, events.cached_reply(session, built, answers[-1], analysis)
+
+
+def test_opening_reply_is_keyed_on_the_provider_that_answered(monkeypatch):
+    cache, hit = store_and_lookup(monkeypatch, ["I build payment APIs."], 'groq', 'groq')
+    assert hit == "Tell me about the hardest part."
+    # The server's together key answered a groq turn: only reused for together
+    cache, hit = store_and_lookup(monkeypatch, ["I build payment APIs."], 'together', 'groq')
+    assert hit is None and len(cache) == 1
+    cache, hit = store_and_lookup(monkeypatch, ["I build payment APIs."], 'together', 'together')
+    assert hit == "Tell me about the hardest part."
+
+
+def test_fallback_and_later_turns_are_not_stored(monkeypatch):
+    cache, _ = store_and_lookup(monkeypatch, ["I build payment APIs."], None, 'groq')
+    assert len(cache) == 0
+    cache, _ = store_and_lookup(monkeypatch, ["I build payment APIs.", "Mostly Python."], 'groq', 'groq')
+    assert len(cache) == 0
@@ -0,0 +1,73 @@
+# tests/test_client.py
+import time
+
+import pytest
+
+from app.llm import client
+from app.llm.providers import PROVIDER_ENDPOINTS, ProviderError, request_completion
+from benchmarks.fake_llm import FakeLLMServer
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Start a fake "groq"; the client runs with its shipped retry settings."""
+    servers = []
+
+    def start(**options):
+        server = FakeLLMServer(**options).start()
+        servers.append(server)
+        monkeypatch.setitem(PROVIDER_ENDPOINTS['groq'], 'url', server.url)
+        return server
+
+    assert client.settings['LLM_MAX_RETRIES'] == 2
+    client.close_all()
+    yield start
+    client.close_all()
+    for server in servers:
+        server.shutdown()
+
+
+def test_429_is_returned_at_once_not_retried(provider):
+    server = provider(key_rpm=1)
+    assert request_completion('groq', 'k', 'Tell me about yourself.')
+    start = time.monotonic()
+    with pytest.raises(ProviderError) as failure:
+        request_completion('groq', 'k', 'Tell me about yourself.')
+    assert time.monotonic() - start < 1.0   # not the minute of Retry-After
+    assert failure.value.status == 429 and failure.value.retry_after >= 50
+    assert server.requests == 2
+
+
+def test_5xx_is_retried_with_a_short_backoff(provider):
+    server = provider(error_rate=1.0)
+    start = time.monotonic()
+    with pytest.raises(ProviderError) as failure:
+        request_completion('groq', 'k', 'Tell me about yourself.')
+    assert failure.value.status == 503
+    assert server.requests == 1 + client.settings['LLM_MAX_RETRIES']
+    assert time.monotonic() - start < 3.0
+
+
+def test_pooled_session_settings(monkeypatch):
+    monkeypatch.setattr(client, 'settings', dict(client.settings))
+    client.configure({'LLM_POOL_SIZE': 7, 'LLM_MAX_RETRIES': 1})
+    try:
+        session = client.get_session('groq')
+        assert client.get_session('groq') is session   # one keep-alive pool per provider
+        assert client.get_session('together') is not session
+        adapter = session.get_adapter('https://api.groq.com/openai/v1/chat/completions')
+        assert adapter._pool_maxsize == 7
+        retry = adapter.max_retries
+        assert (retry.total, retry.connect, retry.status, retry.read) == (1, 1, 1, 0)
+        assert 429 not in retry.status_forcelist and 503 in retry.status_forcelist
+        assert retry.allowed_methods is None and not retry.respect_retry_after_header
+    finally:
+        client.close_all()
+
+
+def test_turns_reuse_a_warm_connection(provider):
+    server = provider()
+    for _ in range(3):
+        assert request_completion('groq', 'k', 'Tell me about yourself.')
+    pools = client.get_session('groq').get_adapter(server.url).poolmanager.pools
+    assert [pools[key].num_connections for key in pools.keys()] == [1]
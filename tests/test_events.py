@@ -0,0 +1,85 @@
+# tests/test_events.py
+import time
+
+
+def replies(client, timeout=5.0):
+    """Events received until an ai_speak, busy or error arrives."""
+    deadline, received = time.monotonic() + timeout, []
+    while time.monotonic() < deadline:
+        received += [(r['name'], r['args'][0] if r['args'] else None) for r in client.get_received()]
+        if any(name in ('ai_speak', 'busy', 'error') for name, _ in received):
+            return received
+        time.sleep(0.02)
+    return received
+
+
+def history_length(client):
+    from app import events
+    return len(events.sessions.get(client.interview_id).history)
+
+
+def test_resent_answer_after_its_turn_gets_the_reply_again(candidate):
+    candidate.emit('user_spoke', {'text': "I build payment APIs in Python.", 'seq': 1})
+    (name, first), = [e for e in replies(candidate) if e[0] == 'ai_speak']
+    candidate.emit('user_spoke', {'text': "I build payment APIs in Python.", 'seq': 1})
+    again = replies(candidate)
+    assert again == [('ai_speak', {'text': first['text'], 'pause_ms': 0})]
+    assert history_length(candidate) == 1
+
+
+def test_resent_answer_while_its_turn_runs_is_ignored(candidate):
+    candidate.emit('user_spoke', {'text': "I build payment APIs in Python.", 'seq': 1})
+    candidate.emit('user_spoke', {'text': "I build payment APIs in Python.", 'seq': 1})
+    received = replies(candidate)
+    assert [name for name, _ in received] == ['ai_speak']   # no "could you repeat that?"
+    assert history_length(candidate) == 1
+
+
+def test_new_answer_while_a_turn_runs_is_busy(candidate):
+    candidate.emit('user_spoke', {'text': "I build payment APIs in Python.", 'seq': 1})
+    candidate.emit('user_spoke', {'text': "And I mentor two junior engineers.", 'seq': 2})
+    assert [name for name, _ in replies(candidate)] == ['busy']
+
+
+def test_unknown_provider_is_rejected_at_start(app):
+    from app import socketio
+    client = socketio.test_client(app)
+    client.emit('start_voice_interview', {'api_key': 'k', 'provider': 'made-up', 'job_role': 'Backend Engineer',
+                                          'job_desc': 'Python services and APIs'})
+    assert [r['name'] for r in client.get_received()] == ['error']
+    client.disconnect()
+
+
+def test_turn_trace_has_provider_and_emit_spans(candidate, monkeypatch):
+    from app.metrics import TurnTrace
+    finished = []
+    monkeypatch.setattr(TurnTrace, 'finish', lambda self, streamed, source: finished.append(self) or 0.0)
+    candidate.emit('user_spoke', {'text': "I build payment APIs in Python.", 'seq': 1})
+    assert [name for name, _ in replies(candidate)][-1] == 'ai_speak'
+    deadline = time.monotonic() + 1.0
+    while not finished and time.monotonic() < deadline:   # finish() runs just after the emit
+        time.sleep(0.01)
+    spans = finished[0].spans
+    assert spans['llm_ttfb'] <= spans['llm']
+    assert 'emit' in spans
+
+
+def test_streamed_turn_sends_each_sentence_as_it_completes(app, candidate, monkeypatch):
+    monkeypatch.setitem(app.config, 'LLM_STREAM', True)
+    candidate.emit('user_spoke', {'text': "I build payment APIs in Python.", 'seq': 1})
+    received = replies(candidate)
+    partials = [args['text'] for name, args in received if name == 'ai_speak_partial']
+    assert partials == ["That sounds like a solid piece of work.",
+                        "Can you walk me through a specific decision you made and what you learned from it?"]
+    (_, reply), = [e for e in received if e[0] == 'ai_speak']
+    assert reply['streamed'] and reply['text'] == " ".join(partials)
+
+
+def test_thinking_pause_is_a_hint_not_a_server_sleep(candidate, monkeypatch):
+    from app import events
+    monkeypatch.setattr(events, 'calculate_thinking_pause', lambda text, is_vague: 2.0)
+    start = time.monotonic()
+    candidate.emit('user_spoke', {'text': "I build payment APIs in Python.", 'seq': 1})
+    (_, reply), = [e for e in replies(candidate) if e[0] == 'ai_speak']
+    assert reply['pause_ms'] == 2000   # the browser waits whatever is left of it
+    assert time.monotonic() - start < 1.5   # the provider's 0.3 s, not 2 s more
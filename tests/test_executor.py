@@ -0,0 +1,40 @@
+# tests/test_executor.py
+import threading
+
+from app.executor import TurnExecutor
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.emitted = []
+
+    def start_background_task(self, fn, *args):
+        thread = threading.Thread(target=fn, args=args, daemon=True)
+        thread.start()
+        thread.join(5)
+        return thread
+
+    def emit(self, event, data, to=None):
+        self.emitted.append((event, to))
+
+
+def broken_turn():
+    raise RuntimeError("provider exploded")
+
+
+def test_failed_turn_is_logged_and_reported_to_the_room(caplog):
+    socketio = FakeSocketIO()
+    executor = TurnExecutor(socketio)
+    assert executor.submit('interview-1', broken_turn) is None
+    assert socketio.emitted == [('error', 'interview-1')]
+    assert "turn for interview-1 failed" in caplog.text
+    assert executor.inflight('interview-1') == 0 and executor.admitted == 0
+
+
+def test_on_error_replaces_the_error_event():
+    socketio, failed = FakeSocketIO(), []
+    executor = TurnExecutor(socketio)
+    executor.on_error = failed.append
+    executor.submit('interview-1', broken_turn)
+    assert failed == ['interview-1'] and socketio.emitted == []
+    assert executor.submit('interview-1', lambda: None) is None   # the slot was released
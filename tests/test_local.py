@@ -0,0 +1,95 @@
+# tests/test_local.py
+import numpy as np
+import pytest
+
+from app.llm.local import LocalLLM
+from app.llm.local_engines import LocalEngine
+
+STOP, WORD = 0, 1
+
+
+class FakeEngine(LocalEngine):
+    """Prompts of N tokens for a message "N"; every step samples WORD unless told to stop."""
+
+    def __init__(self, n_ctx=100, n_batch=8):
+        self.n_ctx, self.n_batch = n_ctx, n_batch
+        self.passes = []
+        self.released = []
+
+    def encode(self, messages):
+        return [WORD] * int(messages[-1]['content'])
+
+    def piece(self, token):
+        return b'word '
+
+    def is_stop(self, token):
+        return token == STOP
+
+    def forward(self, entries):
+        self.passes.append([(slot, len(tokens), pos, want) for slot, tokens, pos, want in entries])
+        logits = np.zeros((sum(want for *_, want in entries), 2), dtype=np.float32)
+        logits[:, WORD] = 1.0
+        return logits
+
+    def release(self, slot):
+        self.released.append(slot)
+
+
+@pytest.fixture
+def llm():
+    llm = LocalLLM()
+    llm.max_batch, llm.max_wait = 4, 0.0
+    llm.engine = FakeEngine()
+    llm._slots = list(range(llm.max_batch - 1, -1, -1))   # start() without the scheduler thread
+    return llm
+
+
+def submit(llm, prompt_tokens, max_tokens=20):
+    return llm.submit([{'role': 'user', 'content': str(prompt_tokens)}], max_tokens, temperature=0)
+
+
+def test_admission_stops_at_the_kv_budget(llm):
+    first, second, third = submit(llm, 30), submit(llm, 30), submit(llm, 30)   # 50 KV tokens each
+    llm._admit()
+    assert llm._active == [first, second] and list(llm._waiting) == [third]
+    assert llm._reserved == 100
+
+    second.cancelled = True   # its caller went away: released at the next step
+    llm._step()
+    llm._admit()
+    assert llm._active == [first, third] and llm._reserved == 100
+
+
+def test_admission_stops_at_max_batch(llm):
+    llm.engine.n_ctx = 10000
+    seqs = [submit(llm, 2) for _ in range(6)]
+    llm._admit()
+    assert llm._active == seqs[:4] and len(llm._waiting) == 2
+    assert sorted(s.slot for s in llm._active) == [0, 1, 2, 3]
+
+
+def test_running_sequences_go_first_and_prompts_share_the_rest_of_the_batch(llm):
+    running = submit(llm, 3)
+    llm._admit()
+    llm._step()   # its whole prompt fits: first token sampled
+    assert llm.engine.passes[-1] == [(running.slot, 3, 0, True)]
+
+    newcomer = submit(llm, 20)
+    llm._admit()
+    llm._step()
+    # One decode token for the running reply, then 7 of the newcomer's 20 prompt tokens (n_batch 8)
+    assert llm.engine.passes[-1] == [(running.slot, 1, 3, True), (newcomer.slot, 7, 0, False)]
+    llm._step()
+    llm._step()
+    assert llm.engine.passes[-1] == [(running.slot, 1, 5, True), (newcomer.slot, 6, 14, True)]
+    assert newcomer.output == [WORD] and len(running.output) == 4
+
+
+def test_max_tokens_finishes_and_frees_the_slot(llm):
+    seq = submit(llm, 3, max_tokens=2)
+    llm._admit()
+    llm._step()
+    llm._step()
+    assert list(llm.pieces(seq)) == ["word ", "word "]
+    assert seq.finish_reason == 'length'
+    assert llm._active == [] and llm._reserved == 0 and llm.engine.released == [seq.slot]
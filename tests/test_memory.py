@@ -0,0 +1,50 @@
+# tests/test_memory.py
+from app.conversation.memory import build_context, compact_history, estimate_tokens, settings
+from app.conversation.session import Session, Turn, posting
+
+
+def interview(answers):
+    return Session('k', 'groq', posting("Backend Engineer", "Python APIs"), history=[Turn(a) for a in answers])
+
+
+def answer(n):
+    return f"In project {n} I owned the rollout. We shipped it in two weeks and cut errors by half."
+
+
+def test_only_answers_past_the_recent_window_are_folded():
+    session = interview([answer(n) for n in range(1, 6)])
+    compact_history(session)
+    assert session.summarized == 5 - settings['CONTEXT_RECENT_TURNS']
+    assert session.summary == "In project 1 I owned the rollout | In project 2 I owned the rollout"
+
+    compact_history(session)   # nothing new: a no-op
+    assert session.summarized == 2
+    session.history.append(Turn(answer(6)))
+    compact_history(session)
+    assert session.summarized == 3
+    assert session.summary.endswith(" | In project 3 I owned the rollout")
+
+
+def test_summary_stays_within_its_token_budget_keeping_the_newest():
+    session = interview([])
+    for end in range(1, 60):   # one compaction per turn, as the live path does
+        session.history = [Turn(answer(n)) for n in range(1, end + 1)]
+        compact_history(session)
+    assert estimate_tokens(session.summary) <= settings['CONTEXT_SUMMARY_TOKENS']
+    assert session.summary.endswith("In project 56 I owned the rollout")
+    assert "project 1 " not in session.summary
+
+
+def test_gists_are_capped_in_words():
+    session = interview(["word " * 50 + "end.", answer(2), answer(3), answer(4)])
+    compact_history(session)
+    assert session.summary == " ".join(["word"] * settings['CONTEXT_SUMMARY_WORDS_PER_TURN']) + "…"
+
+
+def test_context_after_compaction_has_summary_then_recent_answers():
+    session = interview([answer(n) for n in range(1, 6)])
+    compact_history(session)
+    lines = build_context(session).splitlines()
+    assert lines[0] == ("Earlier in the interview: "
+                        "In project 1 I owned the rollout | In project 2 I owned the rollout")
+    assert lines[1:] == [f"Answer {n}: {answer(n)}" for n in (3, 4, 5)]
@@ -0,0 +1,27 @@
+# tests/test_prompt_engine.py
+from app.llm.prompt_engine import build_turn_prompt
+
+ROLE = "Backend Engineer"
+DESC = "Build and operate the payments API in Python; on-call one week in six."
+
+
+def test_turn_prompt_prefix_is_identical_across_sessions():
+    a = build_turn_prompt(ROLE, DESC, "warm", "", "I mostly write Python services.")
+    b = build_turn_prompt(ROLE, DESC, "neutral",
+                          "I led the billing migration.\nI mentor two juniors.",
+                          "We cut p99 latency by half with connection pooling.")
+    assert a.system.encode() == b.system.encode()
+    assert a.prefix_chars == b.prefix_chars
+    prefix_a = (a.system + a.user)[:a.prefix_chars]
+    prefix_b = (b.system + b.user)[:b.prefix_chars]
+    assert prefix_a.encode() == prefix_b.encode()
+    # the prefix stops before anything session-specific
+    assert "I mostly write" not in prefix_a
+    assert prefix_a.endswith("Previous candidate answers:\n")
+
+
+def test_prefix_covers_the_posting():
+    a = build_turn_prompt(ROLE, DESC, "warm", "", "Yes.")
+    other = build_turn_prompt("Data Engineer", DESC, "warm", "", "Yes.")
+    assert ROLE in (a.system + a.user)[:a.prefix_chars]
+    assert (a.system + a.user)[:a.prefix_chars] != (other.system + other.user)[:other.prefix_chars]
@@ -0,0 +1,22 @@
+# tests/test_providers.py
+from app.llm.providers import iter_sse_deltas
+
+
+def chunk(content):
+    return 'data: {"choices": [{"delta": {"content": %s}}]}' % ('null' if content is None else f'"{content}"')
+
+
+def test_sse_deltas_in_order_until_done():
+    lines = [b': keep-alive', b'', chunk("Tell").encode(), b'event: message', chunk(" me"), b'data: [DONE]',
+             chunk("ignored")]
+    assert list(iter_sse_deltas(lines)) == ["Tell", " me"]
+
+
+def test_sse_skips_empty_and_malformed_chunks():
+    lines = [chunk(None), 'data: {"choices": []}', 'data: {not json', 'data: {"choices": [{"delta": {}}]}',
+             chunk("more.")]
+    assert list(iter_sse_deltas(lines)) == ["more."]
+
+
+def test_sse_stream_without_done_ends_with_its_lines():
+    assert list(iter_sse_deltas(iter([chunk("Hi"), chunk("!")]))) == ["Hi", "!"]
@@ -0,0 +1,83 @@
+# tests/test_question_bank.py
+import numpy as np
+import pytest
+
+from app.conversation.analyzer import analyze_text
+from app.conversation.question_bank import QuestionBank
+
+ENTRIES = [
+    {'role': 'Backend Engineer', 'question': "How did you design the database schema for your last API?",
+     'skills': ['postgresql', 'schema design']},
+    {'role': 'Backend Engineer', 'question': "How do you make a Python service handle more traffic?",
+     'skills': ['python', 'scaling', 'caching']},
+    {'role': 'Data Scientist', 'question': "How do you validate a model before it reaches production?",
+     'skills': ['machine learning', 'validation']},
+    {'role': '*', 'question': "Tell me about a project you are proud of.", 'skills': []},
+]
+BACKEND = ("Backend Engineer", "Python services, PostgreSQL schema design, scaling and caching")
+
+
+@pytest.fixture
+def bank():
+    return QuestionBank().build(ENTRIES, dim=256)
+
+
+def test_build_groups_columns_by_role(bank):
+    assert bank.roles == ['*', 'backend engineer', 'data scientist']
+    assert list(bank.offsets) == [0, 1, 3, 4]
+    assert bank.columns.shape == (256, 4)
+    assert np.allclose(np.linalg.norm(bank.columns, axis=0), 1.0)
+
+
+def test_lookup_stays_within_the_role_and_generic_questions(bank):
+    found = [q for _, q in bank.lookup(*BACKEND, k=5)]
+    assert len(found) == 3 and "How do you validate a model before it reaches production?" not in found
+    scores = [s for s, _ in bank.lookup(*BACKEND, k=5)]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_the_answer_steers_the_choice(bank):
+    _, best = bank.lookup(*BACKEND, answer="Our Python API kept falling over under peak traffic")[0]
+    assert best == "How do you make a Python service handle more traffic?"
+    _, best = bank.lookup(*BACKEND, answer="I modelled the tables and indexes for our PostgreSQL schema")[0]
+    assert best == "How did you design the database schema for your last API?"
+
+
+def test_unlisted_title_borrows_the_nearest_role(bank):
+    found = [q for _, q in bank.lookup("Senior Python Developer", "PostgreSQL schema design and scaling", k=5)]
+    assert "How do you make a Python service handle more traffic?" in found
+
+
+def test_reply_skips_the_question_just_asked(bank):
+    answer = "Our Python API kept falling over under peak traffic"
+    first = bank.reply(*BACKEND, answer, analyze_text(answer))
+    assert first.endswith("How do you make a Python service handle more traffic?")
+    second = bank.reply(*BACKEND, answer, analyze_text(answer), exclude=first)
+    assert second is not None and not second.endswith("How do you make a Python service handle more traffic?")
+
+
+def test_reply_below_min_score_falls_through_to_the_llm(bank):
+    bank.min_score = 0.99
+    answer = "I like hiking."
+    assert bank.reply(*BACKEND, answer, analyze_text(answer)) is None
+    assert bank.stats == {'hits': 0, 'misses': 1}
+
+
+def test_save_load_round_trip(bank, tmp_path):
+    path = str(tmp_path / "bank.npz")
+    bank.save(path)
+    restored = QuestionBank().load(path)
+    assert (restored.roles, restored.questions, restored.skills) == (bank.roles, bank.questions, bank.skills)
+    assert np.array_equal(restored.columns, bank.columns) and np.array_equal(restored.offsets, bank.offsets)
+    answer = "Our Python API kept falling over under peak traffic"
+    assert restored.lookup(*BACKEND, answer=answer) == bank.lookup(*BACKEND, answer=answer)
+
+
+def test_load_rejects_another_format_version(bank, tmp_path, monkeypatch):
+    from app.conversation import question_bank as module
+    path = str(tmp_path / "bank.npz")
+    monkeypatch.setattr(module, 'FORMAT_VERSION', 99)
+    bank.save(path)
+    monkeypatch.undo()
+    with pytest.raises(ValueError):
+        QuestionBank().load(path)
@@ -0,0 +1,171 @@
+# tests/test_router.py
+import time
+
+import pytest
+
+from app.llm import router as router_module
+from app.llm.providers import ProviderError
+from app.llm.router import CLOSED, FALLBACK_REPLY, HALF_OPEN, OPEN, LLMRouter
+from app.llm.scheduler import LLMScheduler
+
+SERVER_KEYS = {'LLM_FALLBACK_KEYS': {'groq': 'server-groq', 'together': 'server-together'}}
+
+
+def make_router(**config):
+    router = LLMRouter()
+    router.configure({**SERVER_KEYS, **config})
+    return router
+
+
+def test_server_keys_are_not_routes_by_default():
+    assert make_router().routes('groq', 'candidate') == [('groq', 'candidate')]
+
+
+def test_server_fallback_is_opt_in():
+    routes = dict(make_router(LLM_SERVER_FALLBACK=True).routes('groq', 'candidate'))
+    assert routes == {'groq': 'candidate', 'together': 'server-together'}
+
+
+def test_local_turns_never_get_network_routes():
+    router = make_router(LLM_SERVER_FALLBACK=True)
+    router.health['together'].latency = 0.01   # faster than anything local
+    assert router.routes('local', '') == [('local', '')]
+
+
+class StubProvider:
+    """Stands in for request_completion: records calls, answers after `latency` or raises `error`."""
+
+    def __init__(self, latency=0.0, error=None):
+        self.latency = latency
+        self.error = error
+        self.calls = []
+
+    def __call__(self, provider, key, user_message, system_prompt="", max_tokens=150):
+        self.calls.append((provider, key))
+        time.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        return f"reply from {provider}"
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    provider = StubProvider()
+    monkeypatch.setattr(router_module, 'request_completion', provider)
+    return provider
+
+
+def test_single_route_is_not_hedged_by_default(stub):
+    stub.latency = 0.2
+    router = make_router(LLM_HEDGE_DELAY=0.02)
+    assert router.complete('candidate', 'hi', 'sys', 'groq') == 'reply from groq'
+    assert stub.calls == [('groq', 'candidate')]
+
+
+def test_single_route_hedge_is_opt_in(stub):
+    stub.latency = 0.2
+    router = make_router(LLM_HEDGE_DELAY=0.02, LLM_HEDGE_SAME_ROUTE=True)
+    router.complete('candidate', 'hi', 'sys', 'groq')
+    assert stub.calls == [('groq', 'candidate')] * 2
+
+
+def breaker_router(**config):
+    router = make_router(LLM_BREAKER_THRESHOLD=3, LLM_BREAKER_COOLDOWN=0.1, **config)
+    router.scheduler = LLMScheduler()   # a 429 holds the key here, not in the app's limiter
+    return router
+
+
+def test_breaker_opens_after_threshold_failures(stub):
+    stub.error = ProviderError('groq', "upstream down", status=500)
+    router = breaker_router()
+    for _ in range(2):
+        assert router.complete('candidate', 'hi', 'sys', 'groq') == FALLBACK_REPLY
+        assert router.health['groq'].state == CLOSED
+    router.complete('candidate', 'hi', 'sys', 'groq')
+    assert router.health['groq'].state == OPEN
+    assert router.routes('groq', 'candidate') == []
+    assert router.complete('candidate', 'hi', 'sys', 'groq') == FALLBACK_REPLY
+    assert len(stub.calls) == 3   # an open breaker doesn't reach the provider
+
+
+def test_half_open_breaker_allows_one_trial(stub):
+    stub.error = ProviderError('groq', "upstream down", status=500)
+    router = breaker_router()
+    for _ in range(3):
+        router.complete('candidate', 'hi', 'sys', 'groq')
+    time.sleep(0.15)
+    assert router.routes('groq', 'candidate') == [('groq', 'candidate')]
+    assert router.health['groq'].state == HALF_OPEN
+    assert router._claim('groq')
+    assert not router._claim('groq')   # the trial is taken
+    router._release_trial('groq')
+
+
+def test_successful_trial_closes_the_breaker(stub):
+    stub.error = ProviderError('groq', "upstream down", status=500)
+    router = breaker_router()
+    for _ in range(3):
+        router.complete('candidate', 'hi', 'sys', 'groq')
+    time.sleep(0.15)
+    stub.error = None
+    assert router.complete('candidate', 'hi', 'sys', 'groq') == 'reply from groq'
+    assert router.health['groq'].state == CLOSED
+    assert router.health['groq'].consecutive_failures == 0
+
+
+def test_failed_trial_reopens_the_breaker(stub):
+    stub.error = ProviderError('groq', "upstream down", status=500)
+    router = breaker_router()
+    for _ in range(3):
+        router.complete('candidate', 'hi', 'sys', 'groq')
+    time.sleep(0.15)
+    router.complete('candidate', 'hi', 'sys', 'groq')   # one failure is enough when half-open
+    assert router.health['groq'].state == OPEN
+    assert len(stub.calls) == 4
+
+
+def test_rate_limits_do_not_count_against_the_breaker(stub):
+    stub.error = ProviderError('groq', "slow down", status=429, retry_after=0.01)
+    router = breaker_router()
+    for _ in range(5):
+        assert router.complete('candidate', 'hi', 'sys', 'groq') == FALLBACK_REPLY
+        time.sleep(0.02)   # past the Retry-After hold
+    assert router.health['groq'].state == CLOSED
+    assert router.health['groq'].consecutive_failures == 0
+
+
+def stream_stub(monkeypatch, replies):
+    """Stands in for open_stream: provider -> list of chunks, with an Exception item raised where it sits."""
+    def open_stream(provider, key, user_message, system_prompt=""):
+        for item in replies[provider]:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    monkeypatch.setattr(router_module, 'open_stream', open_stream)
+
+
+def test_stream_latency_is_kept_apart_from_completions(monkeypatch):
+    stream_stub(monkeypatch, {'groq': ["Hello", " there."]})
+    router = breaker_router()
+    assert ''.join(router.stream('candidate', 'hi', 'sys', 'groq')) == "Hello there."
+    health = router.health['groq']
+    assert health.latency is None and not health.recent
+    assert len(health.ttft) == 1
+
+
+def test_stream_broken_mid_reply_counts_as_a_failure(monkeypatch):
+    stream_stub(monkeypatch, {'groq': ["Hello", ProviderError('groq', "connection reset")]})
+    router = breaker_router()
+    for _ in range(3):
+        assert ''.join(router.stream('candidate', 'hi', 'sys', 'groq')) == "Hello"
+    assert router.health['groq'].state == OPEN
+
+
+def test_empty_stream_falls_back(monkeypatch):
+    stream_stub(monkeypatch, {'groq': [], 'together': ["From together."]})
+    router = breaker_router(LLM_SERVER_FALLBACK=True)
+    assert ''.join(router.stream('candidate', 'hi', 'sys', 'groq')) == "From together."
+    assert router.health['groq'].consecutive_failures == 1
+
+    stream_stub(monkeypatch, {'groq': [], 'together': []})
+    assert ''.join(make_router().stream('candidate', 'hi', 'sys', 'groq')) == FALLBACK_REPLY
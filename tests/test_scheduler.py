@@ -0,0 +1,177 @@
+# tests/test_scheduler.py
+import threading
+import time
+
+import pytest
+
+from app.llm import client
+from app.llm.providers import PROVIDER_ENDPOINTS
+from app.llm.router import CLOSED, FALLBACK_REPLY, LLMRouter
+from app.llm.scheduler import BACKGROUND, INTERACTIVE, LLMScheduler, RateLimited
+from benchmarks.fake_llm import FakeLLMServer
+
+
+def make_scheduler(**config):
+    scheduler = LLMScheduler()
+    scheduler.configure({'LLM_QUEUE_MAX_WAIT': 2.0, **config})
+    return scheduler
+
+
+def in_background(fn, *args):
+    thread = threading.Thread(target=fn, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_key_bucket_limits_its_key_only():
+    # 60/min with a 2 s burst: two calls go at once, the third waits about a second
+    scheduler = make_scheduler(LLM_KEY_RPM=60, LLM_RATE_BURST_SECONDS=2, LLM_QUEUE_MAX_WAIT=0.2)
+    assert scheduler.acquire('groq', 'a', 100) == pytest.approx(0, abs=0.01)
+    assert scheduler.acquire('groq', 'a', 100) == pytest.approx(0, abs=0.01)
+    with pytest.raises(RateLimited):
+        scheduler.acquire('groq', 'a', 100)
+    assert scheduler.acquire('groq', 'b', 100) == pytest.approx(0, abs=0.01)
+    assert scheduler.stats['timeouts'] == 1
+    assert scheduler.queued('groq', 'a') == 0
+
+
+def test_key_bucket_refills():
+    scheduler = make_scheduler(LLM_KEY_RPM=600, LLM_RATE_BURST_SECONDS=0.1)
+    scheduler.acquire('groq', 'a', 1)
+    waited = scheduler.acquire('groq', 'a', 1)
+    assert 0.05 < waited < 0.5
+
+
+def test_token_bucket_counts_tokens():
+    # 6000 tokens/min with a 1 s burst = 100 tokens at once
+    scheduler = make_scheduler(LLM_KEY_TPM=6000, LLM_RATE_BURST_SECONDS=1, LLM_QUEUE_MAX_WAIT=0.2)
+    scheduler.acquire('groq', 'a', 80)
+    with pytest.raises(RateLimited):
+        scheduler.acquire('groq', 'a', 80)
+    scheduler.acquire('groq', 'a', 10)
+
+
+def test_quiet_key_is_not_queued_behind_a_noisy_one():
+    # The provider lets one call through every 100 ms; five noisy calls are queued before the quiet one
+    scheduler = make_scheduler(LLM_PROVIDER_RPM=600, LLM_RATE_BURST_SECONDS=0.1)
+    scheduler.acquire('groq', 'warm-up', 1)
+    order, lock = [], threading.Lock()
+
+    def call(key):
+        scheduler.acquire('groq', key, 100)
+        with lock:
+            order.append(key)
+
+    threads = []
+    for _ in range(5):
+        threads.append(in_background(call, 'noisy'))
+        wait_until(lambda: scheduler.queued('groq', 'noisy') == len(threads) - len(order))
+    threads.append(in_background(call, 'quiet'))
+    wait_until(lambda: scheduler.queued('groq', 'quiet') == 1 or 'quiet' in order)
+    for thread in threads:
+        thread.join(3)
+    assert sorted(order) == ['noisy'] * 5 + ['quiet']
+    assert order.index('quiet') == 1
+
+
+def test_background_goes_after_interactive():
+    scheduler = make_scheduler(LLM_PROVIDER_RPM=600, LLM_RATE_BURST_SECONDS=0.1)
+    scheduler.acquire('groq', 'warm-up', 1)
+    order = []
+    threads = [in_background(lambda: (scheduler.acquire('groq', 'a', 1, BACKGROUND), order.append('background')))]
+    wait_until(lambda: scheduler.queued('groq', 'a') == 1)
+    threads.append(in_background(lambda: (scheduler.acquire('groq', 'b', 1, INTERACTIVE), order.append('turn'))))
+    wait_until(lambda: scheduler.queued('groq', 'b') == 1 or order)
+    for thread in threads:
+        thread.join(3)
+    assert order == ['turn', 'background']
+
+
+def test_admit_new_refuses_while_the_key_has_a_backlog():
+    scheduler = make_scheduler(LLM_KEY_RPM=60, LLM_RATE_BURST_SECONDS=1, LLM_ADMIT_MAX_QUEUED=2)
+    scheduler.acquire('groq', 'busy', 1)
+    assert scheduler.admit_new('groq', 'busy')
+    threads = [in_background(scheduler.acquire, 'groq', 'busy', 1) for _ in range(2)]
+    wait_until(lambda: scheduler.queued('groq', 'busy') == 2)
+    assert not scheduler.admit_new('groq', 'busy')
+    assert scheduler.admit_new('groq', 'other')
+    assert scheduler.stats['refused_new'] == 1
+    for thread in threads:
+        thread.join(3)
+
+
+def test_admit_new_refuses_while_the_provider_has_a_backlog():
+    scheduler = make_scheduler(LLM_PROVIDER_RPM=60, LLM_RATE_BURST_SECONDS=1, LLM_ADMIT_MAX_QUEUED_PROVIDER=2)
+    scheduler.acquire('groq', 'a', 1)
+    threads = [in_background(scheduler.acquire, 'groq', key, 1) for key in ('a', 'b')]
+    wait_until(lambda: scheduler.queued('groq', 'a') + scheduler.queued('groq', 'b') == 2)
+    assert not scheduler.admit_new('groq', 'c')
+    assert scheduler.admit_new('together', 'c')
+    for thread in threads:
+        thread.join(3)
+
+
+def test_throttled_holds_the_key_for_retry_after():
+    scheduler = make_scheduler()
+    scheduler.throttled('groq', 'a', retry_after=0.3)
+    start = time.monotonic()
+    scheduler.acquire('groq', 'a', 1)
+    assert time.monotonic() - start >= 0.25
+    assert scheduler.acquire('groq', 'b', 1) == pytest.approx(0, abs=0.01)
+    assert scheduler.stats['upstream_429'] == 1
+
+
+def test_throttled_hold_times_out_into_rate_limited():
+    scheduler = make_scheduler(LLM_QUEUE_MAX_WAIT=0.1)
+    scheduler.throttled('groq', 'a', retry_after=5)
+    with pytest.raises(RateLimited):
+        scheduler.acquire('groq', 'a', 1)
+
+
+def test_disabled_scheduler_never_waits():
+    scheduler = make_scheduler(LLM_SCHEDULER_ENABLED=False, LLM_KEY_RPM=1)
+    for _ in range(5):
+        assert scheduler.acquire('groq', 'a', 1) == 0.0
+    assert scheduler.admit_new('groq', 'a')
+
+
+@pytest.fixture
+def limited_provider(monkeypatch):
+    """"groq" pointed at a fake provider that allows one request per minute per key.
+
+    The client keeps its shipped retry settings: the 429 must reach the router, not be retried inline.
+    """
+    server = FakeLLMServer(key_rpm=1).start()
+    monkeypatch.setitem(PROVIDER_ENDPOINTS['groq'], 'url', server.url)
+    client.close_all()
+    yield server
+    server.shutdown()
+    client.close_all()
+
+
+def test_provider_429_reaches_neither_the_candidate_nor_the_breaker(limited_provider):
+    assert client.settings['LLM_MAX_RETRIES'] == 2
+    scheduler = make_scheduler(LLM_QUEUE_MAX_WAIT=0.2)
+    router = LLMRouter()
+    router.configure({'LLM_HEDGING': False})
+    router.scheduler = scheduler
+    assert router.complete('k', 'Tell me about yourself.', 'sys', 'groq') != FALLBACK_REPLY
+    start = time.monotonic()
+    reply = router.complete('k', 'Tell me about yourself.', 'sys', 'groq')
+    assert time.monotonic() - start < 1.0   # not Retry-After (a minute) spent inside the call
+    assert reply == FALLBACK_REPLY
+    assert 'Error' not in reply
+    assert limited_provider.rate_limited == 1
+    assert scheduler.stats['upstream_429'] == 1
+    assert router.health['groq'].state == CLOSED
+    assert router.health['groq'].consecutive_failures == 0
+    # The key is held (Retry-After), so the next call waits in the limiter instead of hitting the provider
+    assert router.complete('k', 'Tell me about yourself.', 'sys', 'groq') == FALLBACK_REPLY
+    assert limited_provider.rate_limited == 1
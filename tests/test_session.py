@@ -0,0 +1,63 @@
+# tests/test_session.py
+import json
+
+import pytest
+
+from app.conversation import session as session_module
+from app.conversation.session import Session, Turn, dumps, loads, posting
+
+
+def make_session():
+    history = [Turn.of("I led the billing migration — ünïcode too.", 1, False, True),
+               Turn.of("Kind of, it was a team thing.", -1, True, False),
+               Turn("partial answer, not analysed yet")]
+    return Session('sk-candidate', 'groq', posting("Backend Engineer", "Python APIs"),
+                   last_ai_text="What was hardest?", max_questions=7, questions_asked=3, history=history,
+                   summary="Led a migration.", summarized=1, answer_seq=4)
+
+
+def assert_same(a, b):
+    assert a.to_list() == b.to_list()
+    assert b.posting is a.posting   # interned: sessions of one posting share it
+    assert [(t.sentiment, t.vague, t.confident) for t in b.history] == \
+        [(t.sentiment, t.vague, t.confident) for t in a.history]
+
+
+def test_json_round_trip(monkeypatch):
+    monkeypatch.setattr(session_module, 'msgpack', None)
+    original = make_session()
+    raw = dumps(original)
+    assert raw[:1] == b'j'
+    assert_same(original, loads(raw))
+
+
+def test_msgpack_round_trip(monkeypatch):
+    msgpack = pytest.importorskip('msgpack')
+    monkeypatch.setattr(session_module, 'msgpack', msgpack)
+    original = make_session()
+    raw = dumps(original)
+    assert raw[:1] == b'm'
+    assert_same(original, loads(raw))
+
+
+def test_msgpack_session_without_msgpack_installed(monkeypatch):
+    monkeypatch.setattr(session_module, 'msgpack', None)
+    with pytest.raises(RuntimeError):
+        loads(b'm\x9b')
+
+
+def test_legacy_dict_session_still_loads():
+    legacy = {'api_key': 'k', 'provider': 'groq', 'job_role': "Backend Engineer", 'job_desc': "Python APIs",
+              'max_questions': 5, 'questions_asked': 1, 'last_ai_text': "Tell me more.",
+              'history': [{'answer': "I write Python.", 'sentiment': 0, 'vague': False, 'confident': True}],
+              'context': {'summary': '', 'summarized': 0}}
+    restored = loads(json.dumps(legacy).encode())
+    assert restored.job_role == "Backend Engineer" and restored.questions_asked == 1
+    assert restored.history[0].answer == "I write Python." and restored.history[0].confident
+
+
+def test_version_1_session_loads_without_answer_seq():
+    data = make_session().to_list()[:-1]
+    data[0] = 1
+    restored = loads(b'j' + json.dumps(data).encode())
+    assert restored.answer_seq == 0 and len(restored.history) == 3
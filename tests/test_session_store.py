@@ -0,0 +1,46 @@
+# tests/test_session_store.py
+import time
+
+import pytest
+
+from app import events
+from app.conversation.session import Session, posting
+from app.conversation.session_store import MemorySessionStore, RedisSessionStore
+from app.metrics import REGISTRY
+
+
+def make_session():
+    return Session('sk-candidate', 'groq', posting("Backend Engineer", "Python APIs"))
+
+
+def test_grace_window_expires_behind_live_sessions():
+    store = MemorySessionStore(ttl=60)
+    store.save('still-here', make_session())
+    store.save('left', make_session())
+    store.touch('left', 0.05)   # disconnected: a short grace window behind an older, live session
+    time.sleep(0.1)
+    store.save('new', make_session())
+    assert list(store._data) == ['still-here', 'new']
+
+
+def test_access_after_touch_restores_the_full_ttl():
+    store = MemorySessionStore(ttl=60)
+    store.save('back', make_session())
+    store.touch('back', 0.05)
+    assert store.get('back') is not None   # reconnected within the grace window
+    time.sleep(0.1)
+    store.save('new', make_session())
+    assert list(store._data) == ['back', 'new']
+
+
+def test_session_gauge_does_not_scan_a_redis_store(monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    store = RedisSessionStore(client=fakeredis.FakeRedis())
+    store.save('a', make_session())
+
+    def scan_iter(*args, **kwargs):
+        raise AssertionError("scanned the keyspace")
+    monkeypatch.setattr(store.client, 'scan_iter', scan_iter)
+    monkeypatch.setattr(events, 'sessions', store)
+    gauge = next(m for m in REGISTRY if m.name == 'interview_sessions')
+    assert gauge.render() == gauge.header()
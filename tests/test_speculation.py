@@ -0,0 +1,50 @@
+# tests/test_speculation.py
+import threading
+import time
+
+from app.conversation.speculation import Speculator
+
+PARTIAL = "I led the migration of our billing system to event sourcing"
+
+
+class Spawner:
+    def start_background_task(self, fn, *args):
+        thread = threading.Thread(target=fn, args=args, daemon=True)
+        thread.start()
+        return thread
+
+
+def generator(release, outcome):
+    """generate() that waits in a stand-in rate limiter until `release` is set."""
+    def generate(text, admitted):
+        release.wait(5)
+        outcome['admitted'] = admitted()
+        return ("What was the hardest part?", 40) if outcome['admitted'] else (None, 0)
+    return generate
+
+
+def test_final_answer_does_not_wait_on_a_queued_speculation():
+    speculator = Speculator(Spawner(), enabled=True)
+    release, outcome = threading.Event(), {}
+    speculator.observe('i1', PARTIAL, generator(release, outcome))
+    start = time.monotonic()
+    assert speculator.take('i1', PARTIAL) is None
+    assert time.monotonic() - start < 0.5
+    release.set()
+    time.sleep(0.1)
+    assert outcome['admitted'] is False   # dropped before it reached the provider
+    assert speculator.stats['misses'] == 1
+
+
+def test_final_answer_waits_for_a_speculation_already_sent():
+    speculator = Speculator(Spawner(), enabled=True)
+
+    def generate(text, admitted):
+        assert admitted()
+        time.sleep(0.1)   # on the wire
+        return "What was the hardest part?", 40
+
+    speculator.observe('i1', PARTIAL, generate)
+    time.sleep(0.02)
+    assert speculator.take('i1', PARTIAL) == "What was the hardest part?"
+    assert speculator.stats['hits'] == 1
@@ -0,0 +1,100 @@
+# tests/test_transcript_log.py
+import os
+import threading
+import time
+
+from app.conversation.session import Session, Turn, posting
+from app.conversation.transcript_log import TranscriptLog
+
+
+def make_log(directory):
+    log = TranscriptLog(str(directory), fsync_ms=0)   # write + fsync every record inline
+    log.open()
+    return log
+
+
+def answer(log, interview_id, session, text, reply):
+    session.history.append(Turn.of(text, 1, False, True))
+    session.questions_asked += 1
+    session.answer_seq += 2   # the client numbers every answer it sends, including rejected ones
+    log.turn(interview_id, session, reply)
+
+
+def test_replay_stops_at_a_torn_record(tmp_path):
+    log = make_log(tmp_path)
+    session = Session('sk-secret', 'groq', posting("Backend Engineer", "Python APIs"), last_ai_text="Welcome!")
+    log.start('i1', session)
+    answer(log, 'i1', session, "I built the billing API.", "What was hardest?")
+    path = log.segments()[0]
+    intact = os.path.getsize(path)
+    answer(log, 'i1', session, "Scaling the database.", "How did you scale it?")
+    log.close()
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 5)   # crash mid-write of the last record
+
+    recovered = TranscriptLog(str(tmp_path)).recover()
+    assert list(recovered) == ['i1']
+    restored = recovered['i1']
+    assert [t.answer for t in restored.history] == ["I built the billing API."]
+    assert restored.last_ai_text == "What was hardest?"
+    assert restored.questions_asked == 1
+    assert restored.answer_seq == 2   # a re-sent answer isn't answered twice after a restart
+    assert restored.api_key is None   # never written to the log
+    assert os.path.getsize(path) > intact
+
+
+def test_corrupt_record_ends_the_segment_but_not_the_log(tmp_path):
+    first = make_log(tmp_path)
+    session = Session('k', 'groq', posting("Data Engineer", "Spark"))
+    first.start('i1', session)
+    answer(first, 'i1', session, "I run Spark jobs.", "Which ones?")
+    first.close()
+    path = first.segments()[0]
+    with open(path, 'r+b') as f:
+        f.seek(-3, os.SEEK_END)
+        f.write(b'xyz')   # bad crc on the turn record
+
+    second = make_log(tmp_path)   # a restart appends to a new segment
+    other = Session('k', 'groq', posting("Data Engineer", "Spark"))
+    second.start('i2', other)
+    second.close()
+
+    replayed = TranscriptLog(str(tmp_path)).replay()
+    assert replayed['i1'].start is not None and replayed['i1'].turns == {}
+    assert replayed['i2'].start is not None
+
+
+def test_ended_interviews_are_not_recovered(tmp_path):
+    log = make_log(tmp_path)
+    session = Session('k', 'groq', posting("Backend Engineer", "Python APIs"))
+    log.start('i1', session)
+    log.end('i1')
+    log.close()
+    assert TranscriptLog(str(tmp_path)).recover() == {}
+
+
+def test_rotation_compacts_off_the_write_path(tmp_path, monkeypatch):
+    log = make_log(tmp_path)
+    log.segment_bytes, log.compact_segments = 1, 1   # rotate on every record, compact after the second
+    release, compacted = threading.Event(), threading.Event()
+    real_compact = log.compact
+
+    def slow_compact():
+        release.wait(5)
+        result = real_compact()
+        compacted.set()
+        return result
+    monkeypatch.setattr(log, 'compact', slow_compact)
+
+    session = Session('k', 'groq', posting("Backend Engineer", "Python APIs"))
+    start = time.monotonic()
+    log.start('i1', session)
+    answer(log, 'i1', session, "I built the billing API.", "What was hardest?")
+    answer(log, 'i1', session, "Scaling the database.", "How did you scale it?")
+    assert time.monotonic() - start < 1.0   # the turn never waits for compaction
+    release.set()
+    assert compacted.wait(5)
+    log.close()
+    assert log.stats['compactions'] == 1
+    restored = TranscriptLog(str(tmp_path)).recover()['i1']
+    assert [t.answer for t in restored.history] == ["I built the billing API.", "Scaling the database."]
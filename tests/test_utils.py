@@ -0,0 +1,25 @@
+# tests/test_utils.py
+from app.llm.utils import SentenceBuffer
+
+
+def test_sentences_come_out_as_they_complete():
+    buffer = SentenceBuffer()
+    assert buffer.feed("That sounds like sol") == []
+    assert buffer.feed("id work. Can you") == ["That sounds like solid work."]
+    assert buffer.feed(" walk me through it?") == []   # no whitespace yet: the sentence may go on
+    assert buffer.feed(" ") == ["Can you walk me through it?"]
+    assert buffer.flush() == ""
+
+
+def test_several_sentences_in_one_chunk_and_trailing_punctuation():
+    buffer = SentenceBuffer()
+    assert buffer.feed('Great! Really?! He said "ship it." Then ') == ["Great!", "Really?!", 'He said "ship it."']
+    assert buffer.feed("what happened") == []
+    assert buffer.flush() == "Then what happened"
+    assert buffer.flush() == ""
+
+
+def test_decimals_and_abbreviations_without_a_space_do_not_split():
+    buffer = SentenceBuffer()
+    assert buffer.feed("Latency fell from 1.5s to 0.3s in v2.1 ") == []
+    assert buffer.flush() == "Latency fell from 1.5s to 0.3s in v2.1"
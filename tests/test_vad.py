@@ -0,0 +1,52 @@
+# tests/test_vad.py
+import numpy as np
+import pytest
+
+from app.audio.vad import END_OF_TURN, SPEECH_START, Endpointer
+
+RATE = 16000
+
+
+def audio(*parts, seed=0):
+    """16-bit PCM from (seconds, amplitude) parts: low amplitude is room noise, high is 'speech'."""
+    rng = np.random.default_rng(seed)
+    return np.concatenate([rng.normal(0, amp, int(RATE * seconds)) for seconds, amp in parts]) \
+        .clip(-32768, 32767).astype('<i2').tobytes()
+
+
+def feed(endpointer, pcm, chunk_bytes=RATE * 2 // 10):
+    events = []
+    for i in range(0, len(pcm), chunk_bytes):
+        events.extend(endpointer.process(pcm[i:i + chunk_bytes]))
+    return [(e.kind, round(e.at, 2)) for e in events]
+
+
+def test_speech_start_and_end_of_turn():
+    events = feed(Endpointer(RATE, hangover_ms=900), audio((1.0, 30), (1.5, 5000), (1.5, 30)))
+    assert [kind for kind, _ in events] == [SPEECH_START, END_OF_TURN]
+    (_, started), (_, ended) = events
+    assert started == pytest.approx(1.3, abs=0.05)    # onset, confirmed after min_speech
+    assert ended == pytest.approx(2.5 + 0.9, abs=0.05)   # the hangover after the last voiced frame
+
+
+def test_pause_shorter_than_the_hangover_does_not_end_the_turn():
+    pcm = audio((1.0, 30), (1.0, 5000), (0.6, 30), (1.0, 5000), (1.2, 30))
+    events = feed(Endpointer(RATE, hangover_ms=900), pcm)
+    assert [kind for kind, _ in events] == [SPEECH_START, END_OF_TURN]
+    assert events[1][1] == pytest.approx(3.6 + 0.9, abs=0.05)
+
+
+def test_short_noise_is_not_speech():
+    assert feed(Endpointer(RATE), audio((1.0, 30), (0.15, 5000), (1.5, 30))) == []
+
+
+def test_chunking_does_not_change_the_events():
+    pcm = audio((1.0, 30), (1.5, 5000), (1.5, 30), seed=3)
+    whole = feed(Endpointer(RATE), pcm, chunk_bytes=len(pcm))
+    odd = feed(Endpointer(RATE), pcm, chunk_bytes=1234)   # 20 ms frames split across chunks
+    assert whole == odd and len(whole) == 2
+
+
+def test_default_hangover():
+    assert Endpointer(RATE).hangover * 20 == 900
+    assert Endpointer.from_config({}, RATE).hangover * 20 == 900